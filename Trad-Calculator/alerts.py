@@ -0,0 +1,173 @@
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+# ``kind`` records where an alert came from; ``side`` is how it fires
+PRICE, PERCENT, STOP = 'price', 'percent', 'stop'
+ABOVE, BELOW = 'above', 'below'
+
+Alert = namedtuple('Alert', 'id market kind side threshold label created')
+Trigger = namedtuple('Trigger', 'alert price')
+
+
+def percent_threshold(reference, percent):
+    """``(side, threshold)`` for a move of ``percent`` from ``reference``."""
+    if percent == 0: raise ValueError("Percent change must not be zero")
+    return (ABOVE if percent > 0 else BELOW), reference * (1 + percent / 100)
+
+
+class ThresholdBook:
+    """One market's active alerts, kept in two sorted arrays.
+
+    ``below`` is keyed by threshold and ``above`` by negated threshold, so
+    in both the alerts a price has crossed form a suffix: a tick costs one
+    bisect per side plus the alerts it fires, which are cut off the end.
+    Equal keys keep insertion order.
+    """
+
+    __slots__ = ('above_keys', 'above', 'below_keys', 'below')
+
+    def __init__(self):
+        self.above_keys, self.above = [], []
+        self.below_keys, self.below = [], []
+
+    def _side(self, alert):
+        if alert.side == ABOVE: return self.above_keys, self.above, -alert.threshold
+        return self.below_keys, self.below, alert.threshold
+
+    def add(self, alert):
+        keys, alerts, key = self._side(alert)
+        i = bisect_right(keys, key)
+        keys.insert(i, key)
+        alerts.insert(i, alert)
+
+    def remove(self, alert):
+        keys, alerts, key = self._side(alert)
+        for i in range(bisect_left(keys, key), bisect_right(keys, key)):
+            if alerts[i].id == alert.id:
+                del keys[i], alerts[i]
+                return True
+        return False
+
+    def cross(self, price):
+        """Remove and return every alert ``price`` has reached."""
+        fired = []
+        i = bisect_left(self.above_keys, -price)
+        if i < len(self.above):
+            fired += self.above[i:]
+            del self.above_keys[i:], self.above[i:]
+        i = bisect_left(self.below_keys, price)
+        if i < len(self.below):
+            fired += self.below[i:]
+            del self.below_keys[i:], self.below[i:]
+        return fired
+
+    def __len__(self):
+        return len(self.above) + len(self.below)
+
+
+class AlertEngine:
+    """Price-above, price-below, percent-move and stop-loss alerts for all markets.
+
+    Alerts are one-shot: ``check`` fires each at most once and drops it.
+    Percent alerts are turned into a price threshold when added, and each
+    market holds at most one stop-loss. With a ``journal`` alerts persist
+    across restarts. Not thread-safe; the app uses it on the Tk thread.
+    """
+
+    def __init__(self, journal=None, clock=time.time):
+        self.journal = journal
+        self.clock = clock
+        self.books = {}
+        self.by_id = {}
+        self.stops = {}
+        self.next_id = 1
+        if journal is not None:
+            for row in journal.alerts():
+                self._index(Alert(*row))
+
+    def _index(self, alert):
+        book = self.books.get(alert.market)
+        if book is None:
+            book = self.books[alert.market] = ThresholdBook()
+        book.add(alert)
+        self.by_id[alert.id] = alert
+        if alert.kind == STOP: self.stops[alert.market] = alert.id
+        self.next_id = max(self.next_id, alert.id + 1)
+
+    def _unindex(self, alert):
+        del self.by_id[alert.id]
+        if self.stops.get(alert.market) == alert.id: del self.stops[alert.market]
+
+    def add_many(self, specs):
+        """Add ``(market, kind, side, threshold, label)`` alerts in one journal write."""
+        now = self.clock()
+        added = []
+        for market, kind, side, threshold, label in specs:
+            if side not in (ABOVE, BELOW): raise ValueError(f"Unknown alert side: {side!r}")
+            if threshold <= 0: raise ValueError("Alert price must be positive")
+            alert = Alert(self.next_id, market, kind, side, threshold, label, now)
+            self._index(alert)
+            added.append(alert)
+        if self.journal is not None and added:
+            self.journal.record_alerts(added)
+        return added
+
+    def add(self, market, side, threshold, label=''):
+        return self.add_many([(market, PRICE, side, threshold, label or f"Price {side} {threshold:,.2f}")])[0]
+
+    def add_percent(self, market, percent, reference):
+        """Alert when ``market`` moves ``percent`` (signed) from ``reference``."""
+        side, threshold = percent_threshold(reference, percent)
+        label = f"{percent:+g}% from {reference:,.2f}"
+        return self.add_many([(market, PERCENT, side, threshold, label)])[0]
+
+    def set_stop_loss(self, market, stop_price):
+        """Arm the market's stop-loss alert, replacing any earlier one."""
+        if market in self.stops: self.cancel(self.stops[market])
+        return self.add_many([(market, STOP, BELOW, stop_price, f"Stop-loss {stop_price:,.2f}")])[0]
+
+    def cancel(self, alert_id):
+        alert = self.by_id.get(alert_id)
+        if alert is None: return False
+        self.books[alert.market].remove(alert)
+        self._unindex(alert)
+        if self.journal is not None: self.journal.delete_alerts([alert_id])
+        return True
+
+    def cancel_market(self, market):
+        """Drop every alert on ``market``; returns how many there were."""
+        book = self.books.pop(market, None)
+        if book is None: return 0
+        alerts = book.above + book.below
+        for alert in alerts:
+            self._unindex(alert)
+        if self.journal is not None: self.journal.delete_alerts([a.id for a in alerts])
+        return len(alerts)
+
+    def check(self, prices):
+        """Fire alerts crossed by ``(market, price)`` pairs; returns ``Trigger`` list.
+
+        Markets without alerts cost one dict lookup.
+        """
+        books = self.books
+        triggers = []
+        for market, price in prices:
+            book = books.get(market)
+            if book is None: continue
+            for alert in book.cross(price):
+                self._unindex(alert)
+                triggers.append(Trigger(alert, price))
+            if not book: del books[market]
+        if self.journal is not None and triggers:
+            self.journal.delete_alerts([t.alert.id for t in triggers])
+        return triggers
+
+    def active(self, market=None):
+        """Alerts in id order, optionally for one market."""
+        if market is None: return sorted(self.by_id.values())
+        book = self.books.get(market)
+        return sorted(book.above + book.below) if book else []
+
+    def __len__(self):
+        return len(self.by_id)
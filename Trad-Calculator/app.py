@@ -4,14 +4,36 @@ import json
 import os
 from datetime import datetime
 import math
-import requests
-import threading
 import time
 import random
 
+from crypto_list import VirtualCryptoList
+from instrumentation import instruments
+from results_log import ResultsLog, ResultsView
+from search_index import SEARCH_DEBOUNCE_MS, Debouncer, SearchIndex
+from startup import StartupWarmup, replay
+
+# Modules that pull in requests or NumPy (market_client, calc_engine, ledger,
+# journal, ticker_store) are imported on the warm-up threads and then
+# locally where used, so the splash paints before they load.
+
+PUMP_INTERVAL_MS = 50
+# Portfolio labels are rewritten at most this often, however fast ticks arrive
+PORTFOLIO_REFRESH_MS = 250
+# Triggered alerts listed in the results pane per tick; the rest are counted
+ALERT_DISPLAY_LIMIT = 10
+ALERT_TYPES = {'Price Above': 'above', 'Price Below': 'below', '% Change': 'percent'}
+# Heartbeat used to measure main-loop stalls while instrumentation is on
+STALL_TICK_MS = 100
+DIAGNOSTICS_REFRESH_MS = 1000
+# Order book polling follows the Trading tab's market once typing settles
+WATCH_DEBOUNCE_MS = 500
+# A local calc_service answers unchanged polls with a 304, so thin clients poll it often
+SERVICE_POLL_INTERVAL = 5
+
 # --- Splash Screen Code (Added from code.py) ---
 class SplashScreen:
-    def __init__(self):
+    def __init__(self, warmup=None, diagnostics=False, profile_path=None, poll_interval=None):
         self.root = tk.Tk()
         self.root.title("Loading...")
         self.root.geometry("400x300")
@@ -27,8 +49,10 @@ class SplashScreen:
         # Create splash content
         self.create_splash_content()
 
-        # Schedule the animation to start after the window is drawn
-        self.root.after(100, self.animate_loading)
+        # Warm-up runs on background threads; the splash only polls it
+        self.warmup = warmup or StartupWarmup()
+        self.app_options = {'diagnostics': diagnostics, 'profile_path': profile_path, 'poll_interval': poll_interval}
+        self.root.after(0, self.animate_loading)
 
     def center_window(self):
         self.root.update_idletasks()
@@ -75,55 +99,79 @@ class SplashScreen:
                                 fg='#7f8c8d', bg='#2c3e50')
         version_label.pack(side='bottom')
 
-    def animate_loading(self):
-        loading_messages = [
-            "Initializing components...",
-            "Loading calculation engines...",
-            "Connecting to live data feed...",
-            "Setting up user interface...",
-            "Configuring fee structures...",
-            "Finalizing setup..."
-        ]
-
-        dots_animation = ["|", "/", "-", "\\", "|", "/", "-", "\\", "|", "/"]
-
-        # Use root.after for a non-blocking animation loop
-        def update_step(i=0, j=0):
-            if i < len(loading_messages):
-                self.progress_var.set(loading_messages[i])
-                self.dots_var.set(dots_animation[j % len(dots_animation)])
-                self.root.update_idletasks()
-                if j < 10: # Animation cycles per message
-                    self.root.after(50, update_step, i, j + 1)
-                else:
-                    self.root.after(50, update_step, i + 1, 0)
-            else:
-                self.finish_loading()
-
-        update_step()
+    def animate_loading(self, frame=0):
+        dots_animation = ["|", "/", "-", "\\"]
+        if self.warmup.ready():
+            self.finish_loading()
+            return
+        self.progress_var.set(self.warmup.progress())
+        self.dots_var.set(dots_animation[frame % len(dots_animation)])
+        self.root.after(50, self.animate_loading, frame + 1)
 
     def finish_loading(self):
         # Show completion message
         self.progress_var.set("Ready to launch!")
         self.dots_var.set("DONE")
-        self.root.update()
-        self.root.after(500)
+        self.root.update_idletasks()
 
         # Close splash and open main app
         self.root.destroy()
 
         # Launch main application
-        app = InvestmentCalculator()
+        app = InvestmentCalculator(self.warmup, **self.app_options)
         app.run()
 
 
 class InvestmentCalculator:
-    def __init__(self):
+    def __init__(self, warmup=None, diagnostics=False, profile_path=None, poll_interval=None):
+        from market_pipeline import POLL_INTERVAL, MarketPipeline
+        from order_book import OrderBookCache
+        from portfolio import Portfolio, Throttle
+        from tick_archive import TickArchive
+        from ticker_store import TickerStore
+
+        warmup = warmup or StartupWarmup()
+        state = warmup.state.result()
         self.root = tk.Tk()
         self.crypto_data = []
+        self.crypto_by_market = {}
+        self.search_index = SearchIndex(())
+        self.search_results = None
+        self.order_books = OrderBookCache()
+        self.fee_schedule = state.schedule
+        self.ledger = state.ledger
+        self.journal = state.journal
+        self.alerts = state.alerts
+        self.portfolio = Portfolio(self.ledger)
+        self.portfolio_refresh = Throttle(self.root, PORTFOLIO_REFRESH_MS, self.update_portfolio_stats)
+        self.portfolio_text = None
+        self.tick_archive = TickArchive()
+        self.tick_archive.start_compaction()
+        # The warm-up's ticker fetch is consumed as the pipeline's first poll
+        self.pipeline = MarketPipeline(warmup.client.result(), TickerStore(), self.journal,
+                                       prefetched=warmup.ticker, archive=self.tick_archive,
+                                       snapshot_cache=state.snapshot_cache,
+                                       poll_interval=poll_interval or POLL_INTERVAL)
+        # Last session's prices, shown (marked stale) until the first live ticker
+        ticker = warmup.ticker
+        prefetched = ticker.done() and not ticker.cancelled() and ticker.exception() is None
+        self.cached_ticker = None if prefetched else state.cached_ticker
+        self.prices_status_var = tk.StringVar()
+        self.pump_job = None
+        # Monte Carlo engine; its process pool starts on the first risk run
+        self.risk_engine = None
+        self.risk_run = None
+        self.tax_job = None
+        # Open price chart windows by market
+        self.charts = {}
         self.search_var = tk.StringVar()
-        self.crypto_update_thread = None
-        self.stop_crypto_thread = threading.Event()
+        # Hidden diagnostics panel (Ctrl+Shift+D); instrumentation stays on
+        # after it closes only if it was on from the start
+        self.profile_path = profile_path
+        self.keep_instrumenting = instruments.enabled
+        self.diagnostics_window = None
+        self.diagnostics_job = None
+        self.stall_job = None
 
         self.setup_window()
         self.setup_styles()
@@ -136,16 +184,111 @@ class InvestmentCalculator:
             'buy_price': 0,
             'total_invested': 0
         }
+        self.sync_trading_data(self.current_market())
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.bind('<Control-D>', lambda event: self.toggle_diagnostics())
+        if diagnostics: self.open_diagnostics()
+        elif instruments.enabled: self.watch_main_loop()
+        if state.journal_error or state.unmatched:
+            self.root.after_idle(self.report_journal_problems, state)
+
+    def report_journal_problems(self, state):
+        """Tell the user what the warm-up could not load from the trade journal."""
+        if state.journal_error:
+            messagebox.showwarning("Trade Journal Unavailable",
+                                   f"Could not open the trade journal:\n{state.journal_error}\n\n"
+                                   "Starting with an empty ledger; trades made this session will not be saved.")
+        if state.unmatched:
+            messagebox.showwarning("Trade Journal", f"{state.unmatched:,} journaled sell(s) exceeded the holding "
+                                   "and were left out of the ledger.")
 
     def on_closing(self):
         """Handle window closing event."""
-        self.stop_crypto_thread.set()
-        if self.crypto_update_thread and self.crypto_update_thread.is_alive():
-            self.crypto_update_thread.join(timeout=1)
+        if self.pump_job is not None:
+            self.root.after_cancel(self.pump_job)
+        for job in (self.stall_job, self.diagnostics_job):
+            if job is not None: self.root.after_cancel(job)
+        self.portfolio_refresh.cancel()
+        self.pipeline.stop()
+        if self.risk_run is not None:
+            self.risk_run.cancel()
+        if self.risk_engine is not None:
+            self.risk_engine.shutdown()
+        self.tick_archive.close()
+        self.journal.close()
+        self.results_log.close()
+        if self.profile_path:
+            instruments.dump_profile(self.profile_path)
+            instruments.dump_folded(self.profile_path + '.folded')
         self.root.destroy()
 
+    def watch_main_loop(self, due=None):
+        """Record how late each heartbeat runs, i.e. how long the Tk loop was blocked."""
+        now = time.perf_counter()
+        if due is not None: instruments.observe('tk.stall', max(now - due, 0.0))
+        if not instruments.enabled:
+            self.stall_job = None
+            return
+        self.stall_job = self.root.after(STALL_TICK_MS, self.watch_main_loop, now + STALL_TICK_MS / 1000)
+
+    def toggle_diagnostics(self):
+        if self.diagnostics_window is None: self.open_diagnostics()
+        else: self.close_diagnostics()
+
+    def open_diagnostics(self):
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.lift()
+            return
+        instruments.enable()
+        if self.stall_job is None: self.watch_main_loop()
+        window = self.diagnostics_window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.protocol("WM_DELETE_WINDOW", self.close_diagnostics)
+        buttons = ttk.Frame(window)
+        buttons.pack(fill='x', padx=5, pady=5)
+        ttk.Button(buttons, text="Reset", command=instruments.reset).pack(side='left', padx=2)
+        ttk.Button(buttons, text="Dump Trace...", command=self.dump_trace).pack(side='left', padx=2)
+        self.diagnostics_text = tk.Text(window, font=('Courier', 10), width=64, height=30, bg='#2c3e50', fg='#ecf0f1')
+        self.diagnostics_text.pack(fill='both', expand=True, padx=5, pady=(0, 5))
+        self.refresh_diagnostics()
+
+    def close_diagnostics(self):
+        if self.diagnostics_job is not None:
+            self.root.after_cancel(self.diagnostics_job)
+            self.diagnostics_job = None
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.destroy()
+            self.diagnostics_window = None
+        if not self.keep_instrumenting: instruments.disable()
+
+    def refresh_diagnostics(self):
+        client = self.pipeline.client.metrics.snapshot()
+        queue = self.pipeline.queue
+        report = (f"{instruments.report()}\n\n"
+                  f"ticker HTTP p50/p99 ms  {client['latency_p50'] * 1000:.1f} / {client['latency_p99'] * 1000:.1f}"
+                  f"  ({client['requests']:,} requests, {client['hit_rate']:.0%} not modified)\n"
+                  f"snapshot queue          {len(queue)} waiting, {queue.coalesced:,} coalesced, {queue.dropped:,} dropped")
+        self.diagnostics_text.delete(1.0, tk.END)
+        self.diagnostics_text.insert(tk.END, report)
+        self.diagnostics_job = self.root.after(DIAGNOSTICS_REFRESH_MS, self.refresh_diagnostics)
+
+    def dump_trace(self):
+        filename = filedialog.asksaveasfilename(defaultextension=".folded",
+                                                filetypes=[("Collapsed stacks", "*.folded"), ("All files", "*.*")])
+        if not filename: return
+        stacks = instruments.dump_folded(filename)
+        note = f"{stacks} span stacks written to {os.path.basename(filename)}"
+        if instruments.dump_profile(os.path.splitext(filename)[0] + '.prof'):
+            note += " (cProfile stats alongside as .prof)"
+        messagebox.showinfo("Trace Saved", note)
+
+    def apply_trade(self, market, side, quantity, price):
+        if side == 'buy':
+            self.ledger.buy(market, quantity, price)
+            return None
+        return self.ledger.sell(market, quantity, price)
+
     def setup_window(self):
         self.root.title("🚀 Investment & Trading Calculator Pro")
         self.root.geometry("1400x800")
@@ -174,12 +317,18 @@ class InvestmentCalculator:
 
     def setup_variables(self):
         self.principal_var = tk.StringVar()
+        self.market_var = tk.StringVar(value="BTCINR")
+        self.market_debouncer = Debouncer(self.root, WATCH_DEBOUNCE_MS, self.watch_current_market)
+        self.market_var.trace("w", self.market_debouncer.schedule)
         self.target_investable_var = tk.StringVar()
         self.buy_quantity_var = tk.StringVar()
         self.buy_price_var = tk.StringVar()
         self.sell_price_var = tk.StringVar()
         self.sell_quantity_var = tk.StringVar()
         self.risk_percentage_var = tk.StringVar()
+        self.alert_type_var = tk.StringVar(value='Price Above')
+        self.alert_value_var = tk.StringVar()
+        self.alert_count_var = tk.StringVar()
 
     def create_widgets(self):
         main_frame = ttk.Frame(self.root)
@@ -218,17 +367,10 @@ class InvestmentCalculator:
         self.create_tab1b()
         self.create_tab2()
         self.create_portfolio_tab()
+        # Open positions show at their cost until the first ticker arrives
+        self.update_portfolio_stats()
         self.create_bottom_buttons(left_panel)
 
-    def _bind_mousewheel(self, widget, canvas):
-        """Binds mouse wheel scrolling to a widget and its children."""
-        command = self._on_mousewheel_factory(canvas)
-        widget.bind("<MouseWheel>", command) # Windows, MacOS
-        widget.bind("<Button-4>", command) # Linux
-        widget.bind("<Button-5>", command) # Linux
-        for child in widget.winfo_children():
-            self._bind_mousewheel(child, canvas)
-            
     def _on_mousewheel_factory(self, canvas):
         """Factory to create a scroll command for a specific canvas."""
         def _on_mousewheel(event):
@@ -255,8 +397,11 @@ class InvestmentCalculator:
         scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self.results_text.yview)
         scrollbar.grid(row=0, column=1, sticky='ns')
         self.results_text.configure(yscrollcommand=scrollbar.set)
-        
-        self.results_text.insert(tk.END, self.format_welcome_message())
+        # Only a page of results lives in the widget; the log holds the session
+        self.results_log = ResultsLog()
+        self.results_view = ResultsView(self.results_text, self.results_log)
+        self.results_view.controls(parent).grid(row=2, column=0, sticky='w', padx=5)
+        self.results_view.append(self.format_welcome_message())
         self.results_text.bind("<MouseWheel>", self._on_mousewheel_factory(self.results_text))
         self.results_text.bind("<Button-4>", self._on_mousewheel_factory(self.results_text))
         self.results_text.bind("<Button-5>", self._on_mousewheel_factory(self.results_text))
@@ -266,10 +411,13 @@ class InvestmentCalculator:
         parent.rowconfigure(2, weight=1)
         
         ttk.Label(parent, text="📈 Live Crypto Prices", style='Title.TLabel').grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        ttk.Label(parent, textvariable=self.prices_status_var, style='Info.TLabel').grid(row=0, column=0, padx=5, sticky='e')
         
         search_frame = ttk.Frame(parent)
         search_frame.grid(row=1, column=0, padx=5, pady=5, sticky='ew')
-        self.search_var.trace("w", self.filter_crypto_list)
+        # Re-filter once typing pauses rather than on every keystroke
+        self.search_debouncer = Debouncer(self.root, SEARCH_DEBOUNCE_MS, self.filter_crypto_list)
+        self.search_var.trace("w", self.search_debouncer.schedule)
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, font=('Arial', 11))
         search_entry.pack(fill='x', expand=True)
         search_entry.insert(0, "🔍 Search e.g., BTC, ETH...")
@@ -278,120 +426,100 @@ class InvestmentCalculator:
         canvas_frame.grid(row=2, column=0, sticky='nsew', padx=5, pady=(0, 5))
         canvas_frame.rowconfigure(0, weight=1)
         canvas_frame.columnconfigure(0, weight=1)
-        
-        self.crypto_canvas = tk.Canvas(canvas_frame, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.crypto_canvas.yview)
-        self.crypto_scrollable_frame = ttk.Frame(self.crypto_canvas)
-
-        self.crypto_scrollable_frame.bind("<Configure>", lambda e: self.crypto_canvas.configure(scrollregion=self.crypto_canvas.bbox("all")))
-        self.crypto_canvas.create_window((0, 0), window=self.crypto_scrollable_frame, anchor="nw")
-        self.crypto_canvas.configure(yscrollcommand=scrollbar.set)
-
-        self.crypto_canvas.grid(row=0, column=0, sticky='nsew')
-        scrollbar.grid(row=0, column=1, sticky='ns')
-        
-        self._bind_mousewheel(self.crypto_scrollable_frame, self.crypto_canvas)
-        self._bind_mousewheel(self.crypto_canvas, self.crypto_canvas)
 
-        self.crypto_update_thread = threading.Thread(target=self.fetch_and_display_data, daemon=True)
-        self.crypto_update_thread.start()
-        
-    def fetch_and_display_data(self):
-        api_url = "https://api.coindcx.com/exchange/ticker"
-        while not self.stop_crypto_thread.is_set():
-            try:
-                response = requests.get(api_url, timeout=10)
-                if response.status_code == 200:
-                    all_data = response.json()
-                    inr_data = [d for d in all_data if d['market'].endswith('INR')]
-                    
-                    def sort_key(d):
-                        try:
-                            return float(d.get('change_24_hour', '0'))
-                        except (ValueError, TypeError):
-                            return -float('inf')
-                            
-                    inr_data.sort(key=sort_key, reverse=True)
-                    self.crypto_data = inr_data
-                    
-                    if self.root.winfo_exists():
-                        self.root.after(0, self.update_crypto_list_ui)
-                
-                time.sleep(60)
-            except requests.RequestException:
-                time.sleep(30)
-            except Exception:
-                break
-                
-    def update_crypto_list_ui(self):
+        # Only the rows in view are real widgets; they are recycled on refresh
+        self.crypto_list = VirtualCryptoList(canvas_frame, on_select=self.open_price_chart)
+        self.crypto_list.grid()
+
+        if self.cached_ticker is not None:
+            self.show_cached_ticker(self.cached_ticker)
+        self.pipeline.watch([self.current_market()])
+        self.pipeline.start()
+        self.pump_job = self.root.after(PUMP_INTERVAL_MS, self.pump_market_data)
+
+    def pump_market_data(self):
+        """Apply whatever the pipeline has queued, then re-arm.
+
+        This is the only place market data crosses onto the Tk thread; the
+        queue holds at most one coalesced update per key.
+        """
+        self.pipeline.pump(self.apply_ticker_changes, self.order_books.apply)
+        self.pump_job = self.root.after(PUMP_INTERVAL_MS, self.pump_market_data)
+
+    def watch_current_market(self):
+        self.pipeline.watch([self.current_market()])
+
+    def show_cached_ticker(self, cached):
+        """Fill the price panel from the on-disk snapshot before the pipeline starts."""
+        with instruments.span('ui.cached_ticker'):
+            self.apply_ticker_changes(self.pipeline.ticker_store.update(cached.rows), live=False)
+        minutes = max(0, int((time.time() - cached.saved_at) // 60))
+        self.prices_status_var.set(f"⏳ Cached prices from {minutes} min ago — waiting for live data")
+
+    def apply_ticker_changes(self, changeset, live=True):
+        """Apply a poll's changeset to the price panel on the Tk thread.
+
+        Cached prices (``live=False``) revalue the portfolio but never
+        trigger alerts.
+        """
         if not self.root.winfo_exists(): return
-        
-        y_pos = self.crypto_canvas.yview()[0]
-        
-        for widget in self.crypto_scrollable_frame.winfo_children():
-            widget.destroy()
-
-        for item in self.crypto_data:
-            self.create_crypto_item_widget(item)
-
-        self.root.after(100, lambda: self.crypto_canvas.yview_moveto(y_pos))
-        self._bind_mousewheel(self.crypto_scrollable_frame, self.crypto_canvas)
-        self.filter_crypto_list()
-
-    def create_crypto_item_widget(self, item_data):
-        item_frame = ttk.Frame(self.crypto_scrollable_frame, style='Crypto.TFrame', padding=10)
-        
-        market = item_data.get('market', '').replace('INR', '')
-        try:
-            change_24h = float(item_data.get('change_24_hour', '0'))
-            color = '#2ecc71' if change_24h > 0 else '#e74c3c' if change_24h < 0 else '#bdc3c7'
-        except ValueError:
-            change_24h = 0.0
-            color = '#bdc3c7'
-        
-        try: last_price = float(item_data.get('last_price', '0'))
-        except ValueError: last_price = 0.0
-        try: high = float(item_data.get('high', '0'))
-        except ValueError: high = 0.0
-        try: low = float(item_data.get('low', '0'))
-        except ValueError: low = 0.0
-        try: volume = float(item_data.get('volume', '0'))
-        except ValueError: volume = 0.0
-
-        item_frame.columnconfigure(1, weight=1)
-        ttk.Label(item_frame, text=market, style='Market.TLabel').grid(row=0, column=0, sticky='w')
-        change_label = ttk.Label(item_frame, text=f"{change_24h:+.2f}%", style='Change.TLabel', foreground=color)
-        change_label.grid(row=0, column=1, sticky='e')
-        
-        ttk.Label(item_frame, text=f"₹{last_price:,.4f}", style='Price.TLabel').grid(row=1, column=0, columnspan=2, sticky='w', pady=(5, 0))
-
-        detail_frame = ttk.Frame(item_frame, style='Crypto.TFrame')
-        detail_frame.grid(row=2, column=0, columnspan=2, sticky='ew', pady=(5,0))
-        
-        ttk.Label(detail_frame, text=f"H: {high:,.4f}", style='Detail.TLabel').pack(side='left', expand=True, fill='x')
-        ttk.Label(detail_frame, text=f"L: {low:,.4f}", style='Detail.TLabel').pack(side='left', expand=True, fill='x')
-        ttk.Label(detail_frame, text=f"Vol: {volume:,.2f}", style='Detail.TLabel').pack(side='right', expand=True, fill='x')
+        if live: self.prices_status_var.set("")
+        self.crypto_data = changeset.rows
+        self.crypto_by_market = {d['market']: d for d in changeset.rows}
+        if changeset.added or changeset.removed:
+            self.search_index = SearchIndex(self.crypto_by_market)
+        self.search_index.set_volumes([self.crypto_by_market[m]['volume'] for m in self.search_index.markets])
+        if changeset.structural:
+            self.filter_crypto_list()
+        else:
+            with instruments.span('ui.patch'):
+                self.crypto_list.patch_items(self.filtered_crypto_data(), set(changeset.changed))
+        # Only markets whose price moved are revalued
+        by_market = self.crypto_by_market
+        with instruments.span('portfolio.reprice'):
+            moved = self.portfolio.reprice((m, by_market[m]['last_price']) for m in changeset.changed + changeset.added)
+        if moved: self.portfolio_refresh.schedule()
+        if not live: return
+        for market in self.charts.keys() & by_market.keys():
+            row = by_market[market]
+            self.charts[market].append(row.get('timestamp') or time.time(), row['last_price'])
+        with instruments.span('alerts.check'):
+            triggers = self.alerts.check((m, by_market[m]['last_price']) for m in changeset.changed + changeset.added)
+        if triggers: self.show_triggered_alerts(triggers)
+
+    def open_price_chart(self, item):
+        """Open (or raise) the price chart of a clicked ticker, fed by the tick archive."""
+        from price_chart import PriceSeries, open_chart_window
+
+        market = item['market']
+        chart = self.charts.get(market)
+        if chart is not None:
+            chart.window.lift()
+            return
+        with instruments.span('chart.open'):
+            series = PriceSeries.from_archive(self.tick_archive, market)
+        self.charts[market] = open_chart_window(self.root, series, market, on_close=self.charts.pop)
 
-        item_frame.market_name = market.lower()
-        item_frame.pack(fill='x', padx=5, pady=3)
-        return item_frame
+    def filtered_crypto_data(self):
+        if self.search_results is None: return self.crypto_data
+        return [self.crypto_by_market[m] for m in self.search_results]
 
     def filter_crypto_list(self, *args):
-        search_term = self.search_var.get().lower().replace("🔍 search e.g., btc, eth...", "")
-        if not self.root.winfo_exists() or not hasattr(self, 'crypto_scrollable_frame'): return
-            
-        for child in self.crypto_scrollable_frame.winfo_children():
-            if search_term in child.market_name:
-                child.pack(fill='x', padx=5, pady=3)
+        if not self.root.winfo_exists() or not hasattr(self, 'crypto_list'): return
+        search_term = self.search_var.get().lower().replace("🔍 search e.g., btc, eth...", "").strip()
+        with instruments.span('ui.filter'):
+            if search_term:
+                self.search_results = self.search_index.search(search_term)
             else:
-                child.pack_forget()
+                self.search_results = None
+            self.crypto_list.set_items(self.filtered_crypto_data())
 
     def create_tab1a(self):
         tab1a = ttk.Frame(self.notebook)
         self.notebook.add(tab1a, text="📊 Investable Amount")
         info_frame = ttk.LabelFrame(tab1a, text="💡 Fee Structure Information", padding=10)
         info_frame.pack(fill='x', pady=(0, 10))
-        info_text = "• Platform Fee: 0.5% of principal\n• GST on Platform Fee: 18%\n• Final investable amount = Principal - Fees"
+        info_text = self.fee_schedule.describe()
         ttk.Label(info_frame, text=info_text, style='Info.TLabel').pack(anchor='w')
         input_frame = ttk.LabelFrame(tab1a, text="📝 Input Details", padding=10)
         input_frame.pack(fill='x', pady=(0, 10))
@@ -417,11 +545,13 @@ class InvestmentCalculator:
         self.notebook.add(tab2, text="📈 Trading")
         buy_frame = ttk.LabelFrame(tab2, text="📊 Step 1: Buy Details", padding=10)
         buy_frame.pack(fill='x', pady=(0, 10))
-        ttk.Label(buy_frame, text="Quantity:", style='Subtitle.TLabel').grid(row=0, column=0, sticky='w', pady=5)
-        ttk.Entry(buy_frame, textvariable=self.buy_quantity_var, font=('Arial', 11), width=15).grid(row=0, column=1, padx=(10, 0), pady=5)
-        ttk.Label(buy_frame, text="Price (₹):", style='Subtitle.TLabel').grid(row=1, column=0, sticky='w', pady=5)
-        ttk.Entry(buy_frame, textvariable=self.buy_price_var, font=('Arial', 11), width=15).grid(row=1, column=1, padx=(10, 0), pady=5)
-        ttk.Button(buy_frame, text="💰 Record Buy", command=self.calculate_investment, style='Success.TButton').grid(row=2, column=0, columnspan=2, pady=10)
+        ttk.Label(buy_frame, text="Market:", style='Subtitle.TLabel').grid(row=0, column=0, sticky='w', pady=5)
+        ttk.Entry(buy_frame, textvariable=self.market_var, font=('Arial', 11), width=15).grid(row=0, column=1, padx=(10, 0), pady=5)
+        ttk.Label(buy_frame, text="Quantity:", style='Subtitle.TLabel').grid(row=1, column=0, sticky='w', pady=5)
+        ttk.Entry(buy_frame, textvariable=self.buy_quantity_var, font=('Arial', 11), width=15).grid(row=1, column=1, padx=(10, 0), pady=5)
+        ttk.Label(buy_frame, text="Price (₹):", style='Subtitle.TLabel').grid(row=2, column=0, sticky='w', pady=5)
+        ttk.Entry(buy_frame, textvariable=self.buy_price_var, font=('Arial', 11), width=15).grid(row=2, column=1, padx=(10, 0), pady=5)
+        ttk.Button(buy_frame, text="💰 Record Buy", command=self.calculate_investment, style='Success.TButton').grid(row=3, column=0, columnspan=2, pady=10)
         sell_frame = ttk.LabelFrame(tab2, text="📊 Step 2: Sell Details", padding=10)
         sell_frame.pack(fill='x', pady=(0, 10))
         ttk.Label(sell_frame, text="Price (₹):", style='Subtitle.TLabel').grid(row=0, column=0, sticky='w', pady=5)
@@ -449,6 +579,18 @@ class InvestmentCalculator:
         ttk.Label(risk_frame, text="Risk %:", style='Subtitle.TLabel').grid(row=0, column=0, sticky='w', pady=5)
         ttk.Entry(risk_frame, textvariable=self.risk_percentage_var, font=('Arial', 11), width=10).grid(row=0, column=1, padx=(10, 0), pady=5)
         ttk.Button(risk_frame, text="⚠️ Calculate Risk", command=self.calculate_risk_analysis, style='Danger.TButton').grid(row=1, column=0, columnspan=2, pady=10)
+        ttk.Button(risk_frame, text="🧾 Tax Report (FY)", command=self.generate_tax_report, style='Accent.TButton').grid(row=2, column=0, columnspan=2)
+        alert_frame = ttk.LabelFrame(portfolio_tab, text="🔔 Price Alerts (Trading tab market)", padding=10)
+        alert_frame.pack(fill='x', pady=(0, 10))
+        ttk.Label(alert_frame, text="Type:", style='Subtitle.TLabel').grid(row=0, column=0, sticky='w', pady=5)
+        ttk.Combobox(alert_frame, textvariable=self.alert_type_var, values=list(ALERT_TYPES), state='readonly', width=12).grid(row=0, column=1, padx=(10, 0), pady=5)
+        ttk.Label(alert_frame, text="Price (₹) / %:", style='Subtitle.TLabel').grid(row=1, column=0, sticky='w', pady=5)
+        ttk.Entry(alert_frame, textvariable=self.alert_value_var, font=('Arial', 11), width=10).grid(row=1, column=1, padx=(10, 0), pady=5)
+        ttk.Button(alert_frame, text="🔔 Add Alert", command=self.add_alert, style='Accent.TButton').grid(row=2, column=0, pady=10)
+        ttk.Button(alert_frame, text="📋 Show Alerts", command=self.show_alerts, style='Accent.TButton').grid(row=2, column=1, pady=10)
+        ttk.Button(alert_frame, text="🗑️ Clear Market", command=self.clear_market_alerts, style='Danger.TButton').grid(row=3, column=0, columnspan=2)
+        ttk.Label(alert_frame, textvariable=self.alert_count_var, style='Subtitle.TLabel').grid(row=4, column=0, columnspan=2, sticky='w', pady=(5, 0))
+        self.update_alert_count()
 
     def create_bottom_buttons(self, parent):
         button_frame = ttk.Frame(parent)
@@ -456,6 +598,7 @@ class InvestmentCalculator:
         ttk.Button(button_frame, text="🗑️ Clear", command=self.clear_results, style='Danger.TButton').pack(side='left', expand=True, fill='x', padx=2)
         ttk.Button(button_frame, text="💾 Save", command=self.save_results, style='Success.TButton').pack(side='left', expand=True, fill='x', padx=2)
         ttk.Button(button_frame, text="📊 Export", command=self.export_data, style='Accent.TButton').pack(side='left', expand=True, fill='x', padx=2)
+        ttk.Button(button_frame, text="📥 Import", command=self.import_data, style='Accent.TButton').pack(side='left', expand=True, fill='x', padx=2)
 
     def center_window(self):
         self.root.update_idletasks()
@@ -492,12 +635,10 @@ class InvestmentCalculator:
 +======================================================================+
 """
     def calculate_investable_amount(self):
+        from calc_engine import investable_amount
         principal = self.validate_input(self.principal_var.get(), "Principal Amount")
         if principal is None: return
-        platform_fee = principal * 0.005
-        gst_on_fee = platform_fee * 0.18
-        total_fees = platform_fee + gst_on_fee
-        investable_amount = principal - total_fees
+        breakdown = investable_amount(principal, self.fee_schedule)
         result = f"""
 +----------------------------------------------------------+
 |             INVESTABLE AMOUNT CALCULATION                |
@@ -505,25 +646,26 @@ class InvestmentCalculator:
 | PRINCIPAL:          {self.format_currency(principal):>25} |
 |                                                          |
 | FEE BREAKDOWN:                                           |
-|  - Platform Fee:    {self.format_currency(platform_fee):>25} |
-|  - GST on Fee:      {self.format_currency(gst_on_fee):>25} |
-|  - Total Fees:      {self.format_currency(total_fees):>25} |
+|  - Platform Fee:    {self.format_currency(breakdown.platform_fee):>25} |
+|  - GST on Fee:      {self.format_currency(breakdown.gst):>25} |
+|  - Total Fees:      {self.format_currency(breakdown.total_fees):>25} |
 |                                                          |
-| FINAL INVESTABLE:   {self.format_currency(investable_amount):>25} |
+| FINAL INVESTABLE:   {self.format_currency(breakdown.investable):>25} |
 +----------------------------------------------------------+
 """
         self.display_result(result)
         
     def calculate_required_principal(self):
+        from calc_engine import required_principal
         target_investable = self.validate_input(self.target_investable_var.get(), "Target Investable Amount")
         if target_investable is None: return
-        required_principal = target_investable / 0.9941
+        principal = required_principal(target_investable, self.fee_schedule)
         result = f"""
 +----------------------------------------------------------+
 |            REQUIRED PRINCIPAL CALCULATION                |
 +----------------------------------------------------------+
 | TARGET INVESTABLE:  {self.format_currency(target_investable):>25} |
-| REQUIRED PRINCIPAL: {self.format_currency(required_principal):>25} |
+| REQUIRED PRINCIPAL: {self.format_currency(principal):>25} |
 +----------------------------------------------------------+
 """
         self.display_result(result)
@@ -532,25 +674,46 @@ class InvestmentCalculator:
         quantity = self.validate_input(self.buy_quantity_var.get(), "Quantity")
         price = self.validate_input(self.buy_price_var.get(), "Average Price")
         if quantity is None or price is None: return
-        self.trading_data['buy_quantity'] = quantity
-        self.trading_data['buy_price'] = price
-        self.trading_data['total_invested'] = quantity * price
-        result = f"\n✅ Buy recorded: {quantity:.4f} units at {self.format_currency(price)} each.\nTotal Investment: {self.format_currency(self.trading_data['total_invested'])}\n"
+        market = self.current_market()
+        self.apply_trade(market, 'buy', quantity, price)
+        self.journal.record_trade(market, 'buy', quantity, price)
+        self.sync_trading_data(market)
+        self.portfolio.sync(market, self.live_price(market))
+        self.portfolio_refresh.schedule()
+        result = f"\n✅ Buy recorded: {quantity:.4f} {market} at {self.format_currency(price)} each.\nHolding: {self.trading_data['buy_quantity']:.4f} units, avg {self.format_currency(self.trading_data['buy_price'])}\nTotal Investment: {self.format_currency(self.trading_data['total_invested'])}\n"
         self.display_result(result)
 
+    def live_price(self, market):
+        ticker = self.crypto_by_market.get(market)
+        return ticker['last_price'] if ticker else None
+
+    def current_market(self):
+        return self.market_var.get().strip().upper() or "BTCINR"
+
+    def sync_trading_data(self, market):
+        """Mirror the ledger position for ``market`` into ``trading_data``."""
+        position = self.ledger.position(market)
+        self.trading_data['buy_quantity'] = position.quantity
+        self.trading_data['buy_price'] = position.average_price
+        self.trading_data['total_invested'] = position.cost
+
     def get_risk_level(self, risk_percentage):
-        if risk_percentage <= 5: return "CONSERVATIVE"
-        elif risk_percentage <= 10: return "MODERATE"
-        elif risk_percentage <= 15: return "AGGRESSIVE"
-        else: return "VERY HIGH RISK"
-
-    def update_portfolio_stats(self, portfolio_value, profit_loss, investment):
-        self.portfolio_value_var.set(self.format_currency(portfolio_value))
-        self.total_profit_var.set(f"{self.format_currency(profit_loss)}")
-        roi = (profit_loss / investment * 100) if investment > 0 else 0
-        self.roi_var.set(f"{self.format_percentage(roi)}")
+        from calc_engine import risk_level
+        return risk_level(risk_percentage)
+
+    def update_portfolio_stats(self):
+        """Show the live portfolio; labels are only touched when their text changes."""
+        summary = self.portfolio.summary()
+        text = (self.format_currency(summary.value), self.format_currency(summary.total_pnl),
+                self.format_percentage(summary.roi))
+        if text == self.portfolio_text: return
+        self.portfolio_text = text
+        for var, value in zip((self.portfolio_value_var, self.total_profit_var, self.roi_var), text):
+            var.set(value)
         
     def calculate_trading_pnl(self):
+        market = self.current_market()
+        self.sync_trading_data(market)
         if self.trading_data['total_invested'] == 0:
             messagebox.showwarning("Missing Data", "Please calculate investment details first!")
             return
@@ -561,61 +724,214 @@ class InvestmentCalculator:
             messagebox.showerror("Invalid Quantity", "Cannot sell more than you own!")
             return
             
-        gross_selling_amount = sell_quantity * sell_price
-        selling_platform_fee = gross_selling_amount * 0.005
-        gst_on_selling_fee = selling_platform_fee * 0.18
-        amount_after_platform_fees = gross_selling_amount - selling_platform_fee - gst_on_selling_fee
-        tds = amount_after_platform_fees * 0.01
-        final_withdrawal_amount = amount_after_platform_fees - tds
-        proportional_invested = (sell_quantity / self.trading_data['buy_quantity']) * self.trading_data['total_invested']
-        profit_loss = final_withdrawal_amount - proportional_invested
+        # Matched against open lots, so partial sells reduce the holding
+        pnl = self.apply_trade(market, 'sell', sell_quantity, sell_price)
+        self.journal.record_trade(market, 'sell', sell_quantity, sell_price, pnl=pnl)
+        self.sync_trading_data(market)
         result = f"""
 +----------------------------------------------------------+
 |                  TRADING P&L ANALYSIS                    |
 +----------------------------------------------------------+
-| GROSS SELL AMT:     {self.format_currency(gross_selling_amount):>25} |
-| FINAL WITHDRAWAL:   {self.format_currency(final_withdrawal_amount):>25} |
-| PROPORTIONAL COST:  {self.format_currency(proportional_invested):>25} |
+| GROSS SELL AMT:     {self.format_currency(pnl.gross):>25} |
+| FINAL WITHDRAWAL:   {self.format_currency(pnl.withdrawal):>25} |
+| MATCHED COST:       {self.format_currency(pnl.cost):>25} |
 |----------------------------------------------------------|
-| NET P&L:            {self.format_currency(profit_loss):>25} |
+| NET P&L:            {self.format_currency(pnl.pnl):>25} |
+| MARKET REALIZED:    {self.format_currency(self.ledger.realized_pnl(market)):>25} |
+| UNITS LEFT:         {self.trading_data['buy_quantity']:>25.4f} |
 +----------------------------------------------------------+
-"""
+""" + self.format_book_fill(market, sell_quantity, pnl)
         self.display_result(result)
-        self.update_portfolio_stats(final_withdrawal_amount, profit_loss, proportional_invested)
+        self.portfolio.record_sell(market, pnl)
+        self.portfolio_refresh.schedule()
         
+    def format_book_fill(self, market, sell_quantity, pnl):
+        """What the sell would fetch at the market's live bids, if a fresh book is cached."""
+        from calc_engine import trade_pnl
+        book = self.order_books.get(market)
+        if book is None or not book.bids.prices: return ""
+        fill = book.sell(sell_quantity)
+        at_book = trade_pnl(fill.average_price, fill.filled, pnl.cost * fill.filled / sell_quantity,
+                            self.fee_schedule)
+        lines = [
+            f"|{'AT ORDER BOOK DEPTH'.center(58)}|",
+            "+----------------------------------------------------------+",
+            f"| BOOK FILL (VWAP):   {self.format_currency(fill.average_price):>25} |",
+            f"| WORST LEVEL:        {self.format_currency(fill.worst_price):>25} |",
+            f"| SLIPPAGE VS BID:    {self.format_percentage(fill.slippage * 100):>25} |",
+            f"| NET P&L @ BOOK:     {self.format_currency(at_book.pnl):>25} |",
+        ]
+        if fill.filled < sell_quantity:
+            lines.append(f"| UNFILLED (THIN):    {sell_quantity - fill.filled:>25.4f} |")
+        lines.append("+----------------------------------------------------------+")
+        return "\n".join(lines) + "\n"
+
     def calculate_risk_analysis(self):
+        from calc_engine import risk_analysis
         risk_percentage = self.validate_input(self.risk_percentage_var.get(), "Risk Percentage")
         if risk_percentage is None: return
+        market = self.current_market()
+        self.sync_trading_data(market)
         if self.trading_data['total_invested'] == 0:
             messagebox.showinfo("No Data", "Calculate investment first!")
             return
-        total_investment = self.trading_data['total_invested']
-        risk_amount = total_investment * (risk_percentage / 100)
-        stop_loss_price = self.trading_data['buy_price'] * (1 - risk_percentage / 100)
+        report = risk_analysis(self.trading_data['total_invested'], self.trading_data['buy_price'], risk_percentage)
         result = f"""
 +----------------------------------------------------------+
 |                   RISK ANALYSIS REPORT                   |
 +----------------------------------------------------------+
-| RISK LEVEL:         {self.get_risk_level(risk_percentage):>25} |
-| RISK AMOUNT:        {self.format_currency(risk_amount):>25} |
-| SUGGESTED STOP-LOSS:{self.format_currency(stop_loss_price):>25} |
+| RISK LEVEL:         {report.level:>25} |
+| RISK AMOUNT:        {self.format_currency(report.risk_amount):>25} |
+| SUGGESTED STOP-LOSS:{self.format_currency(report.stop_loss):>25} |
+| STOP-LOSS ALERT:    {'Armed':>25} |
 +----------------------------------------------------------+
 """
+        self.alerts.set_stop_loss(market, report.stop_loss)
+        self.update_alert_count()
         self.display_result(result)
-    
+        self.start_risk_simulation(market, report.stop_loss)
+
+    def add_alert(self):
+        market = self.current_market()
+        kind = ALERT_TYPES[self.alert_type_var.get()]
+        if kind == 'percent':
+            try:
+                percent = float(self.alert_value_var.get())
+            except ValueError:
+                messagebox.showerror("Invalid Input", "% Change must be a valid number (negative for a fall)!")
+                return
+            reference = self.live_price(market)
+            if reference is None or percent == 0:
+                messagebox.showerror("Invalid Input", f"Need a live {market} price and a non-zero % change!")
+                return
+            alert = self.alerts.add_percent(market, percent, reference)
+        else:
+            threshold = self.validate_input(self.alert_value_var.get(), "Alert Price")
+            if threshold is None: return
+            alert = self.alerts.add(market, kind, threshold)
+        self.update_alert_count()
+        self.display_result(f"\n🔔 Alert set on {market}: {alert.label} (fires {alert.side} {self.format_currency(alert.threshold)})\n")
+
+    def show_alerts(self):
+        market = self.current_market()
+        alerts = self.alerts.active(market)
+        lines = [f"| {a.side.upper():<6}{self.format_currency(a.threshold):>16} {a.label[:33]:<33} |" for a in alerts]
+        self.display_result(f"""
++----------------------------------------------------------+
+| ACTIVE ALERTS - {market:<40} |
++----------------------------------------------------------+
+""" + ("\n".join(lines) or f"| {'No alerts':<56} |") + """
++----------------------------------------------------------+
+""")
+
+    def clear_market_alerts(self):
+        market = self.current_market()
+        count = self.alerts.cancel_market(market)
+        self.update_alert_count()
+        self.display_result(f"\n🗑️ Cleared {count} alert(s) on {market}.\n")
+
+    def update_alert_count(self):
+        self.alert_count_var.set(f"Active alerts: {len(self.alerts):,}")
+
+    def show_triggered_alerts(self, triggers):
+        """Report fired alerts; a burst is listed up to ``ALERT_DISPLAY_LIMIT``."""
+        lines = [f"| {t.alert.market:<10}{t.alert.label[:25]:<25}{self.format_currency(t.price):>21} |"
+                 for t in triggers[:ALERT_DISPLAY_LIMIT]]
+        if len(triggers) > ALERT_DISPLAY_LIMIT:
+            lines.append(f"| {f'... and {len(triggers) - ALERT_DISPLAY_LIMIT:,} more':<56} |")
+        self.display_result("""
++----------------------------------------------------------+
+|                  PRICE ALERTS TRIGGERED                  |
++----------------------------------------------------------+
+""" + "\n".join(lines) + """
++----------------------------------------------------------+
+""")
+        self.update_alert_count()
+        self.root.bell()
+
+    def start_risk_simulation(self, market, stop_loss):
+        """Simulate the position from archived prices, streaming estimates into the results pane."""
+        from risk_engine import MonteCarloRisk, historical_returns
+        if self.risk_run is not None:
+            self.risk_run.cancel()
+        if self.risk_engine is None:
+            self.risk_engine = MonteCarloRisk()
+        position = self.ledger.position(market)
+        ticker = self.crypto_by_market.get(market)
+        mark_price = ticker['last_price'] if ticker else position.average_price
+        archive = self.tick_archive
+        run = self.risk_engine.start(lambda: historical_returns(archive.rows(market)),
+                                     position.quantity, mark_price, stop_loss)
+        self.risk_run = run
+        self.poll_risk_simulation(run, market, f"risk-{id(run)}")
+
+    def poll_risk_simulation(self, run, market, tag):
+        if run is not self.risk_run: return  # superseded by a newer run
+        done = run.done.is_set()
+        estimate = run.take()
+        if estimate is not None:
+            self.display_live_result(tag, self.format_risk_simulation(market, estimate))
+        if not done:
+            self.root.after(100, self.poll_risk_simulation, run, market, tag)
+        elif run.error is not None:
+            self.display_live_result(tag, f"Monte Carlo risk for {market} skipped: {run.error}")
+
+    def generate_tax_report(self):
+        """Run the current fiscal year's tax report over the journal off the Tk thread."""
+        import threading
+        from concurrent.futures import Future
+        from tax_report import TaxReport
+        if self.tax_job is not None and not self.tax_job.done(): return
+        job = self.tax_job = Future()
+        journal, schedule = self.journal, self.fee_schedule
+
+        def run():
+            try:
+                report = TaxReport(schedule=schedule).feed(trade[1:] for trade in journal.iter_all_trades())
+                job.set_result(report.format_text())
+            except Exception as e:
+                job.set_exception(e)
+
+        threading.Thread(target=run, name='tax-report', daemon=True).start()
+        self.poll_tax_report(job)
+
+    def poll_tax_report(self, job):
+        if not job.done():
+            self.root.after(100, self.poll_tax_report, job)
+        elif job.exception() is not None:
+            self.display_result(f"\nTax report failed: {job.exception()}\n")
+        else:
+            self.display_result("\n" + job.result() + "\n")
+
+    def format_risk_simulation(self, market, estimate):
+        confidence = f"{estimate.confidence:.0%}"
+        return f"""+----------------------------------------------------------+
+|            MONTE CARLO RISK - {market:<12} (24H)         |
++----------------------------------------------------------+
+| PATHS:              {f"{estimate.paths:,} / {estimate.total_paths:,}":>25} |
+| VaR ({confidence}):          {self.format_currency(estimate.var):>25} |
+| CVaR ({confidence}):         {self.format_currency(estimate.cvar):>25} |
+| STOP-LOSS HIT ODDS: {self.format_percentage(estimate.stop_hit_probability * 100):>25} |
+| EXPECTED P&L:       {self.format_currency(estimate.expected_pnl):>25} |
++----------------------------------------------------------+
+"""
+
     def display_result(self, result):
-        self.results_text.insert(tk.END, result + "\n")
-        self.results_text.see(tk.END)
+        self.results_view.append(result)
         
+    def display_live_result(self, tag, result):
+        """Show ``result`` in place of the previous block with the same ``tag``."""
+        self.results_view.replace(tag, result)
+
     def clear_results(self):
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, self.format_welcome_message())
+        self.results_view.clear()
+        self.results_view.append(self.format_welcome_message())
         
     def save_results(self):
         filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt")])
         if filename:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(self.results_text.get(1.0, tk.END))
+                self.results_log.write_text(f)
             messagebox.showinfo("Success", "Results saved!")
 
     def export_data(self):
@@ -626,13 +942,61 @@ class InvestmentCalculator:
                 json.dump(data, f, indent=2)
             messagebox.showinfo("Success", "Data exported!")
 
+    def import_data(self):
+        filename = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        if filename:
+            try:
+                trades = self.journal.import_export(filename)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Import Failed", f"Could not import {os.path.basename(filename)}:\n{e}")
+                return
+            self.rebuild_ledger()
+            self.sync_trading_data(self.current_market())
+            self.portfolio_refresh.schedule()
+            messagebox.showinfo("Success", f"Imported {len(trades)} trade(s) into the journal!")
+
+    def rebuild_ledger(self):
+        """Replay the journal into a fresh ledger, in time order as at startup.
+
+        Imported trades keep their original times, so they may belong before
+        lots already held; applying them on top would match sells against
+        the wrong lots.
+        """
+        from ledger import TradeLedger
+        ledger, unmatched = replay(self.journal, TradeLedger(self.ledger.method, self.fee_schedule))
+        self.ledger = self.portfolio.ledger = ledger
+        self.portfolio.rebuild()
+        if unmatched:
+            messagebox.showwarning("Trade Journal", f"{unmatched:,} journaled sell(s) exceeded the holding "
+                                   "and were left out of the ledger.")
+
     def run(self):
         self.root.mainloop()
 
 # --- Updated Main Execution Block ---
-def main():
+def main(argv=None):
+    import argparse
+    from snapshot_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL
+    parser = argparse.ArgumentParser(description="Investment & Trading Calculator Pro")
+    parser.add_argument('--diagnostics', action='store_true',
+                        help="open the diagnostics panel (live p50/p99 timings) at start")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="profile the session; cProfile stats go to PATH and span stacks to PATH.folded on exit")
+    parser.add_argument('--service', metavar='URL',
+                        help="thin client: take prices from a local calc_service (e.g. http://127.0.0.1:8750) instead of CoinDCX")
+    parser.add_argument('--cache-ttl', type=float, metavar='SECONDS', default=DEFAULT_TTL,
+                        help="show cached prices at startup only if saved within SECONDS (default: %(default)d)")
+    parser.add_argument('--cache-max-kb', type=int, metavar='KB', default=DEFAULT_MAX_BYTES // 1024,
+                        help="size cap of the cached price snapshot; the busiest markets are kept (default: %(default)d)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        instruments.enable()
+        instruments.start_profile()
+    warmup = StartupWarmup(service_url=args.service,
+                           snapshot_options={'ttl': args.cache_ttl, 'max_bytes': args.cache_max_kb * 1024})
     # Show splash screen first, which then launches the main app
-    splash = SplashScreen()
+    splash = SplashScreen(warmup, diagnostics=args.diagnostics, profile_path=args.profile,
+                          poll_interval=SERVICE_POLL_INTERVAL if args.service else None)
     splash.root.mainloop()
 
 if __name__ == "__main__":
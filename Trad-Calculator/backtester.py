@@ -0,0 +1,390 @@
+"""Backtest the stop-loss and sell-target rules over archived price history.
+
+Each market's daily OHLC bars are replayed through one strategy per
+``(risk %, sell target %)`` pair: buy at the open with the whole balance
+(platform fee and GST off the principal, as in the Investment tab), sell
+when a bar touches the stop-loss ``buy * (1 - risk %)`` or the target
+``buy * (1 + target %)``, then buy again at the next open. Sells go
+through the fee schedule (platform fee, GST, TDS). When one bar touches
+both, the stop is assumed hit first.
+
+    python -m backtester --risk 1:20:0.25 --target 2:100:2 -o sweep.csv --curves curves.csv
+"""
+import argparse
+import csv
+import math
+import multiprocessing
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; strategies fall back to one Python loop each
+    np = None
+
+from calc_engine import DEFAULT_SCHEDULE, FeeSchedule, risk_level, trade_pnl
+
+PRINCIPAL = 100_000.0
+PERIODS_PER_YEAR = 365
+MIN_BARS = 30
+TOP_COMBOS = 10
+DEFAULT_RISKS = '1:20:0.25'
+DEFAULT_TARGETS = '2:100:2'
+
+# Per-strategy results of one market; each field is an array (a list without NumPy)
+MarketResult = namedtuple('MarketResult', 'market bars final_equity max_drawdown trades wins stops sharpe')
+# Totals of one strategy across markets
+ComboStats = namedtuple('ComboStats', 'risk target markets mean_return median_return profitable max_drawdown '
+                                      'trades win_rate sharpe')
+SUMMARY_FIELDS = ComboStats._fields
+
+
+def parse_range(text):
+    """``'1:20:0.5'`` -> 1, 1.5, ... 20; a single number is itself."""
+    if ':' not in text: return [float(text)]
+    start, stop, step = (float(part) for part in text.split(':'))
+    if step <= 0 or stop < start: raise ValueError(f"bad range {text!r}")
+    return [round(start + i * step, 10) for i in range(int((stop - start) / step + 1e-9) + 1)]
+
+
+def parameter_grid(risks, targets):
+    """Every ``(risk, target)`` pair as two parallel flat sequences."""
+    risk_grid = [r for r in risks for _ in targets]
+    target_grid = [t for _ in risks for t in targets]
+    if np is not None: return np.array(risk_grid), np.array(target_grid)
+    return risk_grid, target_grid
+
+
+def bars_from_daily(daily):
+    """``(open, high, low, close)`` columns from ``TickArchive.daily`` rows."""
+    if np is not None:
+        return tuple(np.array(daily[name], dtype=np.float64) for name in ('open', 'high', 'low', 'close'))
+    columns = list(zip(*daily)) or [()] * 6
+    return tuple(list(column) for column in columns[1:5])
+
+
+def backtest(bars, risks, targets, principal=PRINCIPAL, schedule=DEFAULT_SCHEDULE, curves=False,
+             periods_per_year=PERIODS_PER_YEAR, market=''):
+    """Replay ``bars`` through every ``(risks[k], targets[k])`` strategy at once.
+
+    Returns a ``MarketResult`` and, with ``curves``, the bar-by-bar
+    liquidation value of every strategy (bars x strategies). With NumPy the
+    strategies are columns of one array and each bar is a handful of array
+    operations; without it each strategy runs its own loop.
+    """
+    if np is None:
+        runs = [_backtest_one(bars, r, t, principal, schedule, curves, periods_per_year)
+                for r, t in zip(risks, targets)]
+        result = MarketResult(market, len(bars[0]), *(list(column) for column in zip(*(run[0] for run in runs))))
+        return result, ([run[1] for run in runs] if curves else None)
+
+    opens, highs, lows, closes = bars
+    stop_ratio = 1 - np.asarray(risks, dtype=np.float64) / 100
+    target_ratio = 1 + np.asarray(targets, dtype=np.float64) / 100
+    buy_factor = schedule.net_factor
+    # Sale proceeds are linear in the sale value, so one unit sale prices every exit
+    sell_factor = trade_pnl(1.0, 1.0, 0.0, schedule).withdrawal
+    count = len(stop_ratio)
+    cash = np.full(count, float(principal))
+    quantity = np.zeros(count)
+    cost = np.zeros(count)
+    stop = np.zeros(count)
+    target = np.zeros(count)
+    flat = np.ones(count, dtype=bool)
+    trades = np.zeros(count, dtype=np.int64)
+    wins = np.zeros(count, dtype=np.int64)
+    stops = np.zeros(count, dtype=np.int64)
+    equity = cash.copy()
+    peak = cash.copy()
+    max_drawdown = np.zeros(count)
+    return_sum = np.zeros(count)
+    return_squares = np.zeros(count)
+    curve = np.empty((len(opens), count)) if curves else None
+
+    for i in range(len(opens)):
+        price = opens[i]
+        if flat.any():
+            quantity = np.where(flat, cash * (buy_factor / price), quantity)
+            cost = np.where(flat, cash, cost)
+            stop = np.where(flat, price * stop_ratio, stop)
+            target = np.where(flat, price * target_ratio, target)
+            cash = np.where(flat, 0.0, cash)
+        hit_stop = lows[i] <= stop
+        exits = hit_stop | (highs[i] >= target)
+        if exits.any():
+            # A gap through the stop or target fills at the open
+            fill = np.where(hit_stop, np.minimum(stop, price), np.maximum(target, price))
+            proceeds = quantity * fill * sell_factor
+            cash = np.where(exits, proceeds, cash)
+            quantity = np.where(exits, 0.0, quantity)
+            trades += exits
+            wins += exits & (proceeds > cost)
+            stops += hit_stop
+        flat = exits
+        previous = equity
+        equity = cash + quantity * (closes[i] * sell_factor)
+        np.maximum(peak, equity, out=peak)
+        np.maximum(max_drawdown, 1 - equity / peak, out=max_drawdown)
+        step = equity / previous - 1
+        return_sum += step
+        return_squares += step * step
+        if curves: curve[i] = equity
+
+    bars_count = len(opens)
+    mean = return_sum / max(bars_count, 1)
+    std = np.sqrt(np.maximum(return_squares / max(bars_count, 1) - mean * mean, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * math.sqrt(periods_per_year), 0.0)
+    return MarketResult(market, bars_count, equity, max_drawdown, trades, wins, stops, sharpe), curve
+
+
+def _backtest_one(bars, risk, target_pct, principal, schedule, curves, periods_per_year):
+    """One strategy bar by bar: the same rules as ``backtest``, without NumPy."""
+    buy_factor = schedule.net_factor
+    sell_factor = trade_pnl(1.0, 1.0, 0.0, schedule).withdrawal
+    stop_ratio, target_ratio = 1 - risk / 100, 1 + target_pct / 100
+    cash, quantity, cost, stop, target = float(principal), 0.0, 0.0, 0.0, 0.0
+    trades = wins = stops = 0
+    equity = peak = cash
+    max_drawdown = return_sum = return_squares = 0.0
+    curve = [] if curves else None
+    flat = True
+    for price, high, low, close in zip(*bars):
+        if flat:
+            quantity, cost = cash * (buy_factor / price), cash
+            stop, target, cash = price * stop_ratio, price * target_ratio, 0.0
+        hit_stop = low <= stop
+        flat = hit_stop or high >= target
+        if flat:
+            fill = min(stop, price) if hit_stop else max(target, price)
+            cash, quantity = quantity * fill * sell_factor, 0.0
+            trades += 1
+            wins += cash > cost
+            stops += hit_stop
+        previous, equity = equity, cash + quantity * (close * sell_factor)
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, 1 - equity / peak)
+        step = equity / previous - 1
+        return_sum += step
+        return_squares += step * step
+        if curves: curve.append(equity)
+    count = max(len(bars[0]), 1)
+    mean = return_sum / count
+    std = math.sqrt(max(return_squares / count - mean * mean, 0.0))
+    sharpe = mean / std * math.sqrt(periods_per_year) if std > 0 else 0.0
+    return (equity, max_drawdown, trades, wins, stops, sharpe), curve
+
+
+class SweepResult:
+    """Per-market results of a sweep over one parameter grid."""
+
+    def __init__(self, risks, targets, principal, results, elapsed):
+        self.risks = risks
+        self.targets = targets
+        self.principal = principal
+        self.results = results
+        self.elapsed = elapsed
+
+    def combos(self):
+        """``ComboStats`` of every strategy across all markets, grid order."""
+        if not self.results: return []
+        principal = self.principal
+        if np is not None:
+            returns = np.array([r.final_equity for r in self.results]) / principal - 1
+            trades = np.sum([r.trades for r in self.results], axis=0)
+            wins = np.sum([r.wins for r in self.results], axis=0)
+            columns = (self.risks, self.targets, np.full(len(self.risks), len(self.results)),
+                       returns.mean(axis=0), np.median(returns, axis=0), (returns > 0).mean(axis=0),
+                       np.mean([r.max_drawdown for r in self.results], axis=0), trades,
+                       np.divide(wins, trades, out=np.zeros(len(trades)), where=trades > 0),
+                       np.mean([r.sharpe for r in self.results], axis=0))
+            return [ComboStats(*row) for row in zip(*(np.asarray(c).tolist() for c in columns))]
+        stats = []
+        markets = len(self.results)
+        for k, (risk, target) in enumerate(zip(self.risks, self.targets)):
+            returns = sorted(r.final_equity[k] / principal - 1 for r in self.results)
+            trades = sum(r.trades[k] for r in self.results)
+            wins = sum(r.wins[k] for r in self.results)
+            median = (returns[(markets - 1) // 2] + returns[markets // 2]) / 2
+            stats.append(ComboStats(risk, target, markets, sum(returns) / markets, median,
+                                    sum(1 for x in returns if x > 0) / markets,
+                                    sum(r.max_drawdown[k] for r in self.results) / markets, trades,
+                                    wins / trades if trades else 0.0,
+                                    sum(r.sharpe[k] for r in self.results) / markets))
+        return stats
+
+    def best(self, count=TOP_COMBOS, key='mean_return'):
+        return sorted(self.combos(), key=lambda s: -getattr(s, key))[:count]
+
+    def best_by_risk_level(self):
+        """Best strategy (by mean return) within each ``risk_level`` band."""
+        best = {}
+        for stats in self.combos():
+            level = risk_level(stats.risk)
+            if level not in best or stats.mean_return > best[level].mean_return:
+                best[level] = stats
+        return best
+
+    def format_text(self, top=TOP_COMBOS):
+        """Boxed summary in the style of the results pane."""
+        def pct(x): return f"{x * 100:,.1f}%"
+        bars = sum(r.bars for r in self.results)
+        lines = [
+            "+----------------------------------------------------------+",
+            "|                 STOP-LOSS BACKTEST SWEEP                 |",
+            "+----------------------------------------------------------+",
+            f"| MARKETS:            {len(self.results):>25,} |",
+            f"| DAILY BARS:         {bars:>25,} |",
+            f"| STRATEGIES:         {len(self.risks):>25,} |",
+            f"| ELAPSED:            {f'{self.elapsed:,.1f} s':>25} |",
+            "+----------------------------------------------------------+",
+            f"| {'RISK%':>6}{'TARGET%':>8}{'MEAN RET':>11}{'MEDIAN':>9}{'MAX DD':>8}{'WIN':>7}{'SHARPE':>7} |",
+        ]
+        def row(s):
+            return (f"| {s.risk:>6g}{s.target:>8g}{pct(s.mean_return):>11}{pct(s.median_return):>9}"
+                    f"{pct(s.max_drawdown):>8}{pct(s.win_rate):>7}{s.sharpe:>7.2f} |")
+        lines += [row(s) for s in self.best(top)]
+        lines += ["+----------------------------------------------------------+",
+                  f"| {'BEST PER RISK LEVEL':<56} |"]
+        by_level = self.best_by_risk_level()
+        for level in sorted(by_level, key=lambda name: by_level[name].risk):
+            lines.append(f"| {level:<56} |")
+            lines.append(row(by_level[level]))
+        lines.append("+----------------------------------------------------------+")
+        return "\n".join(lines)
+
+    def write_summary(self, f):
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_FIELDS + ('risk_level',))
+        for stats in self.combos():
+            writer.writerow((*stats, risk_level(stats.risk)))
+
+
+class Backtester:
+    """Fans a parameter sweep out over a process pool, one market per task.
+
+    The pool is created on first use with the ``spawn`` start method, like
+    ``MonteCarloRisk``'s, so it is safe to start from the app as well.
+    """
+
+    def __init__(self, max_workers=None, schedule=DEFAULT_SCHEDULE, principal=PRINCIPAL):
+        self.max_workers = max_workers
+        self.schedule = schedule
+        self.principal = principal
+        self.executor = None
+
+    def pool(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.executor
+
+    def _run(self, series, risks, targets, curves, on_progress):
+        pool = self.pool()
+        futures = [pool.submit(backtest, bars, risks, targets, self.principal, self.schedule, curves, market=market)
+                   for market, bars in series.items() if len(bars[0]) >= MIN_BARS]
+        done = []
+        try:
+            for future in as_completed(futures):
+                done.append(future.result())
+                if on_progress is not None: on_progress(len(done), len(futures))
+        finally:
+            for future in futures:
+                future.cancel()
+        return sorted(done, key=lambda item: item[0].market)
+
+    def sweep(self, series, risks, targets, on_progress=None):
+        """Backtest every ``(risk, target)`` pair of the grid on every market.
+
+        ``series`` maps market -> ``(open, high, low, close)`` columns;
+        markets with fewer than ``MIN_BARS`` bars are skipped.
+        ``on_progress(done, total)`` is called as markets finish.
+        """
+        risk_grid, target_grid = parameter_grid(risks, targets)
+        start = time.perf_counter()
+        results = [result for result, _ in self._run(series, risk_grid, target_grid, False, on_progress)]
+        return SweepResult(risk_grid, target_grid, self.principal, results, time.perf_counter() - start)
+
+    def equity_curves(self, series, combos):
+        """``{(market, risk, target): equity per bar}`` for a few strategies."""
+        risks = [c.risk for c in combos]
+        targets = [c.target for c in combos]
+        curves = {}
+        for result, curve in self._run(series, risks, targets, True, None):
+            for k, (risk, target) in enumerate(zip(risks, targets)):
+                curves[result.market, risk, target] = curve[:, k].tolist() if np is not None else curve[k]
+        return curves
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def load_series(archive, quote='INR'):
+    """Daily bars of every archived market quoted in ``quote``, rollups refreshed first."""
+    series = {}
+    for market in archive.markets():
+        if not market.endswith(quote): continue
+        archive.compact(market)
+        rollup = archive.rollup_tape(market)
+        series[market] = bars_from_daily(rollup.view() if np is not None else rollup.rows())
+    return series
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='backtester', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archive', help="tick archive directory (default: the app's)")
+    parser.add_argument('--quote', default='INR', help="markets quoted in this currency (default INR)")
+    parser.add_argument('--risk', default=DEFAULT_RISKS, help=f"risk %% start:stop:step (default {DEFAULT_RISKS})")
+    parser.add_argument('--target', default=DEFAULT_TARGETS,
+                        help=f"sell target %% start:stop:step (default {DEFAULT_TARGETS})")
+    parser.add_argument('--principal', type=float, default=PRINCIPAL)
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('-o', '--output', help="write every strategy's summary stats as CSV here")
+    parser.add_argument('--curves', help="write equity curves of the top strategies as CSV here")
+    parser.add_argument('--top', type=int, default=TOP_COMBOS)
+    parser.add_argument('--platform-fee', type=float, default=0.005)
+    parser.add_argument('--gst', type=float, default=0.18)
+    parser.add_argument('--tds', type=float, default=0.01)
+    args = parser.parse_args(argv)
+    try:
+        risks, targets = parse_range(args.risk), parse_range(args.target)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from tick_archive import TickArchive
+    archive = TickArchive(args.archive)
+    try:
+        series = load_series(archive, args.quote)
+    finally:
+        archive.close()
+    if not any(len(bars[0]) >= MIN_BARS for bars in series.values()):
+        parser.exit(1, f"backtester: no {args.quote} market has {MIN_BARS} days of archived prices yet\n")
+
+    backtester = Backtester(args.workers, FeeSchedule(args.platform_fee, args.gst, args.tds), args.principal)
+    try:
+        def progress(done, total):
+            sys.stderr.write(f"\rbacktester: {done:,}/{total:,} markets")
+        sweep = backtester.sweep(series, risks, targets, on_progress=progress)
+        sys.stderr.write(f"\rbacktester: {len(sweep.results):,} markets x {len(sweep.risks):,} strategies "
+                         f"in {sweep.elapsed:.1f} s\n")
+        print(sweep.format_text(args.top))
+        if args.output:
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                sweep.write_summary(f)
+        if args.curves:
+            curves = backtester.equity_curves(series, sweep.best(args.top))
+            with open(args.curves, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(('market', 'risk', 'target', 'bar', 'equity'))
+                for (market, risk, target), curve in sorted(curves.items()):
+                    writer.writerows((market, risk, target, i, equity) for i, equity in enumerate(curve))
+    finally:
+        backtester.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+"""Benchmarks for the calculator. Run from the Trad-Calculator directory,
+e.g. ``python -m benchmarks.bench_crypto_list``."""
@@ -0,0 +1,79 @@
+"""Alert engine: cost of checking one ticker poll against 100k active alerts.
+
+Spreads ``--alerts`` above/below thresholds over ``--markets`` markets
+around a random walk, then feeds ``--polls`` polls in which every market
+moves. Each poll is checked by ``AlertEngine.check`` (bisect on sorted
+per-market books) and by a linear scan over every live alert; both must
+fire the same alerts. Thresholds are re-armed as they fire so the active
+count stays at ``--alerts``.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from alerts import ABOVE, BELOW, PRICE, AlertEngine
+
+
+def scan(alerts, prices):
+    """The naive check: test every live alert against its market's price."""
+    fired = []
+    for alert_id, (market, side, threshold) in alerts.items():
+        price = prices.get(market)
+        if price is None: continue
+        if price >= threshold if side == ABOVE else price <= threshold:
+            fired.append(alert_id)
+    for alert_id in fired:
+        del alerts[alert_id]
+    return fired
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--alerts', type=int, default=100_000)
+    parser.add_argument('--markets', type=int, default=500)
+    parser.add_argument('--polls', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    markets = [f"C{i:04d}INR" for i in range(args.markets)]
+    prices = {m: rng.uniform(10, 10_000) for m in markets}
+
+    def specs(count):
+        for _ in range(count):
+            market = rng.choice(markets)
+            side = rng.choice((ABOVE, BELOW))
+            offset = rng.uniform(0.001, 0.2)
+            threshold = prices[market] * (1 + offset if side == ABOVE else 1 - offset)
+            yield market, PRICE, side, threshold, ''
+
+    engine = AlertEngine()
+    t = time.perf_counter()
+    added = engine.add_many(specs(args.alerts))
+    print(f"{args.alerts:,} alerts over {args.markets} markets indexed in {(time.perf_counter() - t) * 1000:.0f} ms")
+    naive = {a.id: (a.market, a.side, a.threshold) for a in added}
+
+    indexed, linear, fired = [], [], 0
+    for _ in range(args.polls):
+        for m in markets:
+            prices[m] *= rng.uniform(0.99, 1.01)
+        t = time.perf_counter()
+        triggers = engine.check(prices.items())
+        indexed.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        expected = scan(naive, prices)
+        linear.append(time.perf_counter() - t)
+        assert sorted(tr.alert.id for tr in triggers) == sorted(expected), "indexed and linear checks disagree"
+        fired += len(triggers)
+        for alert in engine.add_many(specs(len(triggers))):
+            naive[alert.id] = (alert.market, alert.side, alert.threshold)
+
+    assert len(engine) == args.alerts
+    fast, slow = statistics.median(indexed), statistics.median(linear)
+    print(f"{args.polls} polls, {fired / args.polls:,.0f} alerts fired per poll on average")
+    print(f"indexed check: {fast * 1000:8.2f} ms per poll (p50), {max(indexed) * 1000:.2f} ms worst")
+    print(f"linear scan:   {slow * 1000:8.2f} ms per poll (p50), {slow / fast:.0f}x slower")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Backtest sweep: vectorized strategies on a process pool vs one loop each.
+
+Sweeps the default ``(risk %, sell target %)`` grid over ``--markets``
+synthetic random walks of ``--days`` daily bars, the shape of a full
+sweep across the archived INR markets. The per-strategy Python loop (the
+fallback without NumPy) runs a sample of strategies on one market to
+check it matches and to estimate how long the full sweep would take that
+way.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from backtester import (DEFAULT_RISKS, DEFAULT_SCHEDULE, DEFAULT_TARGETS, PRINCIPAL, PERIODS_PER_YEAR, Backtester,
+                        _backtest_one, parameter_grid, parse_range)
+from benchmarks.synthetic import synthetic_daily_bars
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=500)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--sample', type=int, default=100, help="strategies timed with the per-strategy loop")
+    args = parser.parse_args(argv)
+
+    lists = {f"C{i:03d}INR": synthetic_daily_bars(args.days, seed=i) for i in range(args.markets)}
+    series = {market: tuple(np.array(column) for column in bars) for market, bars in lists.items()}
+    risks, targets = parse_range(DEFAULT_RISKS), parse_range(DEFAULT_TARGETS)
+    backtester = Backtester(args.workers)
+    try:
+        backtester.pool().submit(int).result()  # start the workers outside the timing
+        sweep = backtester.sweep(series, risks, targets)
+        best = sweep.best(3)
+        t = time.perf_counter()
+        curves = backtester.equity_curves(series, best)
+        curve_time = time.perf_counter() - t
+    finally:
+        backtester.shutdown()
+    strategies = len(sweep.risks)
+    print(f"{args.markets:,} markets x {args.days:,} days x {strategies:,} strategies")
+    print(f"vectorized sweep:   {sweep.elapsed:8.1f} s "
+          f"({args.markets * args.days * strategies / sweep.elapsed / 1e6:,.0f}M strategy-bars/s)")
+    print(f"equity curves:      {curve_time:8.1f} s for the top {len(best)} strategies ({len(curves):,} curves)")
+
+    market = next(iter(lists))
+    first = sweep.results[0]
+    risk_grid, target_grid = parameter_grid(risks, targets)
+    picks = random.Random(0).sample(range(strategies), min(args.sample, strategies))
+    t = time.perf_counter()
+    for k in picks:
+        (equity, drawdown, trades, *_), _ = _backtest_one(lists[market], risk_grid[k], target_grid[k], PRINCIPAL,
+                                                          DEFAULT_SCHEDULE, False, PERIODS_PER_YEAR)
+        assert abs(equity - first.final_equity[k]) <= 1e-6 * max(equity, 1) and trades == first.trades[k]
+    per_strategy = (time.perf_counter() - t) / len(picks)
+    print(f"per-strategy loop:  {per_strategy * 1000:8.2f} ms per strategy-market, "
+          f"~{per_strategy * strategies * args.markets / 60:,.0f} min for the sweep on one core")
+    print()
+    print(sweep.format_text(5))
+
+
+if __name__ == '__main__':
+    main()
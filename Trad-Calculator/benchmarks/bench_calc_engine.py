@@ -0,0 +1,54 @@
+"""Per-trade Python loop vs. the batched fee/P&L engine.
+
+Runs investable amount, required principal and trade P&L over synthetic
+trade arrays. The batched path is vectorized when NumPy is installed.
+"""
+import argparse
+import random
+import time
+
+import calc_engine
+from calc_engine import (batch_investable, batch_required_principal, batch_trade_pnl,
+                         investable_amount, required_principal, trade_pnl)
+
+
+def synthetic_trades(count, seed=0):
+    rng = random.Random(seed)
+    prices = [rng.uniform(1, 5_000_000) for _ in range(count)]
+    quantities = [rng.uniform(0.001, 100) for _ in range(count)]
+    costs = [p * q * rng.uniform(0.8, 1.2) for p, q in zip(prices, quantities)]
+    return prices, quantities, costs
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trades', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"batched path: {'numpy' if calc_engine.np is not None else 'pure python'}")
+    print(f"{'calc':<20} {'trades':>9} {'loop s':>8} {'batch s':>8} {'speedup':>8} {'batch trades/s':>15}")
+    for count in args.trades:
+        prices, quantities, costs = synthetic_trades(count)
+        columns = (prices, quantities, costs)
+        if calc_engine.np is not None:
+            # Hand the batch path arrays, as a columnar caller would
+            columns = tuple(calc_engine.np.asarray(v) for v in columns)
+        cases = (
+            ('investable_amount', lambda: [investable_amount(p) for p in costs], lambda: batch_investable(columns[2])),
+            ('required_principal', lambda: [required_principal(p) for p in costs], lambda: batch_required_principal(columns[2])),
+            ('trade_pnl', lambda: [trade_pnl(p, q, c) for p, q, c in zip(prices, quantities, costs)],
+             lambda: batch_trade_pnl(*columns)),
+        )
+        for name, loop, batch in cases:
+            loop_s, batch_s = timed(loop), timed(batch)
+            print(f"{name:<20} {count:>9} {loop_s:>8.3f} {batch_s:>8.4f} {loop_s / batch_s:>7.0f}x {count / batch_s:>15,.0f}")
+
+
+if __name__ == '__main__':
+    main()
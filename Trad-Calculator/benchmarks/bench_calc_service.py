@@ -0,0 +1,147 @@
+"""Calculation service load test over loopback.
+
+Starts ``calc_service`` in a child process, polling the local stand-in
+ticker server, and drives it from ``--clients`` keep-alive connections
+for ``--seconds`` per scenario: live-price lookups, single calculations
+drawn from ``--distinct`` inputs (mostly response-cache hits), uncached
+single calculations, and ``--batch``-record batches. Reports requests/s,
+records/s and p50/p99 latency per scenario, plus the upstream polls the
+service made for all of it.
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.standin_server import StandInServer
+from benchmarks.synthetic import synthetic_tickers
+
+
+def start_service(upstream, poll_interval):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'calc_service', '--port', '0', '--poll-interval', str(poll_interval),
+         '--upstream-url', upstream.url, '--order-book-url', upstream.order_book_url],
+        stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if 'serving on' not in line:
+        process.kill()
+        sys.exit(f"calc_service did not start: {line!r}")
+    url = line.split('serving on ')[1].split()[0]
+    return process, url.rsplit(':', 1)[1]
+
+
+def wait_for_ticker(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request('GET', '/exchange/ticker')
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        if response.status == 200: return json.loads(body)
+        time.sleep(0.2)
+    sys.exit("calc_service never got a ticker")
+
+
+def health(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('GET', '/health')
+    result = json.loads(connection.getresponse().read())
+    connection.close()
+    return result
+
+
+def drive(port, clients, seconds, make_request):
+    """Run ``make_request(rng) -> (method, path, body, records)`` on every connection."""
+    latencies, records, errors = [], [0], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        mine, count, failed = [], 0, 0
+        while time.perf_counter() < deadline:
+            method, path, body, n = make_request(rng)
+            start = time.perf_counter()
+            connection.request(method, path, body, {'Content-Type': 'application/json'} if body else {})
+            response = connection.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            if response.status == 200: count += n
+            else: failed += 1
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            records[0] += count
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests_per_second': len(latencies) / elapsed,
+        'records_per_second': records[0] / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)] * 1000,
+        'errors': errors[0],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=500)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--distinct', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=100)
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    upstream = StandInServer(synthetic_tickers(args.markets)).start()
+    process, port = start_service(upstream, args.poll_interval)
+    try:
+        markets = [row['market'] for row in wait_for_ticker(port)]
+        hits_before = upstream.hits
+        principals = [json.dumps({'principal': 1000 + i}).encode() for i in range(args.distinct)]
+        fresh = iter(range(10 ** 9))
+
+        def batch_body(rng):
+            return json.dumps([{'sell_price': rng.uniform(90, 110), 'sell_quantity': rng.uniform(0.1, 5),
+                                'buy_price': 100.0} for _ in range(args.batch)]).encode()
+
+        scenarios = (
+            ('live price', lambda rng: ('GET', '/ticker/' + rng.choice(markets), None, 1)),
+            ('investable (cached)', lambda rng: ('POST', '/calc/investable', rng.choice(principals), 1)),
+            ('pnl (uncached)', lambda rng: ('POST', '/calc/pnl', json.dumps(
+                {'sell_price': 100 + next(fresh) * 1e-6, 'sell_quantity': 1, 'buy_price': 95}).encode(), 1)),
+            (f'pnl batch of {args.batch}', lambda rng: ('POST', '/calc/pnl', batch_body(rng), args.batch)),
+        )
+        print(f"{args.clients} keep-alive clients, {args.seconds:g} s per scenario")
+        print(f"{'scenario':<22} {'req/s':>9} {'records/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'cache hits':>11}")
+        for name, make_request in scenarios:
+            before = health(port)['cache']
+            result = drive(port, args.clients, args.seconds, make_request)
+            after = health(port)['cache']
+            hits, lookups = after['hits'] - before['hits'], after['hits'] + after['misses'] - before['hits'] - before['misses']
+            print(f"{name:<22} {result['requests_per_second']:9,.0f} {result['records_per_second']:11,.0f} "
+                  f"{result['p50_ms']:8.2f} {result['p99_ms']:8.2f} {f'{hits / lookups:.0%}' if lookups else '-':>11}"
+                  + (f"  ({result['errors']} errors)" if result['errors'] else ""))
+        print(f"upstream ticker polls during the test: {upstream.hits - hits_before} "
+              f"(one shared poller, every {args.poll_interval:g} s)")
+    finally:
+        process.terminate()
+        process.wait()
+        upstream.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Main-loop stall per price-panel refresh, virtualized list vs. full rebuild.
+
+Needs a display (use Xvfb on servers). The legacy rebuild is skipped above
+``--legacy-max`` tickers because it takes minutes at 10,000 rows.
+"""
+import argparse
+import statistics
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from crypto_list import CryptoRow, VirtualCryptoList, format_row
+from ticker_parse import convert_row
+from benchmarks.synthetic import synthetic_tickers
+
+
+def make_root():
+    root = tk.Tk()
+    root.geometry("420x800")
+    style = ttk.Style()
+    style.theme_use('clam')
+    style.configure('Crypto.TFrame', background='#34495e')
+    style.configure('Market.TLabel', font=('Arial', 14, 'bold'), foreground='white', background='#34495e')
+    style.configure('Change.TLabel', font=('Arial', 11, 'bold'), background='#34495e')
+    style.configure('Price.TLabel', font=('Arial', 12), foreground='white', background='#34495e')
+    style.configure('Detail.TLabel', font=('Arial', 9), foreground='#ecf0f1', background='#34495e')
+    root.rowconfigure(0, weight=1)
+    root.columnconfigure(0, weight=1)
+    return root
+
+
+def stall(root, refresh):
+    start = time.perf_counter()
+    refresh()
+    root.update_idletasks()
+    return time.perf_counter() - start
+
+
+def bench_virtual(root, tickers, repeats):
+    frame = ttk.Frame(root)
+    frame.grid(row=0, column=0, sticky='nsew')
+    frame.rowconfigure(0, weight=1)
+    frame.columnconfigure(0, weight=1)
+    view = VirtualCryptoList(frame)
+    view.grid()
+    root.update()
+    samples = []
+    for i in range(repeats):
+        # Rotate the data so every refresh changes what the visible rows show
+        items = tickers[i:] + tickers[:i]
+        samples.append(stall(root, lambda: view.set_items(items)))
+    frame.destroy()
+    return samples
+
+
+def bench_legacy(root, tickers, repeats):
+    canvas = tk.Canvas(root)
+    canvas.grid(row=0, column=0, sticky='nsew')
+    inner = ttk.Frame(canvas)
+    canvas.create_window((0, 0), window=inner, anchor='nw')
+
+    def rebuild():
+        for widget in inner.winfo_children():
+            widget.destroy()
+        for item in tickers:
+            row = CryptoRow(inner)
+            row.show(format_row(item))
+            row.frame.pack(fill='x', padx=5, pady=3)
+
+    root.update()
+    samples = [stall(root, rebuild) for _ in range(repeats)]
+    canvas.destroy()
+    return samples
+
+
+def report(name, count, samples):
+    print(f"{name:<8} {count:>7} {statistics.median(samples) * 1000:>10.2f} {max(samples) * 1000:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--legacy-max', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    try:
+        root = make_root()
+    except tk.TclError as e:
+        sys.exit(f"No display available: {e}")
+
+    print(f"{'mode':<8} {'tickers':>7} {'p50 ms':>10} {'max ms':>10}")
+    for count in args.sizes:
+        tickers = [convert_row(t) for t in synthetic_tickers(count)]
+        report('virtual', count, bench_virtual(root, tickers, args.repeats))
+        if count <= args.legacy_max:
+            report('legacy', count, bench_legacy(root, tickers, args.repeats))
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Instrumentation overhead: a bare call vs a disabled and an enabled span.
+
+Times ``--calls`` iterations of a trivial block, bare and wrapped in
+``instruments.span`` / ``instruments.count`` with instrumentation off and
+on. The disabled cost is what every instrumented hot path pays in a normal
+session. Also checks that ``dump_folded`` writes valid collapsed stacks.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from instrumentation import Instruments
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    instruments = Instruments()
+
+    def bare(n):
+        for _ in range(n):
+            pass
+
+    def spanned(n):
+        span = instruments.span
+        for _ in range(n):
+            with span('bench.outer'):
+                pass
+
+    def nested(n):
+        span = instruments.span
+        for _ in range(n):
+            with span('bench.outer'):
+                with span('bench.inner'):
+                    pass
+
+    def counted(n):
+        count = instruments.count
+        for _ in range(n):
+            count('bench.calls')
+
+    base = per_call(bare, args.calls)
+    print(f"{'':<16}{'disabled ns':>12}{'enabled ns':>12}")
+    for name, fn in (('span', spanned), ('nested spans', nested), ('count', counted)):
+        instruments.disable()
+        off = per_call(fn, args.calls) - base
+        instruments.enable()
+        on = per_call(fn, args.calls) - base
+        print(f"{name:<16}{off * 1e9:>12.0f}{on * 1e9:>12.0f}")
+
+    print()
+    print(instruments.report())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.folded')
+        instruments.dump_folded(path)
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    assert lines and all(len(line.rsplit(' ', 1)) == 2 and line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    print(f"\n{len(lines)} folded stacks, e.g. {lines[-1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Bulk insert throughput and fiscal-year lookup latency of TradeJournal.
+
+Writes synthetic trades spread over several years and markets into a
+scratch database, then times "all BTCINR trades this fiscal year".
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from journal import TradeJournal, fiscal_year_bounds
+
+YEAR = 365 * 24 * 3600
+
+
+def synthetic_trades(count, markets, years, seed=0):
+    rng = random.Random(seed)
+    names = ['BTCINR'] + [f"C{i:04d}INR" for i in range(markets - 1)]
+    end = fiscal_year_bounds(2025)[1]
+    start = end - years * YEAR
+    for _ in range(count):
+        side = 'buy' if rng.random() < 0.5 else 'sell'
+        yield (rng.choice(names), side, rng.uniform(0.01, 5), rng.uniform(10, 5_000_000), rng.uniform(start, end), None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trades', type=int, default=2_000_000)
+    parser.add_argument('--markets', type=int, default=500)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=50_000)
+    parser.add_argument('--db', help="reuse this database instead of a scratch one")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = TradeJournal(args.db or os.path.join(tmp, 'journal.db'))
+        elapsed = 0.0
+        trades = synthetic_trades(args.trades, args.markets, args.years)
+        while True:
+            batch = [trade for _, trade in zip(range(args.batch), trades)]
+            if not batch: break
+            start = time.perf_counter()
+            journal.record_trades(batch)
+            elapsed += time.perf_counter() - start
+        print(f"inserted {args.trades:,} trades in {elapsed:.1f} s ({args.trades / elapsed:,.0f} rows/s)")
+
+        for attempt in ('cold', 'warm'):
+            start = time.perf_counter()
+            rows = journal.fiscal_year_trades('BTCINR', 2025)
+            print(f"BTCINR FY 2025-26 ({attempt}): {len(rows):,} trades in {(time.perf_counter() - start) * 1000:.1f} ms")
+        plan = journal.conn.execute("EXPLAIN QUERY PLAN SELECT * FROM trades WHERE market = ? AND timestamp >= ? AND timestamp < ?",
+                                    ('BTCINR', 0, 1)).fetchall()
+        print("plan:", plan[0][-1])
+        journal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Throughput of TradeLedger matching over synthetic fills.
+
+Fills are spread across many markets; sells only take what is held so
+every fill is valid. Reports fills per second for each cost basis method.
+"""
+import argparse
+import random
+import time
+
+from ledger import COST_BASIS_METHODS, TradeLedger
+
+
+def synthetic_fills(count, markets, seed=0):
+    rng = random.Random(seed)
+    names = [f"C{i:04d}INR" for i in range(markets)]
+    held = dict.fromkeys(names, 0.0)
+    fills = []
+    for _ in range(count):
+        market = names[rng.randrange(markets)]
+        price = rng.uniform(10, 1000)
+        if held[market] > 0 and rng.random() < 0.45:
+            quantity = held[market] * rng.uniform(0.05, 1.0)
+            held[market] -= quantity
+            fills.append((False, market, quantity, price))
+        else:
+            quantity = rng.uniform(0.01, 10)
+            held[market] += quantity
+            fills.append((True, market, quantity, price))
+    return fills
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fills', type=int, default=1_000_000)
+    parser.add_argument('--markets', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    fills = synthetic_fills(args.fills, args.markets)
+    print(f"{args.fills:,} fills across {args.markets} markets")
+    print(f"{'method':<8} {'seconds':>8} {'fills/s':>12} {'realized P&L':>18}")
+    for method in COST_BASIS_METHODS:
+        ledger = TradeLedger(method)
+        buy, sell = ledger.buy, ledger.sell
+        start = time.perf_counter()
+        for is_buy, market, quantity, price in fills:
+            if is_buy: buy(market, quantity, price)
+            else: sell(market, quantity, price)
+        elapsed = time.perf_counter() - start
+        print(f"{method:<8} {elapsed:>8.2f} {args.fills / elapsed:>12,.0f} {ledger.realized_pnl():>18,.2f}")
+
+
+if __name__ == '__main__':
+    main()
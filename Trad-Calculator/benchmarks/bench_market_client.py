@@ -0,0 +1,63 @@
+"""Exercise MarketDataClient against the local stand-in ticker server.
+
+Compares a fresh connection per poll (the old ``requests.get``) with the
+keep-alive client, for changed payloads and for 304 Not Modified answers.
+The failure paths (revalidation after a restart, breaker, backoff) are
+checked by ``python -m benchmarks.check_market_client``.
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+from market_client import MarketDataClient
+from benchmarks.standin_server import StandInServer, load_sample
+from benchmarks.synthetic import synthetic_tickers
+
+
+def timed(fn, repeats, setup=None):
+    samples = []
+    for _ in range(repeats):
+        if setup: setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=0, help="synthetic market count (default: recorded sample)")
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    payload = synthetic_tickers(args.markets, quotes=('INR', 'USDT', 'BTC')) if args.markets else load_sample()
+    server = StandInServer(payload).start()
+    try:
+        cold = timed(lambda: requests.get(server.url, timeout=10).json(), args.repeats)
+
+        client = MarketDataClient(server.url)
+        assert len(client.fetch_ticker()) == len(payload)
+        # Validators are cached, so unchanged polls come back as 304s
+        conditional = timed(client.fetch_ticker, args.repeats)
+
+        def tick():
+            payload[0]['timestamp'] += 1
+            server.publish(payload)
+        full = timed(client.fetch_ticker, args.repeats, setup=tick)
+        stats = client.metrics.snapshot()
+
+        print(f"markets served:               {len(payload)}")
+        print(f"new connection per poll:      {cold:8.2f} ms")
+        print(f"keep-alive, changed payload:  {full:8.2f} ms")
+        print(f"keep-alive, 304 not modified: {conditional:8.2f} ms")
+        print(f"304 hit rate:                 {stats['hit_rate']:8.2%}")
+        print(f"bytes on the wire:            {stats['bytes_received']:8d}")
+        print(f"latency p50 / p99:            {stats['latency_p50'] * 1000:.2f} / {stats['latency_p99'] * 1000:.2f} ms")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Order book: incremental refresh, O(log n) fills and batch P&L at the book.
+
+Replays ``--snapshots`` successive synthetic books of ``--depth`` levels a
+side (``--changed`` of the levels move per poll) into an ``OrderBook``,
+timing the incremental update against parsing and summing every level as
+a fresh book would. Then times single fills against a level-by-level walk,
+``book_trade_pnl`` over a large batch, and refreshes through
+``OrderBookCache`` from the local stand-in server.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from market_client import MarketDataClient
+from order_book import OrderBook, OrderBookCache, book_trade_pnl
+from benchmarks.standin_server import StandInServer
+from benchmarks.synthetic import synthetic_order_book, synthetic_tickers
+
+
+def walk(levels, quantity):
+    """Fill by visiting levels one at a time, as a plain loop would."""
+    filled = notional = 0.0
+    for price, available in levels:
+        take = min(available, quantity - filled)
+        filled += take
+        notional += take * price
+        if filled >= quantity: break
+    return filled, notional
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--depth', type=int, default=1000)
+    parser.add_argument('--snapshots', type=int, default=200)
+    parser.add_argument('--changed', type=float, default=0.1)
+    parser.add_argument('--fills', type=int, default=100_000)
+    parser.add_argument('--batch', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    mid = 100.0
+    snapshots = []
+    for seed in range(args.snapshots):
+        mid *= rng.uniform(0.9995, 1.0005)
+        snapshots.append(synthetic_order_book(mid, args.depth, seed, args.changed))
+
+    book = OrderBook('BENCH')
+    incremental, rebuilt, changed = [], [], []
+    for raw in snapshots:
+        t = time.perf_counter()
+        changed.append(book.update(raw))
+        incremental.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        fresh = OrderBook('BENCH')
+        fresh.update(raw)
+        rebuilt.append(time.perf_counter() - t)
+        assert fresh.bids.prices == book.bids.prices and fresh.asks.quantities == book.asks.quantities
+    print(f"{args.depth:,} levels a side, {statistics.mean(changed[1:]) / (2 * args.depth):.0%} changed per poll")
+    print(f"incremental refresh: {statistics.median(incremental[1:]) * 1000:8.3f} ms p50")
+    print(f"full rebuild:        {statistics.median(rebuilt) * 1000:8.3f} ms p50")
+
+    levels = list(zip(book.bids.prices, book.bids.quantities))
+    depth = book.bids.depth()
+    quantities = [rng.uniform(0, depth * 1.1) for _ in range(args.fills)]
+    t = time.perf_counter()
+    fills = [book.sell(q) for q in quantities]
+    fill_time = (time.perf_counter() - t) / args.fills
+    sample = quantities[:2000]
+    t = time.perf_counter()
+    walked = [walk(levels, q) for q in sample]
+    walk_time = (time.perf_counter() - t) / len(sample)
+    for fill, (filled, notional) in zip(fills, walked):
+        assert abs(fill.filled - filled) < 1e-6 and abs(fill.average_price * fill.filled - notional) < 1e-6 * notional
+    print(f"fill (prefix sums):  {fill_time * 1e6:8.2f} us")
+    print(f"fill (walk levels):  {walk_time * 1e6:8.2f} us")
+
+    batch = [rng.uniform(0, depth) for _ in range(args.batch)]
+    prices, costs = [mid] * args.batch, [q * mid * 0.95 for q in batch]
+    t = time.perf_counter()
+    result = book_trade_pnl(book, prices, batch, costs)
+    batch_time = time.perf_counter() - t
+    print(f"book_trade_pnl:      {batch_time * 1000:8.1f} ms for {args.batch:,} sells, "
+          f"mean slippage {statistics.mean(result['slippage'][:10_000]):.4%}")
+
+    payload = synthetic_tickers(50)
+    server = StandInServer(payload).start()
+    client = MarketDataClient(server.url, order_book_url=server.order_book_url)
+    try:
+        cache = OrderBookCache(client, max_age=0)
+        market = payload[0]['market']
+        cache.get(market)
+        refresh = []
+        for _ in range(50):
+            payload[0]['last_price'] = f"{float(payload[0]['last_price']) * rng.uniform(0.9995, 1.0005):.6f}"
+            server.publish(payload)
+            t = time.perf_counter()
+            cache.get(market)
+            refresh.append(time.perf_counter() - t)
+        print(f"stand-in refresh:    {statistics.median(refresh) * 1000:8.2f} ms p50 "
+              f"(fetch + incremental update, {len(cache.books[market].bids.prices)} levels a side)")
+    finally:
+        client.close()
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
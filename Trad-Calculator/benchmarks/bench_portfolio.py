@@ -0,0 +1,60 @@
+"""Portfolio revaluation per tick: incremental running sums vs a full rescan.
+
+Opens ``--positions`` positions, then feeds ticks in which ``--moved``
+markets change price. The incremental path reprices only those markets;
+the rescan recomputes ``TradeLedger.unrealized_pnl`` over every position,
+as the portfolio tab would without running sums. Both must agree.
+"""
+import argparse
+import random
+import time
+
+from ledger import TradeLedger
+from portfolio import Portfolio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--positions', type=int, default=5_000)
+    parser.add_argument('--moved', type=int, default=50, help="markets whose price changes per tick")
+    parser.add_argument('--ticks', type=int, default=2_000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    ledger = TradeLedger()
+    marks = {}
+    for i in range(args.positions):
+        market = f"C{i:05d}INR"
+        price = rng.uniform(10, 1000)
+        ledger.buy(market, rng.uniform(0.1, 10), price)
+        marks[market] = price
+    portfolio = Portfolio(ledger)
+    portfolio.reprice(marks.items())
+    markets = list(marks)
+    ticks = []
+    for _ in range(args.ticks):
+        ticks.append([(m, marks[m] * rng.uniform(0.98, 1.02)) for m in rng.sample(markets, args.moved)])
+
+    t = time.perf_counter()
+    for changes in ticks:
+        portfolio.reprice(changes)
+        portfolio.summary()
+    incremental = (time.perf_counter() - t) / args.ticks
+
+    t = time.perf_counter()
+    for changes in ticks:
+        marks.update(changes)
+        ledger.unrealized_pnl(marks)
+    rescan = (time.perf_counter() - t) / args.ticks
+
+    expected = ledger.unrealized_pnl(marks)
+    got = portfolio.summary().unrealized
+    assert abs(got - expected) <= 1e-6 * max(1.0, abs(expected)), (got, expected)
+    print(f"{args.positions:,} positions, {args.moved} moved per tick, {args.ticks:,} ticks")
+    print(f"incremental:  {incremental * 1e6:10.1f} us per tick")
+    print(f"full rescan:  {rescan * 1e6:10.1f} us per tick ({rescan / incremental:.0f}x)")
+    print(f"unrealized P&L {got:,.2f} (rescan {expected:,.2f})")
+
+
+if __name__ == '__main__':
+    main()
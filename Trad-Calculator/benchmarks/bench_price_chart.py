@@ -0,0 +1,139 @@
+"""Price chart: pyramid build, per-frame view cost and panning frame times.
+
+Builds a ``PriceSeries`` from ``--days`` of per-minute ticks (a year by
+default) and times ``window`` at spans from an hour to the whole history,
+against converting every tick in view as a naive plot would. Then pans
+across the year frame by frame and reports p50/p99 frame times against the
+60 fps budget, and times live appends. With a display, the same pan runs
+through a real ``PriceChart`` canvas, ``update_idletasks`` included.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from price_chart import PriceSeries
+
+MINUTE = 60
+DAY = 24 * 3600
+FRAME_BUDGET = 1 / 60
+SPANS = (('1 hour', 3600), ('1 day', DAY), ('1 week', 7 * DAY), ('30 days', 30 * DAY), ('1 year', 365 * DAY))
+
+
+def synthetic_minutes(days, seed=0, start=1.7e9):
+    rng = np.random.default_rng(seed)
+    count = days * DAY // MINUTE
+    times = start + np.arange(count, dtype=np.float64) * MINUTE
+    prices = 1000 * np.exp(np.cumsum(rng.normal(0, 0.0005, count)))
+    return times, prices
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def frame(series, start, end, width, height=400):
+    """What a redraw computes before handing coordinates to Tk."""
+    xs, ys = series.window(start, end, width)
+    low, high = float(ys.min()), float(ys.max())
+    points = np.empty(2 * len(xs))
+    points[0::2] = (xs - start) * (width / (end - start))
+    points[1::2] = height - (ys - low) * (height / ((high - low) or 1.0))
+    return points.tolist()
+
+
+def naive_frame(times, prices, start, end, width, height=400):
+    lo, hi = np.searchsorted(times, [start, end])
+    xs, ys = times[lo:hi], prices[lo:hi]
+    low, high = float(ys.min()), float(ys.max())
+    points = np.empty(2 * len(xs))
+    points[0::2] = (xs - start) * (width / (end - start))
+    points[1::2] = height - (ys - low) * (height / ((high - low) or 1.0))
+    return points.tolist()
+
+
+def pan_frames(span, frames, start, end):
+    step = (end - start - span) / frames
+    return [(start + i * step, start + i * step + span) for i in range(frames)]
+
+
+def bench_canvas(series, frames, width):
+    import tkinter as tk
+    from price_chart import PriceChart
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"canvas pan: skipped (no display: {e})")
+        return
+    root.geometry(f"{width + 100}x480")
+    chart = PriceChart(root, series, title='BENCH')
+    chart.pack(fill='both', expand=True)
+    root.update()
+    chart.show_range(None)
+    root.update()
+    span = 30 * DAY
+    samples = []
+    for start, end in pan_frames(span, frames, series.times.values()[0], series.last()[0]):
+        t = time.perf_counter()
+        chart.start, chart.end = start, end
+        chart.redraw()
+        root.update_idletasks()
+        samples.append(time.perf_counter() - t)
+    root.destroy()
+    print(f"canvas pan (30-day view): p50 {statistics.median(samples) * 1000:6.2f} ms  "
+          f"p99 {percentile(samples, 0.99) * 1000:6.2f} ms  ({FRAME_BUDGET * 1000:.1f} ms budget)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--width', type=int, default=1000)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--appends', type=int, default=2000)
+    parser.add_argument('--no-canvas', action='store_true')
+    args = parser.parse_args(argv)
+
+    times, prices = synthetic_minutes(args.days)
+    t = time.perf_counter()
+    series = PriceSeries(times, prices)
+    build = time.perf_counter() - t
+    print(f"{len(series):,} ticks, {len(series.levels)} pyramid levels, built in {build * 1000:.1f} ms")
+
+    end = times[-1]
+    print(f"{'span':>8}  {'points':>7}  {'pyramid':>10}  {'naive':>10}")
+    for label, span in SPANS:
+        start = end - span
+        xs, ys = series.window(start, end, args.width)
+        inside = (times >= start) & (times <= end)
+        assert ys.max() >= prices[inside].max() and ys.min() <= prices[inside].min(), "an extreme was dropped"
+        fast = min(timed(lambda: frame(series, start, end, args.width)) for _ in range(5))
+        slow = min(timed(lambda: naive_frame(times, prices, start, end, args.width)) for _ in range(3))
+        print(f"{label:>8}  {len(xs):7,}  {fast * 1000:7.2f} ms  {slow * 1000:7.2f} ms")
+
+    for label, span in (('1 day', DAY), ('30 days', 30 * DAY), ('whole', end - times[0] - 1)):
+        samples = [timed(lambda: frame(series, a, b, args.width))
+                   for a, b in pan_frames(span, args.frames, times[0], end)]
+        print(f"pan {label:>7}: p50 {statistics.median(samples) * 1000:6.2f} ms  "
+              f"p99 {percentile(samples, 0.99) * 1000:6.2f} ms per frame "
+              f"({FRAME_BUDGET * 1000:.1f} ms budget)")
+
+    live = PriceSeries(times, prices)
+    t = time.perf_counter()
+    for i in range(args.appends):
+        live.append(end + (i + 1) * MINUTE, prices[-1])
+    print(f"live append: {(time.perf_counter() - t) / args.appends * 1e6:.1f} us per tick")
+
+    if not args.no_canvas:
+        bench_canvas(series, min(args.frames, 200), args.width)
+
+
+def timed(fn):
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Results log: append cost, page reads from the spill file and streaming save.
+
+Appends ``--records`` boxed reports (the size of a trading P&L result) to a
+``ResultsLog``; everything past the in-memory ring spills to disk. Then
+times random page reads, as the Older/Newer buttons do, and a full save,
+tracking peak Python memory of the save against joining the whole log
+into one string as the Text widget's ``get`` did.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from results_log import PAGE_SIZE, ResultsLog
+
+REPORT = """
++----------------------------------------------------------+
+|                  TRADING P&L RESULTS                     |
++----------------------------------------------------------+
+| GROSS SALE VALUE:   {0:>25} |
+| NET PROFIT/LOSS:    {1:>25} |
++----------------------------------------------------------+
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=200_000)
+    parser.add_argument('--pages', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    log = ResultsLog()
+    t = time.perf_counter()
+    for i in range(args.records):
+        log.append(REPORT.format(f"₹{i * 1.5:,.2f}", f"₹{i * 0.1:,.2f}"))
+    append = (time.perf_counter() - t) / args.records
+    print(f"{args.records:,} records, {log.spilled:,} spilled ({log.spill_end / 2**20:.1f} MiB on disk)")
+    print(f"append:       {append * 1e6:8.2f} us per record")
+
+    rng = random.Random(0)
+    reads = []
+    for _ in range(args.pages):
+        end = rng.randrange(PAGE_SIZE, len(log))
+        t = time.perf_counter()
+        page = log.records(end - PAGE_SIZE, end)
+        reads.append(time.perf_counter() - t)
+        assert [r.seq for r in page] == list(range(end - PAGE_SIZE, end))
+    print(f"page read:    {statistics.median(reads) * 1000:8.2f} ms p50, {max(reads) * 1000:.2f} ms worst "
+          f"({PAGE_SIZE} records)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.txt')
+        t = time.perf_counter()
+        with open(path, 'w', encoding='utf-8') as f:
+            log.write_text(f)
+        elapsed = time.perf_counter() - t
+        tracemalloc.start()
+        with open(path, 'w', encoding='utf-8') as f:
+            log.write_text(f)
+        streamed = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        joined = "".join(r.text + "\n" for r in log.records(0, len(log)))
+        whole = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert os.path.getsize(path) == len(joined.encode('utf-8'))
+    print(f"save:         {elapsed * 1000:8.0f} ms, peak {streamed / 2**20:.1f} MiB "
+          f"(joining in memory peaks at {whole / 2**20:.1f} MiB)")
+    log.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Monte Carlo risk engine: wall time per worker count, determinism and UI stalls.
+
+Simulates a position against a synthetic fat-tailed hourly price history.
+Every worker count must produce the same estimate for the same seed. While a
+run streams progress on its background thread, the main thread ticks every
+10 ms as the Tk loop would; the worst tick lateness is the UI stall.
+"""
+import argparse
+import math
+import os
+import random
+import time
+
+from risk_engine import MonteCarloRisk, historical_returns
+
+
+def synthetic_snapshots(hours, seed=0, price=5_000_000.0):
+    rng = random.Random(seed)
+    rows = []
+    for hour in range(hours):
+        # Student-t-ish shocks: a normal scaled by a random volatility regime
+        price *= math.exp(rng.gauss(0, 0.008) * rng.choice((0.5, 1, 1, 3)))
+        rows.append((hour * 3600.0, price))
+    return rows
+
+
+def run_streaming(engine, returns, paths, quantity, price):
+    """Run in the background like the app does; return (seconds, estimate, updates, worst tick lateness)."""
+    run = engine.start(lambda: returns, quantity, price, price * 0.95, paths=paths)
+    start = time.perf_counter()
+    updates, worst, latest = 0, 0.0, None
+    while not run.done.is_set():
+        tick = time.perf_counter()
+        time.sleep(0.01)
+        worst = max(worst, time.perf_counter() - tick - 0.01)
+        estimate = run.take()
+        if estimate is not None:
+            updates += 1
+            latest = estimate
+    elapsed = time.perf_counter() - start
+    if run.error is not None: raise run.error
+    final = run.take()
+    if final is not None:
+        updates += 1
+        latest = final
+    return elapsed, latest, updates, worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--hours', type=int, default=24 * 90, help="hours of synthetic price history")
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args(argv)
+
+    snapshots = synthetic_snapshots(args.hours)
+    returns = historical_returns(snapshots)
+    price = snapshots[-1][1]
+    print(f"{len(returns):,} hourly returns, {args.paths:,} paths x 24 steps")
+    print(f"{'workers':>7} {'seconds':>8} {'updates':>8} {'max UI stall ms':>16}")
+
+    reference = None
+    for workers in args.workers:
+        engine = MonteCarloRisk(max_workers=workers)
+        # Start the pool outside the timing; the app pays this once per session
+        engine.pool().submit(int).result()
+        try:
+            elapsed, estimate, updates, worst = run_streaming(engine, returns, args.paths, 2.0, price)
+        finally:
+            engine.shutdown()
+        print(f"{workers:>7} {elapsed:>8.2f} {updates:>8} {worst * 1000:>16.1f}")
+        assert reference is None or estimate == reference, "estimate depends on the worker count"
+        reference = estimate
+
+    print(f"VaR {estimate.confidence:.0%}: {estimate.var:,.0f}  CVaR: {estimate.cvar:,.0f}  "
+          f"stop-loss hit: {estimate.stop_hit_probability:.2%}  expected P&L: {estimate.expected_pnl:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Per-keystroke search latency: indexed, ranked search vs. a linear scan.
+
+Times the queries a user produces while typing (``b``, ``bt``, ``btc``, ...)
+against thousands of synthetic market symbols. The frame budget is 16 ms.
+"""
+import argparse
+import random
+import string
+import time
+
+from search_index import SearchIndex, market_symbol
+
+FRAME_BUDGET_MS = 16.0
+
+
+def synthetic_markets(count, seed=0):
+    rng = random.Random(seed)
+    markets = {'BTCINR', 'BTTINR', 'ETHINR', 'BTCUSDT'}
+    while len(markets) < count:
+        symbol = ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 7)))
+        markets.add(symbol + rng.choice(('INR', 'USDT', 'BTC')))
+    markets = sorted(markets)
+    return markets, [rng.uniform(0, 1e7) for _ in markets]
+
+
+def linear_search(markets, term, volume_of):
+    # The old filter: substring scan, then the same ranking for a fair comparison
+    hits = [m for m in markets if term in market_symbol(m)]
+    return sorted(hits, key=lambda m: (market_symbol(m) != term, not market_symbol(m).startswith(term), -volume_of[m], m))
+
+
+def timed_ms(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--queries', nargs='+', default=['b', 'bt', 'btc', 'btcu', 'btcusdt'])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'markets':>8} {'query':<8} {'hits':>6} {'index ms':>9} {'linear ms':>10}")
+    worst = 0.0
+    for count in args.markets:
+        markets, volumes = synthetic_markets(count)
+        start = time.perf_counter()
+        index = SearchIndex(markets)
+        index.set_volumes(volumes)
+        volume_of = dict(zip(markets, volumes))
+        build = (time.perf_counter() - start) * 1000
+        for term in args.queries:
+            assert index.search(term) == linear_search(markets, term, volume_of)
+            hits = len(index.search(term))
+            indexed = timed_ms(lambda: index.search(term), args.repeats)
+            linear = timed_ms(lambda: linear_search(markets, term, volume_of), args.repeats)
+            worst = max(worst, indexed)
+            print(f"{count:>8} {term:<8} {hits:>6} {indexed:>9.3f} {linear:>10.3f}")
+        print(f"{count:>8} (index build {build:.1f} ms)")
+    print(f"worst indexed query: {worst:.3f} ms ({'within' if worst <= FRAME_BUDGET_MS else 'OVER'} the {FRAME_BUDGET_MS:.0f} ms frame budget)")
+
+
+if __name__ == '__main__':
+    main()
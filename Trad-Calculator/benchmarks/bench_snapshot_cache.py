@@ -0,0 +1,108 @@
+"""Warm start: snapshot cache save/load against JSON, and time to first rows.
+
+Saves and loads ``--markets`` parsed ticker rows through ``SnapshotCache``
+and through ``json``, comparing time and file size. Then compares the time
+until the price panel has rows to show: loading the cache and diffing it
+into a ``TickerStore``, against fetching the same rows from the local
+stand-in server (``--latency`` seconds added per request, as a stand-in for
+the real network). Finally checks that damaged, expired and oversized
+snapshots behave.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from market_client import MarketDataClient
+from snapshot_cache import HEADER, SnapshotCache
+from ticker_store import TickerStore
+from benchmarks.standin_server import StandInServer
+from benchmarks.synthetic import synthetic_tickers
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=600)
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args(argv)
+
+    payload = synthetic_tickers(args.markets)
+    server = StandInServer(payload).start()
+    client = MarketDataClient(server.url)
+    try:
+        rows = client.fetch_ticker('INR')
+        directory = tempfile.mkdtemp(prefix='bench-snapshot-')
+        cache = SnapshotCache(os.path.join(directory, 'ticker.snapshot'))
+        json_path = os.path.join(directory, 'ticker.json')
+
+        def save_json():
+            with open(json_path, 'w') as f:
+                json.dump(rows, f)
+
+        def load_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        save_time = timed(lambda: cache.save(rows), args.repeats)
+        load_time = timed(cache.load, args.repeats)
+        json_save = timed(save_json, args.repeats)
+        json_load = timed(load_json, args.repeats)
+        print(f"{len(rows):,} markets")
+        print(f"snapshot: save {save_time * 1000:7.2f} ms  load {load_time * 1000:7.2f} ms  "
+              f"{os.path.getsize(cache.path) / 1024:7.1f} KB")
+        print(f"json:     save {json_save * 1000:7.2f} ms  load {json_load * 1000:7.2f} ms  "
+              f"{os.path.getsize(json_path) / 1024:7.1f} KB")
+        assert [row['market'] for row in cache.load().rows] == [row['market'] for row in rows]
+
+        warm = timed(lambda: TickerStore().update(cache.load().rows), args.repeats)
+
+        def cold():
+            # A fresh client, as at startup: new connection and no ETag
+            fresh = MarketDataClient(server.url)
+            try:
+                time.sleep(args.latency)
+                TickerStore().update(fresh.fetch_ticker('INR'))
+            finally:
+                fresh.close()
+
+        cold_time = timed(cold, 5)
+        print(f"first rows from cache:   {warm * 1000:8.2f} ms")
+        print(f"first rows from network: {cold_time * 1000:8.2f} ms ({args.latency * 1000:.0f} ms latency)")
+
+        # A torn write never replaces the file, but a damaged one must not load
+        with open(cache.path, 'r+b') as f:
+            f.seek(HEADER.size + 10)
+            f.write(b'\xff\xff')
+        assert cache.load() is None, "damaged snapshot loaded"
+        with open(cache.path, 'wb') as f:
+            f.write(b'TKSN')
+        assert cache.load() is None, "truncated snapshot loaded"
+        cache.save(rows)
+        expired = SnapshotCache(cache.path, ttl=60, clock=lambda: time.time() + 61)
+        assert expired.load() is None, "expired snapshot loaded"
+        small = SnapshotCache(cache.path, max_bytes=8 * 1024)
+        kept = small.save(rows)
+        assert os.path.getsize(cache.path) <= 8 * 1024
+        busiest = sorted(rows, key=lambda row: -row['volume'])[:kept]
+        assert {row['market'] for row in small.load().rows} == {row['market'] for row in busiest}
+        assert sorted(os.listdir(directory)) == ['ticker.json', 'ticker.snapshot'], "temporary file left behind"
+        print(f"checks ok: damaged/truncated/expired rejected, 8 KB cap kept the {kept} busiest markets")
+    finally:
+        client.close()
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Startup cost: ``-X importtime`` breakdown and time to first interactive frame.
+
+The import breakdown runs anywhere. The interactive-frame timing launches
+the real splash and main window in a child interpreter against the local
+stand-in ticker server and a scratch journal, so it needs a display (use
+Xvfb on servers). Times are measured from just before the child process is
+spawned, so interpreter start-up is included.
+
+Exits non-zero when a measurement exceeds its budget, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# What app.py used to import up front; now loaded on the warm-up threads
+EAGER_MODULES = ('market_client', 'calc_engine', 'ledger', 'journal', 'ticker_store')
+HEAVY = ('requests', 'numpy')
+
+
+def import_tree(statement):
+    """Run ``statement`` under ``-X importtime``; return ``[(depth, name, self_us, cumulative_us)]``."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line: continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def subtree(rows, module):
+    """Rows imported on behalf of top-level ``module`` (importtime prints children first)."""
+    for end, (depth, name, _, _) in enumerate(rows):
+        if depth == 0 and name == module:
+            start = end
+            while start > 0 and rows[start - 1][0] > 0:
+                start -= 1
+            return rows[start:end + 1]
+    raise LookupError(f"{module} not in importtime output")
+
+
+def import_cost(modules, repeats):
+    """Median cumulative time (ms) of importing ``modules`` together, and the last tree."""
+    samples, rows = [], None
+    for _ in range(repeats):
+        rows = import_tree(f"import {', '.join(modules)}")
+        samples.append(sum(subtree(rows, module)[-1][3] for module in modules) / 1000)
+    return statistics.median(samples), rows
+
+
+def seed_journal(path, trades):
+    from journal import TradeJournal
+    rng = random.Random(0)
+    journal = TradeJournal(path)
+    markets = [f"C{i:03d}INR" for i in range(200)]
+    # Buys only, so the replay never rejects an oversell
+    journal.record_trades((rng.choice(markets), 'buy', rng.uniform(0.01, 5), rng.uniform(10, 5_000_000), None, None)
+                          for _ in range(trades))
+    journal.close()
+
+
+def child(url, journal_path, spawned_at):
+    """Launch the app; print seconds from spawn to splash and to the interactive main window."""
+    import tkinter as tk
+    import app
+    from startup import StartupWarmup
+
+    marks = {}
+
+    def run(self):
+        # Flush pending draws: the window is on screen and handling events
+        self.root.update()
+        marks['interactive'] = time.time() - spawned_at
+        self.on_closing()
+    app.InvestmentCalculator.run = run
+
+    try:
+        splash = app.SplashScreen(StartupWarmup(url=url, journal_path=journal_path))
+    except tk.TclError as e:
+        sys.exit(f"No display available: {e}")
+    splash.root.update()
+    marks['splash'] = time.time() - spawned_at
+    splash.root.mainloop()
+    print(json.dumps(marks))
+
+
+def time_to_interactive(url, journal_path, repeats):
+    samples = []
+    for _ in range(repeats):
+        spawned_at = time.time()
+        result = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--child',
+                                 url, journal_path, repr(spawned_at)], capture_output=True, text=True)
+        if result.returncode:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        samples.append(json.loads(result.stdout.splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) * 1000 for key in samples[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="largest imports to list")
+    parser.add_argument('--trades', type=int, default=50_000, help="trades in the scratch journal")
+    parser.add_argument('--import-budget-ms', type=float, default=100.0)
+    parser.add_argument('--interactive-budget-ms', type=float, default=1500.0)
+    parser.add_argument('--child', nargs=3, metavar=('URL', 'JOURNAL', 'SPAWNED_AT'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return child(args.child[0], args.child[1], float(args.child[2]))
+
+    failures = []
+    app_ms, rows = import_cost(['app'], args.repeats)
+    tree = subtree(rows, 'app')
+    eager_ms, _ = import_cost(EAGER_MODULES, args.repeats)
+    loaded = {name for _, name, _, _ in tree}
+    print(f"import app:                   {app_ms:8.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"deferred to warm-up threads:  {eager_ms:8.1f} ms ({', '.join(EAGER_MODULES)})")
+    print("largest imports under app (cumulative ms):")
+    for _, name, _, cumulative in sorted((r for r in tree if r[0] == 1), key=lambda r: -r[3])[:args.top]:
+        print(f"  {name:<28} {cumulative / 1000:8.1f}")
+    if app_ms > args.import_budget_ms:
+        failures.append(f"import app took {app_ms:.1f} ms")
+    for module in HEAVY:
+        if module in loaded:
+            failures.append(f"app imports {module} eagerly")
+
+    from benchmarks.standin_server import StandInServer, load_sample
+    server = StandInServer(load_sample()).start()
+    with tempfile.TemporaryDirectory() as scratch:
+        journal_path = os.path.join(scratch, 'journal.db')
+        seed_journal(journal_path, args.trades)
+        try:
+            marks = time_to_interactive(server.url, journal_path, args.repeats)
+        except RuntimeError as e:
+            print(f"time to interactive:          skipped ({e})")
+        else:
+            print(f"splash on screen:             {marks['splash']:8.1f} ms")
+            print(f"main window interactive:      {marks['interactive']:8.1f} ms "
+                  f"(budget {args.interactive_budget_ms:.0f} ms, {args.trades:,} journaled trades)")
+            if marks['interactive'] > args.interactive_budget_ms:
+                failures.append(f"first interactive frame after {marks['interactive']:.0f} ms")
+        finally:
+            server.stop()
+
+    if failures:
+        sys.exit("over budget: " + "; ".join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Tax report throughput and memory over a synthetic trade history CSV.
+
+Writes ``--trades`` chronological trades spanning one fiscal year, then runs
+``tax_report`` over the file with the per-trade schedule and summary CSVs,
+as a filing run would. Reports trades/s, the time 10 million trades would
+take at that rate, and the peak RSS the run added: the open lots and one
+row per market, not the history.
+"""
+import argparse
+import csv
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import tax_report
+from benchmarks.synthetic import synthetic_trades
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trades', type=int, default=2_000_000)
+    parser.add_argument('--markets', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    start = datetime(2025, 4, 1).timestamp()
+    interval = 365 * 86400 / args.trades
+    with tempfile.TemporaryDirectory() as directory:
+        trades = os.path.join(directory, 'trades.csv')
+        with open(trades, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('market', 'side', 'quantity', 'price', 'timestamp'))
+            for market, side, quantity, price, timestamp in synthetic_trades(args.trades, args.markets, start,
+                                                                               interval):
+                writer.writerow((market, side, f"{quantity:.8f}", f"{price:.4f}", f"{timestamp:.0f}"))
+        size = os.path.getsize(trades)
+
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        t = time.perf_counter()
+        tax_report.main([trades, '--fy', '2025', '-o', os.path.join(directory, 'report.txt'),
+                         '--schedule', os.path.join(directory, 'schedule.csv'),
+                         '--summary', os.path.join(directory, 'summary.csv')])
+        elapsed = time.perf_counter() - t
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        with open(os.path.join(directory, 'schedule.csv'), encoding='utf-8') as f:
+            sells = sum(1 for _ in f) - 1
+
+    print(f"{args.trades:,} trades ({size / 2**20:.0f} MiB CSV), {sells:,} sells in the schedule")
+    print(f"report:       {elapsed:8.2f} s, {args.trades / elapsed:,.0f} trades/s, "
+          f"10M trades in ~{10_000_000 / args.trades * elapsed:.0f} s")
+    print(f"peak RSS:     {(peak - baseline) / 2**20:8.1f} MiB added")
+
+
+if __name__ == '__main__':
+    main()
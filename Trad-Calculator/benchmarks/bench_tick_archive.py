@@ -0,0 +1,100 @@
+"""Tick archive: append cost, range-slice latency and daily compaction.
+
+Fills a scratch archive with a year of per-minute snapshots for each of
+``--markets`` markets (about 25 MB per market), then times live per-poll
+appends, reopening, slicing day/week/month/year ranges and compaction.
+Each market is its own file, so slice cost does not grow with the number
+of markets.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from tick_archive import TICK_FIELDS, TickArchive
+
+MINUTE = 60
+DAY = 24 * 3600
+RANGES = (('1 day', DAY), ('1 week', 7 * DAY), ('30 days', 30 * DAY), ('1 year', 365 * DAY))
+
+
+def synthetic_year(start, days, seed):
+    rng = np.random.default_rng(seed)
+    count = days * DAY // MINUTE
+    block = np.empty(count, dtype=[(name, '<f8') for name in TICK_FIELDS])
+    block['timestamp'] = start + np.arange(count, dtype=np.float64) * MINUTE
+    price = 1000 * np.exp(np.cumsum(rng.normal(0, 0.0005, count)))
+    block['last_price'] = price
+    block['high'] = price * 1.01
+    block['low'] = price * 0.99
+    block['volume'] = rng.uniform(0, 1e6, count)
+    block['change_24_hour'] = rng.uniform(-5, 5, count)
+    return block
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=20)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--polls', type=int, default=200, help="live polls appended after the bulk load")
+    parser.add_argument('--slices', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    markets = [f"C{i:03d}INR" for i in range(args.markets)]
+    start = 1_700_000_000.0
+    end = start + args.days * DAY
+    with tempfile.TemporaryDirectory() as directory:
+        archive = TickArchive(directory)
+        t = time.perf_counter()
+        total = sum(archive.tape(m).extend(synthetic_year(start, args.days, i)) for i, m in enumerate(markets))
+        load = time.perf_counter() - t
+        print(f"bulk load:        {total:,} records in {load:.2f} s ({total * 48 / load / 2**20:,.0f} MiB/s)")
+
+        t = time.perf_counter()
+        for poll in range(args.polls):
+            stamp = end + poll * MINUTE
+            archive.append_rows({'market': m, 'timestamp': stamp, 'last_price': 1.0, 'high': 1.0, 'low': 1.0,
+                                 'volume': 1.0, 'change_24_hour': 0.0} for m in markets)
+        per_append = (time.perf_counter() - t) / (args.polls * len(markets))
+        print(f"live append:      {per_append * 1e6:.2f} us per market per poll")
+
+        t = time.perf_counter()
+        archive.compact()
+        print(f"full compaction:  {(time.perf_counter() - t) * 1000:.1f} ms for {len(markets)} markets")
+        archive.append_rows({'market': m, 'timestamp': end + args.polls * MINUTE, 'last_price': 2.0, 'high': 2.0,
+                             'low': 2.0, 'volume': 1.0, 'change_24_hour': 0.0} for m in markets)
+        t = time.perf_counter()
+        archive.compact()
+        print(f"incremental:      {(time.perf_counter() - t) * 1000:.1f} ms after one more poll")
+        archive.close()
+
+        t = time.perf_counter()
+        archive = TickArchive(directory)
+        for m in markets:
+            archive.tape(m)
+        print(f"reopen:           {(time.perf_counter() - t) * 1000:.1f} ms for {len(markets)} markets")
+
+        rng = random.Random(0)
+        print(f"{'range':<10} {'rows':>9} {'slice p50 us':>13} {'slice+mean p50 ms':>18}")
+        for name, span in RANGES:
+            span = min(span, end - start)
+            slices, reads, rows = [], [], 0
+            for _ in range(args.slices):
+                market = rng.choice(markets)
+                lo = rng.uniform(start, end - span)
+                t = time.perf_counter()
+                view = archive.ticks(market, lo, lo + span)
+                slices.append(time.perf_counter() - t)
+                view['last_price'].mean()
+                reads.append(time.perf_counter() - t)
+                rows = len(view)
+            print(f"{name:<10} {rows:>9,} {statistics.median(slices) * 1e6:>13.1f} "
+                  f"{statistics.median(reads) * 1000:>18.2f}")
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
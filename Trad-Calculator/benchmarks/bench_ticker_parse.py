@@ -0,0 +1,82 @@
+"""Peak RSS and parse time: ``json.loads`` + INR filter vs. streaming parse.
+
+Each method runs in its own interpreter so peak RSS is not polluted by the
+other. The payload is a synthetic all-markets ticker (a third quoted in INR),
+written by a child process too: Linux children inherit the parent's RSS
+high-water mark across fork.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from ticker_parse import CHUNK_SIZE, convert_row, iter_tickers
+from benchmarks.synthetic import synthetic_tickers
+
+
+def parse_json(path):
+    with open(path, 'rb') as f:
+        all_data = json.loads(f.read())
+    return [convert_row(d) for d in all_data if d['market'].endswith('INR')]
+
+
+def parse_stream(path):
+    with open(path, 'rb') as f:
+        return list(iter_tickers(iter(lambda: f.read(CHUNK_SIZE), b''), quote='INR'))
+
+
+METHODS = {'json': parse_json, 'stream': parse_stream}
+
+
+def run_one(method, path):
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    start = time.perf_counter()
+    rows = METHODS[method](path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    print(json.dumps({'method': method, 'rows': len(rows), 'seconds': elapsed, 'peak_rss_delta': peak - baseline}))
+
+
+def write_payload(path, markets):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(synthetic_tickers(markets, quotes=('INR', 'USDT', 'BTC')), f, separators=(',', ':'))
+
+
+def spawn(*args):
+    return subprocess.run([sys.executable, '-m', 'benchmarks.bench_ticker_parse', *args],
+                          check=True, capture_output=True, text=True).stdout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--markets', type=int, default=50_000)
+    parser.add_argument('--run', choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument('--generate', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        run_one(args.run, args.path)
+        return
+    if args.generate:
+        write_payload(args.path, args.markets)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ticker.json')
+        spawn('--generate', '--markets', str(args.markets), '--path', path)
+        print(f"payload: {args.markets} markets, {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"{'method':<8} {'INR rows':>9} {'parse ms':>10} {'peak RSS MB':>12}")
+        for method in METHODS:
+            result = json.loads(spawn('--run', method, '--path', path))
+            print(f"{method:<8} {result['rows']:>9} {result['seconds'] * 1000:>10.1f} {result['peak_rss_delta'] / 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
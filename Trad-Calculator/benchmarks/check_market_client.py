@@ -0,0 +1,174 @@
+"""Failure-path checks for MarketDataClient against the local stand-in server.
+
+No timing loop: each check drives the client through one recovery path and
+asserts what it sees, then the script prints ``ok`` per check (exit status 1
+on the first failure).
+
+- ETag revalidation survives a server restart: polls during the outage fail
+  without dropping the validators, the restarted server answers the same
+  payload with a 304 and a changed one with the new rows.
+- The circuit breaker opens after its failure threshold, keeps requests off
+  the server, lets exactly one trial through once the cooldown passes, and
+  re-opens or closes on that trial's outcome.
+- Backoff delays stay within ``[0, min(cap, base * 2**n)]``, actually use
+  that range (full jitter), and restart from ``base`` after a success.
+
+    python -m benchmarks.check_market_client
+"""
+import argparse
+import random
+import sys
+
+import requests
+
+from market_client import Backoff, CircuitBreaker, CircuitOpenError, MarketDataClient
+from benchmarks.standin_server import StandInServer
+from benchmarks.synthetic import synthetic_tickers
+
+
+def check_revalidation_after_restart():
+    payload = synthetic_tickers(50)
+    server = StandInServer(payload).start()
+    port = server.server_address[1]
+    client = MarketDataClient(server.url)
+    try:
+        assert len(client.fetch_ticker()) == len(payload)
+        etag = client.etag
+        assert etag and client.last_modified
+        assert client.fetch_ticker() is None, "unchanged payload must come back as 304"
+
+        server.stop()
+        try:
+            client.fetch_ticker()
+        except requests.RequestException:
+            pass
+        else:
+            raise AssertionError("fetch from a stopped server succeeded")
+        assert client.etag == etag, "a failed poll must keep the validators"
+
+        # Same payload on a fresh process/connection: the kept ETag still matches
+        server = StandInServer(payload, port=port).start()
+        hits = server.hits
+        assert client.fetch_ticker() is None, "restarted server with the same payload must answer 304"
+        assert server.hits == hits + 1
+        assert client.breaker.state == CircuitBreaker.CLOSED and client.backoff.attempts == 0
+
+        payload[0]['last_price'] = str(float(payload[0]['last_price']) * 2)
+        server.stop()
+        server = StandInServer(payload, port=port).start()
+        rows = client.fetch_ticker()
+        assert rows is not None and len(rows) == len(payload), "changed payload must come back in full"
+        assert client.etag != etag
+        assert client.fetch_ticker() is None
+    finally:
+        client.close()
+        server.stop()
+
+
+def check_breaker_half_open():
+    server = StandInServer(synthetic_tickers(10)).start()
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=20, clock=lambda: clock[0])
+    client = MarketDataClient(server.url, breaker=breaker, backoff=Backoff(base=1, cap=30, rng=random.Random(0)))
+    try:
+        server.fail_next = 3
+        for attempt in range(3):
+            assert breaker.state == CircuitBreaker.CLOSED, f"opened early, after {attempt} failures"
+            try:
+                client.fetch_ticker()
+            except CircuitOpenError:
+                raise AssertionError("breaker opened before its threshold")
+            except requests.RequestException:
+                pass
+        assert breaker.state == CircuitBreaker.OPEN
+
+        hits = server.hits
+        for _ in range(5):
+            try:
+                client.fetch_ticker()
+            except CircuitOpenError:
+                pass
+            else:
+                raise AssertionError("open breaker let a request through")
+        assert server.hits == hits, "open breaker must not reach the server"
+        assert client.retry_delay() >= breaker.remaining() == 20
+
+        # Cooldown over: one trial; its failure re-opens at once, without a new threshold
+        clock[0] += 20
+        assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.remaining() == 0
+        server.fail_next = 1
+        try:
+            client.fetch_ticker()
+        except CircuitOpenError:
+            raise AssertionError("half-open breaker refused its trial request")
+        except requests.RequestException:
+            pass
+        assert server.hits == hits + 1
+        assert breaker.state == CircuitBreaker.OPEN and breaker.remaining() == 20
+
+        clock[0] += 19.5
+        try:
+            client.fetch_ticker()
+        except CircuitOpenError:
+            pass
+        else:
+            raise AssertionError("breaker let a request through before the cooldown ended")
+
+        # A successful trial closes it and resets the backoff
+        clock[0] += 0.5
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert client.fetch_ticker() is not None
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+        assert client.backoff.attempts == 0
+    finally:
+        client.close()
+        server.stop()
+
+
+def check_backoff_bounds(samples=2000):
+    base, cap = 0.5, 30.0
+    for seed in range(samples // 20):
+        backoff = Backoff(base=base, cap=cap, rng=random.Random(seed))
+        for attempt in range(20):
+            bound = min(cap, base * 2 ** attempt)
+            delay = backoff.next_delay()
+            assert 0 <= delay <= bound, f"attempt {attempt}: {delay} outside [0, {bound}]"
+
+    # Full jitter: delays spread over the whole window, not clustered at its top
+    rng = random.Random(1)
+    delays = []
+    for _ in range(samples):
+        backoff = Backoff(base=base, cap=cap, rng=rng)
+        for _ in range(10): backoff.next_delay()
+        delays.append(backoff.next_delay())
+    assert max(delays) <= cap
+    assert min(delays) < 0.05 * cap and max(delays) > 0.95 * cap, "delays do not cover [0, cap]"
+    assert 0.4 * cap < sum(delays) / len(delays) < 0.6 * cap, "delays are not uniform over [0, cap]"
+
+    backoff = Backoff(base=base, cap=cap, rng=random.Random(2))
+    for _ in range(8): backoff.next_delay()
+    backoff.reset()
+    assert backoff.next_delay() <= base, "reset must start over from base"
+
+
+CHECKS = (
+    ('304 revalidation after a server restart', check_revalidation_after_restart),
+    ('breaker half-open after the cooldown', check_breaker_half_open),
+    ('jittered backoff bounds', check_backoff_bounds),
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args(argv)
+    for name, check in CHECKS:
+        try:
+            check()
+        except AssertionError as e:
+            print(f"FAIL {name}: {e}")
+            sys.exit(1)
+        print(f"ok   {name}")
+
+
+if __name__ == '__main__':
+    main()
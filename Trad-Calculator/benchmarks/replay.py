@@ -0,0 +1,405 @@
+"""Replay harness: recorded or synthetic tickers through the full pipeline.
+
+Ticker snapshots are served by the local stand-in server and pushed through
+fetch -> parse -> sort/diff -> render, the same code the app runs. Three
+scenarios each run in their own child interpreter, so every one reports a
+clean peak RSS:
+
+  throughput  closed loop: publish a snapshot, fetch, diff and render it
+  replay      open loop: publish at ``--rate`` while ``MarketPipeline``
+              polls and the Tk-side pump renders; latency is publish -> render
+  math        batch fee / P&L / risk math and FIFO ledger matching at scale
+
+Rendering uses a real ``VirtualCryptoList`` and needs a display; without one
+the child is re-run under ``xvfb-run`` when it is installed, otherwise the
+render stage is skipped and reported as such. Results are JSON (``-o``);
+``--baseline`` compares against an earlier file and exits non-zero when a
+metric regressed by more than ``--tolerance``.
+
+    python -m benchmarks.replay record -o data/session.jsonl --count 30 --interval 60
+    python -m benchmarks.replay run --markets 2000 -o results.json
+    python -m benchmarks.replay run --payloads data/session.jsonl --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+from benchmarks.synthetic import drifting_snapshots, synthetic_tickers
+
+SCHEMA = 1
+SCENARIOS = ('throughput', 'replay', 'math')
+RENDER_SCENARIOS = ('throughput', 'replay')
+PUMP_INTERVAL = 0.05  # app.PUMP_INTERVAL_MS
+# Stage spans (see instrumentation.py) reported per scenario
+STAGES = ('ticker.request', 'ticker.decode', 'ticker.sort', 'ticker.diff', 'ui.pump', 'ui.layout')
+
+
+def percentiles(samples):
+    """``{'p50_ms', 'p99_ms', 'max_ms'}`` of second-valued ``samples``."""
+    ordered = sorted(samples)
+    if not ordered: return {'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    def pick(q): return ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000
+    return {'p50_ms': pick(0.5), 'p99_ms': pick(0.99), 'max_ms': ordered[-1] * 1000}
+
+
+def peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def load_payloads(path):
+    """Snapshots from a ``record`` JSONL file, or one from a JSON array file."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return [json.load(f)]
+
+
+def snapshots(args):
+    """The payload sequence every child rebuilds identically from ``args``.
+
+    Row timestamps are rewritten to the snapshot index, which is how a
+    consumer maps a parsed changeset back to when it was published.
+    """
+    if args.payloads:
+        recorded = load_payloads(args.payloads)
+        if len(recorded) > 1:
+            return [[dict(row, timestamp=i) for row in payload] for i, payload in enumerate(recorded)]
+        base = recorded[0]
+    else:
+        base = synthetic_tickers(args.markets, quotes=('INR', 'USDT', 'BTC'))
+    return list(drifting_snapshots(base, args.snapshots, args.changed))
+
+
+def stage_timings(instruments):
+    _, histograms = instruments.snapshot()
+    return {name: {'count': h['count'], 'p50_ms': h['p50'] * 1000, 'p99_ms': h['p99'] * 1000}
+            for name, h in histograms.items() if name in STAGES}
+
+
+def make_renderer(mode):
+    """``(render(changeset), root)`` over a real ``VirtualCryptoList``, or ``(None, None)``."""
+    if mode == 'off': return None, None
+    import tkinter as tk
+    from tkinter import ttk
+    from crypto_list import VirtualCryptoList
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        if mode == 'on': sys.exit(f"No display available: {e}")
+        return None, None
+    root.geometry('420x800')
+    frame = ttk.Frame(root)
+    frame.pack(fill='both', expand=True)
+    frame.rowconfigure(0, weight=1)
+    frame.columnconfigure(0, weight=1)
+    crypto_list = VirtualCryptoList(frame)
+    crypto_list.grid()
+    root.update()
+
+    def render(changeset):
+        # What InvestmentCalculator.apply_ticker_changes does with no search active
+        if changeset.structural: crypto_list.set_items(changeset.rows)
+        else: crypto_list.patch_items(changeset.rows, set(changeset.changed))
+        # Run the deferred layout and draw, as the next Tk idle pass would
+        root.update()
+    return render, root
+
+
+def run_throughput(args, payloads):
+    from instrumentation import instruments
+    from market_client import MarketDataClient
+    from ticker_store import TickerStore
+    from benchmarks.standin_server import StandInServer
+
+    render, root = make_renderer(args.render)
+    instruments.enable()
+    server = StandInServer(payloads[0]).start()
+    client = MarketDataClient(server.url)
+    store = TickerStore()
+    totals, renders, rows = [], [], 0
+    try:
+        for payload in payloads:
+            server.publish(payload)
+            start = time.perf_counter()
+            parsed = client.fetch_ticker(args.quote)
+            changeset = store.update(parsed)
+            if render is not None:
+                rendered = time.perf_counter()
+                render(changeset)
+                renders.append(time.perf_counter() - rendered)
+            totals.append(time.perf_counter() - start)
+            rows += len(parsed)
+    finally:
+        server.stop()
+        client.close()
+        if root is not None: root.destroy()
+    elapsed = sum(totals)
+    return {
+        'snapshots': len(totals),
+        'rows_per_snapshot': rows // max(len(totals), 1),
+        'snapshots_per_s': len(totals) / elapsed,
+        'rows_per_s': rows / elapsed,
+        'latency': percentiles(totals),
+        'render': percentiles(renders) if render is not None else 'skipped (no display)',
+        'stages': stage_timings(instruments),
+    }
+
+
+def run_replay(args, payloads):
+    from instrumentation import instruments
+    from market_client import MarketDataClient
+    from market_pipeline import MarketPipeline
+    from ticker_store import TickerStore
+    from benchmarks.standin_server import StandInServer
+
+    render, root = make_renderer(args.render)
+    instruments.enable()
+    server = StandInServer(payloads[0]).start()
+    published = {0: time.perf_counter()}
+    pipeline = MarketPipeline(MarketDataClient(server.url), TickerStore(), quote=args.quote,
+                              poll_interval=args.poll_interval)
+    latencies = []
+
+    def publish():
+        for i, payload in enumerate(payloads[1:], 1):
+            time.sleep(1 / args.rate)
+            published[i] = time.perf_counter()
+            server.publish(payload)
+
+    def on_ticker(changeset):
+        if render is not None: render(changeset)
+        # Rows carry their snapshot index as the timestamp
+        index = max(row['timestamp'] for row in changeset.rows)
+        latencies.append(time.perf_counter() - published[index])
+        return index
+
+    last = len(payloads) - 1
+    seen = [-1]
+    publisher = threading.Thread(target=publish, daemon=True)
+    start = time.perf_counter()
+    pipeline.start()
+    publisher.start()
+    deadline = start + last / args.rate + args.drain_timeout
+    try:
+        while seen[0] < last and time.perf_counter() < deadline:
+            pipeline.pump(lambda changeset: seen.__setitem__(0, on_ticker(changeset)), lambda market, book: None)
+            if root is not None: root.update()
+            time.sleep(PUMP_INTERVAL)
+    finally:
+        pipeline.stop()
+        server.stop()
+        if root is not None: root.destroy()
+    elapsed = time.perf_counter() - start
+    return {
+        'published': len(published),
+        'rendered': len(latencies),
+        'caught_up': seen[0] == last,
+        'coalesced': pipeline.queue.coalesced,
+        'rate_per_s': args.rate,
+        'rendered_per_s': len(latencies) / elapsed,
+        'publish_to_render': percentiles(latencies),
+        'render': 'on' if render is not None else 'skipped (no display)',
+        'stages': stage_timings(instruments),
+    }
+
+
+def run_math(args, payloads):
+    import random
+    from calc_engine import batch_investable, batch_risk_analysis, batch_trade_pnl
+    from ledger import TradeLedger
+
+    rng = random.Random(0)
+    n = args.math_rows
+    principals = [rng.uniform(100, 1e6) for _ in range(n)]
+    prices = [rng.uniform(1, 5e6) for _ in range(n)]
+    quantities = [rng.uniform(0.001, 10) for _ in range(n)]
+    costs = [p * q * rng.uniform(0.8, 1.2) for p, q in zip(prices, quantities)]
+    risks = [rng.uniform(0.5, 20) for _ in range(n)]
+
+    results = {'rows': n}
+    for name, fn in (('investable', lambda: batch_investable(principals)),
+                     ('trade_pnl', lambda: batch_trade_pnl(prices, quantities, costs)),
+                     ('risk', lambda: batch_risk_analysis(1e6, prices, risks))):
+        start = time.perf_counter()
+        fn()
+        results[f'{name}_rows_per_s'] = n / (time.perf_counter() - start)
+
+    markets = [f"C{i:04d}INR" for i in range(500)]
+    held = dict.fromkeys(markets, 0.0)
+    ledger = TradeLedger()
+    start = time.perf_counter()
+    for _ in range(args.fills):
+        market = markets[rng.randrange(len(markets))]
+        if held[market] > 0 and rng.random() < 0.45:
+            quantity = held[market] * rng.uniform(0.05, 1.0)
+            held[market] -= quantity
+            ledger.sell(market, quantity, rng.uniform(10, 1000))
+        else:
+            quantity = rng.uniform(0.01, 10)
+            held[market] += quantity
+            ledger.buy(market, quantity, rng.uniform(10, 1000))
+    results['ledger_fills_per_s'] = args.fills / (time.perf_counter() - start)
+    return results
+
+
+RUNNERS = {'throughput': run_throughput, 'replay': run_replay, 'math': run_math}
+
+
+def child_command(argv, scenario, wrap_xvfb):
+    command = [sys.executable, '-m', 'benchmarks.replay', *argv, '--child', scenario]
+    return ['xvfb-run', '-a', *command] if wrap_xvfb else command
+
+
+def run_scenario(argv, scenario, render):
+    """Run one scenario in a fresh interpreter and return its result dict."""
+    wrap = (scenario in RENDER_SCENARIOS and render != 'off' and not os.environ.get('DISPLAY')
+            and sys.platform.startswith('linux') and shutil.which('xvfb-run') is not None)
+    result = subprocess.run(child_command(argv, scenario, wrap), capture_output=True, text=True)
+    if result.returncode:
+        lines = result.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else f"exit status {result.returncode}"}
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=''):
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict): yield from flatten(value, path + '.')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool): yield path, value
+
+
+def direction(metric):
+    """+1 when higher is better, -1 when lower is better, 0 for plain counts."""
+    if metric.endswith('_per_s'): return 1
+    if metric.endswith(('_ms', '_mb')): return -1
+    return 0
+
+
+def compare(baseline, current, tolerance):
+    """Lines describing every tracked metric, plus the list of regressions."""
+    old = dict(flatten(baseline['scenarios']))
+    lines, regressions = [], []
+    for metric, value in flatten(current['scenarios']):
+        sign = direction(metric)
+        # Stage timings are diagnostic; only headline metrics gate
+        if not sign or metric not in old or '.stages.' in metric or not old[metric]: continue
+        change = (value - old[metric]) / old[metric]
+        worse = -change * sign > tolerance
+        lines.append(f"{metric:<48}{old[metric]:>14,.2f}{value:>14,.2f}{change:>+9.1%}{'  REGRESSED' if worse else ''}")
+        if worse: regressions.append(metric)
+    return lines, regressions
+
+
+def record(args):
+    """Poll a live ticker endpoint and append each raw payload as one JSONL line."""
+    import requests
+    with requests.Session() as session, open(args.output, 'a', encoding='utf-8') as f:
+        for i in range(args.count):
+            if i: time.sleep(args.interval)
+            payload = session.get(args.url, timeout=10).json()
+            f.write(json.dumps(payload, separators=(',', ':')) + "\n")
+            f.flush()
+            print(f"snapshot {i + 1}/{args.count}: {len(payload)} markets", file=sys.stderr)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    recorder = commands.add_parser('record', help="record live ticker payloads for replay")
+    recorder.add_argument('-o', '--output', required=True)
+    recorder.add_argument('--url', default="https://api.coindcx.com/exchange/ticker")
+    recorder.add_argument('--count', type=int, default=10)
+    recorder.add_argument('--interval', type=float, default=60.0)
+
+    runner = commands.add_parser('run', help="run the scenarios and emit JSON results")
+    runner.add_argument('--payloads', help="recorded .jsonl from 'record', or one JSON array (drifted)")
+    runner.add_argument('--markets', type=int, default=1000, help="synthetic markets when no --payloads")
+    runner.add_argument('--snapshots', type=int, default=200)
+    runner.add_argument('--changed', type=float, default=0.2, help="share of markets moving per snapshot")
+    runner.add_argument('--quote', default='INR')
+    runner.add_argument('--rate', type=float, default=10.0, help="replay: snapshots published per second")
+    runner.add_argument('--poll-interval', type=float, default=0.02, help="replay: pipeline poll interval (s)")
+    runner.add_argument('--drain-timeout', type=float, default=10.0)
+    runner.add_argument('--math-rows', type=int, default=1_000_000)
+    runner.add_argument('--fills', type=int, default=200_000)
+    runner.add_argument('--render', choices=('auto', 'on', 'off'), default='auto')
+    runner.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    runner.add_argument('-o', '--output', help="write results JSON here (default: stdout)")
+    runner.add_argument('--baseline', help="earlier results JSON to compare against")
+    runner.add_argument('--tolerance', type=float, default=0.15, help="allowed relative regression")
+    runner.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        return record(args)
+
+    if args.child:
+        result = RUNNERS[args.child](args, snapshots(args))
+        result['peak_rss_mb'] = peak_rss_mb()
+        print(json.dumps(result))
+        return
+
+    # Children re-parse the same options and ignore the parent-only ones
+    child_argv = argv
+    results = {
+        'schema': SCHEMA,
+        'meta': {
+            'commit': git_commit(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('command', 'child', 'output', 'baseline')},
+        },
+        'scenarios': {},
+    }
+    for scenario in args.scenarios:
+        started = time.perf_counter()
+        results['scenarios'][scenario] = run_scenario(child_argv, scenario, args.render)
+        status = results['scenarios'][scenario].get('error', 'ok')
+        print(f"{scenario:<12} {time.perf_counter() - started:6.1f} s  {status}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        lines, regressions = compare(baseline, results, args.tolerance)
+        print(f"{'metric':<48}{'baseline':>14}{'current':>14}{'change':>9}", file=sys.stderr)
+        for line in lines:
+            print(line, file=sys.stderr)
+        if regressions:
+            sys.exit(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Local stand-in for the CoinDCX ticker and order book endpoints.
+
+Serves a recorded or synthetic payload over HTTP/1.1 keep-alive with ETag and
+Last-Modified validators, gzip when the client asks for it, and optional
+fault injection. Order books are synthesized around each market's last
+price. Run directly to serve on a fixed port:
+
+    python -m benchmarks.standin_server --port 8765 --markets 500
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import synthetic_order_book, synthetic_tickers
+
+ORDER_BOOK_PATH = '/market_data/orderbook'
+SAMPLE_PAYLOAD = os.path.join(os.path.dirname(__file__), 'data', 'ticker_sample.json')
+
+
+def load_sample():
+    with open(SAMPLE_PAYLOAD, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK (~40 ms) on a keep-alive socket
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        server.hits += 1
+        if server.fail_next > 0:
+            server.fail_next -= 1
+            self._send(503, b'{"error": "unavailable"}')
+            return
+        url = urlsplit(self.path)
+        if url.path == ORDER_BOOK_PATH:
+            self._send_order_book(parse_qs(url.query).get('pair', [''])[0])
+            return
+
+        body, etag, modified = server.current()
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if 'If-None-Match' in self.headers:
+            not_modified = self.headers['If-None-Match'] == etag
+        else:
+            not_modified = self.headers.get('If-Modified-Since') == modified
+        if not_modified:
+            self._send(304, b'', {'ETag': etag, 'Last-Modified': modified})
+            return
+
+        headers = {'ETag': etag, 'Last-Modified': modified, 'Content-Type': 'application/json'}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self._send(200, body, headers)
+
+    def _send_order_book(self, pair):
+        # 'I-BTC_INR' -> 'BTCINR'
+        market = pair.partition('-')[2].replace('_', '')
+        price = self.server.last_price(market)
+        if price is None:
+            self._send(404, b'{"error": "unknown pair"}')
+            return
+        body = json.dumps(synthetic_order_book(price, seed=self.server.version)).encode()
+        self._send(200, body, {'Content-Type': 'application/json'})
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded stand-in server; ``publish`` swaps the payload it serves."""
+
+    daemon_threads = True
+
+    def __init__(self, payload, host='127.0.0.1', port=0):
+        super().__init__((host, port), TickerHandler)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.fail_next = 0
+        self.version = 0
+        self._mtime = 0
+        self.publish(payload)
+
+    def publish(self, payload):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        prices = {row['market']: float(row['last_price']) for row in payload}
+        with self.lock:
+            self._prices = prices
+            self.version += 1
+            self._body = body
+            self._etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            # HTTP dates have one-second resolution; keep them strictly increasing
+            self._mtime = max(int(time.time()), self._mtime + 1)
+            self._modified = formatdate(self._mtime, usegmt=True)
+
+    def current(self):
+        with self.lock:
+            return self._body, self._etag, self._modified
+
+    def last_price(self, market):
+        with self.lock:
+            return self._prices.get(market)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/exchange/ticker"
+
+    @property
+    def order_book_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{ORDER_BOOK_PATH}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--markets', type=int, default=0, help="serve synthetic markets instead of the recorded sample")
+    args = parser.parse_args(argv)
+    payload = synthetic_tickers(args.markets, quotes=('INR', 'USDT', 'BTC')) if args.markets else load_sample()
+    server = StandInServer(payload, port=args.port)
+    print(f"Serving {len(payload)} markets at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import math
+import random
+import time
+
+QUOTES = ('INR', 'USDT', 'BTC')
+
+
+def synthetic_tickers(count, seed=0, quotes=('INR',)):
+    """Build ``count`` ticker dicts shaped like CoinDCX ``/exchange/ticker`` rows."""
+    rng = random.Random(seed)
+    now = int(time.time())
+    tickers = []
+    for i in range(count):
+        price = rng.uniform(0.001, 5_000_000)
+        spread = price * rng.uniform(0.001, 0.1)
+        tickers.append({
+            'market': f"C{i:05d}{quotes[i % len(quotes)]}",
+            'change_24_hour': f"{rng.uniform(-25, 25):.3f}",
+            'high': f"{price + spread:.6f}",
+            'low': f"{price - spread:.6f}",
+            'volume': f"{rng.uniform(0, 1e7):.2f}",
+            'last_price': f"{price:.6f}",
+            'bid': f"{price * 0.999:.6f}",
+            'ask': f"{price * 1.001:.6f}",
+            'timestamp': now,
+        })
+    return tickers
+
+
+def synthetic_order_book(mid, depth=50, seed=0, changed_fraction=0.2):
+    """Build a CoinDCX ``/market_data/orderbook`` body around ``mid``.
+
+    Levels sit on a fixed price grid, so a small move of ``mid`` shifts
+    only the levels near the touch. A level keeps its quantity from one
+    ``seed`` to the next unless it is among the ``changed_fraction`` that
+    moved, as in a live book polled every few seconds.
+    """
+    digits = math.floor(math.log10(mid)) - 4
+    tick = 10.0 ** digits
+    center = round(mid / tick)
+
+    def level(i):
+        key = f"{i * tick:.{max(0, -digits)}f}"
+        rng = random.Random(f"{key}/{seed}")
+        if rng.random() >= changed_fraction:
+            rng = random.Random(key)
+        return key, f"{rng.uniform(0.001, 10):.6f}"
+
+    bids = dict(level(center - i - 1) for i in range(depth))
+    asks = dict(level(center + i + 1) for i in range(depth))
+    return {'bids': bids, 'asks': asks}
+
+
+def drifting_snapshots(payload, count, changed_fraction=0.2, seed=0, start=0):
+    """Yield ``count`` successive copies of a ticker payload in which about
+    ``changed_fraction`` of the markets moved since the previous one.
+
+    Every row of snapshot ``i`` carries ``timestamp = start + i``, so a
+    consumer can tell which snapshot a parsed row came from.
+    """
+    rng = random.Random(seed)
+    rows = [dict(row) for row in payload]
+    for i in range(count):
+        if i:
+            for row in rng.sample(rows, max(1, int(len(rows) * changed_fraction))):
+                price = float(row['last_price']) * rng.uniform(0.99, 1.01)
+                row['last_price'] = f"{price:.6f}"
+                row['high'] = f"{max(float(row['high']), price):.6f}"
+                row['low'] = f"{min(float(row['low']), price):.6f}"
+                row['change_24_hour'] = f"{float(row['change_24_hour']) + rng.uniform(-0.5, 0.5):.3f}"
+                row['volume'] = f"{float(row['volume']) + rng.uniform(0, 100):.2f}"
+        snapshot = [dict(row, timestamp=start + i) for row in rows]
+        yield snapshot
+
+
+def synthetic_trades(count, markets=300, start=0.0, interval=10.0, seed=0):
+    """Yield ``count`` chronological ``(market, side, quantity, price, timestamp)``
+    trades; about a third are sells of part of what is held."""
+    rng = random.Random(seed)
+    names = [f"C{i:03d}INR" for i in range(markets)]
+    held = dict.fromkeys(names, 0.0)
+    for i in range(count):
+        market = rng.choice(names)
+        if held[market] > 0 and rng.random() < 0.45:
+            quantity = held[market] * rng.uniform(0.1, 1)
+            held[market] -= quantity
+            yield market, 'sell', quantity, rng.uniform(90, 120), start + i * interval
+        else:
+            quantity = rng.uniform(0.1, 5)
+            held[market] += quantity
+            yield market, 'buy', quantity, rng.uniform(90, 110), start + i * interval
+
+
+def synthetic_daily_bars(days, seed=0, start_price=100.0, volatility=0.04):
+    """``(open, high, low, close)`` lists of a random walk, one bar per day."""
+    rng = random.Random(seed)
+    opens, highs, lows, closes = [], [], [], []
+    price = start_price
+    for _ in range(days):
+        close = price * math.exp(rng.gauss(0, volatility))
+        opens.append(price)
+        highs.append(max(price, close) * (1 + abs(rng.gauss(0, volatility / 2))))
+        lows.append(min(price, close) * (1 - abs(rng.gauss(0, volatility / 2))))
+        closes.append(close)
+        price = close * math.exp(rng.gauss(0, volatility / 4))
+    return opens, highs, lows, closes
@@ -0,0 +1,228 @@
+"""Headless calculator: stream trades through the fee/P&L/risk engine.
+
+Reads CSV or JSONL records from a file or stdin and writes one result record
+per input record, in chunks, so memory use does not grow with input size.
+Each output record is the input record plus the computed fields.
+
+    python -m calc_cli pnl trades.csv > results.jsonl
+    cat targets.jsonl | python -m calc_cli principal --output-format csv
+
+Fields read per calculation:
+    investable  principal
+    principal   target
+    pnl         sell_price, sell_quantity, and cost or buy_price
+    risk        buy_price, risk_percentage, and total_invested or quantity
+
+With --order-book, pnl prices each sell at what the bids can fill (its
+volume-weighted price) and adds the fill, slippage and quoted_pnl columns.
+The book is a saved CoinDCX order book JSON file or a market to fetch, e.g.
+
+    python -m calc_cli pnl trades.csv --order-book BTCINR
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
+from calc_engine import (FeeSchedule, batch_investable, batch_required_principal,
+                         batch_risk_analysis, batch_trade_pnl)
+
+CHUNK_SIZE = 8192
+
+
+def _field(record, name):
+    value = record.get(name)
+    if value in (None, ''):
+        raise ValueError(f"missing field '{name}'")
+    number = float(value)
+    # As the GUI's inputs: nan, inf and values <= 0 are not valid amounts
+    if not (math.isfinite(number) and number > 0):
+        raise ValueError(f"'{name}' must be a positive number, got {value!r}")
+    return number
+
+
+def _pnl_inputs(record):
+    price, quantity = _field(record, 'sell_price'), _field(record, 'sell_quantity')
+    cost = _field(record, 'cost') if record.get('cost') not in (None, '') else _field(record, 'buy_price') * quantity
+    return price, quantity, cost
+
+
+def _risk_inputs(record):
+    buy_price = _field(record, 'buy_price')
+    if record.get('total_invested') not in (None, ''):
+        invested = _field(record, 'total_invested')
+    else:
+        invested = _field(record, 'quantity') * buy_price
+    return invested, buy_price, _field(record, 'risk_percentage')
+
+
+# name -> (parse one record into engine inputs, batch engine call)
+CALCULATIONS = {
+    'investable': (lambda r: (_field(r, 'principal'),), lambda cols, fees: batch_investable(cols[0], fees)),
+    'principal': (lambda r: (_field(r, 'target'),),
+                  lambda cols, fees: {'principal': batch_required_principal(cols[0], fees)}),
+    'pnl': (_pnl_inputs, lambda cols, fees: batch_trade_pnl(*cols, fees)),
+    'risk': (_risk_inputs, lambda cols, fees: batch_risk_analysis(*cols)),
+}
+
+
+def read_records(stream, fmt):
+    """Records from CSV or JSONL. A JSONL line that does not decode is yielded
+    as its ``ValueError``, so ``run`` skips that record alone."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    loads = orjson.loads if orjson is not None else json.loads
+    for line in stream:
+        if line.strip():
+            try:
+                record = loads(line)
+            except ValueError as e:
+                record = ValueError(f"invalid JSON: {e}")
+            yield record
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
+
+
+def result_columns(result):
+    """Turn an engine result (namedtuple or dict of arrays) into plain lists."""
+    items = result._asdict().items() if hasattr(result, '_asdict') else result.items()
+    return {name: values.tolist() if hasattr(values, 'tolist') else list(values) for name, values in items}
+
+
+def load_order_book(source, url=None):
+    """An ``OrderBook`` from a saved order book JSON file, or fetched for a market."""
+    from order_book import OrderBook, OrderBookCache
+    if os.path.exists(source):
+        from market_client import order_book_levels
+        with open(source, encoding='utf-8') as f:
+            book = OrderBook(source)
+            book.update(order_book_levels(json.load(f)))
+            return book
+    from market_client import ORDER_BOOK_URL, MarketDataClient
+    client = MarketDataClient(order_book_url=url or ORDER_BOOK_URL)
+    try:
+        return OrderBookCache(client).get(source)
+    finally:
+        client.close()
+
+
+def run(calculation, records, out, fmt='jsonl', schedule=None, chunk_size=CHUNK_SIZE, errors=None,
+        order_book=None):
+    """Stream ``records`` through ``calculation``; returns ``(done, skipped)``.
+
+    With ``order_book``, ``pnl`` is priced at the book's fills (see
+    ``order_book.book_trade_pnl``).
+    """
+    parse, compute = CALCULATIONS[calculation]
+    if order_book is not None:
+        from order_book import book_trade_pnl
+        compute = lambda cols, fees: book_trade_pnl(order_book, *cols, fees)
+    schedule = schedule or FeeSchedule()
+    writer = None
+    done = skipped = seen = 0
+    for chunk in _chunks(records, chunk_size):
+        valid, inputs = [], []
+        for record in chunk:
+            seen += 1
+            try:
+                if isinstance(record, ValueError): raise record
+                if not isinstance(record, dict): raise TypeError("a record must be an object")
+                inputs.append(parse(record))
+                valid.append(record)
+            except (ValueError, TypeError) as e:
+                skipped += 1
+                if errors is not None:
+                    errors.write(f"skipped record {seen}: {e}\n")
+        if not valid: continue
+
+        results = result_columns(compute(list(zip(*inputs)), schedule))
+        rows = []
+        for record, values in zip(valid, zip(*results.values())):
+            row = dict(record)
+            row.update(zip(results, values))
+            rows.append(row)
+        if fmt == 'csv':
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(rows[0]), extrasaction='ignore')
+                writer.writeheader()
+            writer.writerows(rows)
+        elif orjson is not None:
+            out.write(b'\n'.join(map(orjson.dumps, rows)).decode() + '\n')
+        else:
+            out.write('\n'.join(map(json.dumps, rows)) + '\n')
+        done += len(valid)
+    return done, skipped
+
+
+def _guess_format(path):
+    return 'csv' if path and path.lower().endswith('.csv') else 'jsonl'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='calc_cli', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('calculation', choices=CALCULATIONS)
+    parser.add_argument('input', nargs='?', default='-', help="CSV/JSONL file, or - for stdin (default)")
+    parser.add_argument('-o', '--output', default='-', help="output file, or - for stdout (default)")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'), help="default: from the file extension, else jsonl")
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'), help="default: from the file extension, else jsonl")
+    parser.add_argument('--platform-fee', type=float, default=0.005, help="platform fee rate (default 0.005)")
+    parser.add_argument('--gst', type=float, default=0.18, help="GST rate on the platform fee (default 0.18)")
+    parser.add_argument('--tds', type=float, default=0.01, help="TDS rate on sells (default 0.01)")
+    parser.add_argument('--order-book', metavar='FILE_OR_MARKET',
+                        help="pnl: price sells at this order book's fills (a saved JSON file, or a market to fetch)")
+    parser.add_argument('--order-book-url', help=argparse.SUPPRESS)
+    parser.add_argument('--quiet', action='store_true', help="do not report throughput on stderr")
+    args = parser.parse_args(argv)
+    if args.order_book and args.calculation != 'pnl':
+        parser.error("--order-book only applies to pnl")
+
+    in_fmt = args.input_format or _guess_format(args.input if args.input != '-' else None)
+    out_fmt = args.output_format or _guess_format(args.output if args.output != '-' else None)
+    schedule = FeeSchedule(args.platform_fee, args.gst, args.tds)
+
+    order_book = None
+    if args.order_book:
+        try:
+            order_book = load_order_book(args.order_book, args.order_book_url)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"calc_cli: could not load order book {args.order_book}: {e}\n")
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        done, skipped = run(args.calculation, read_records(source, in_fmt), sink, out_fmt, schedule, errors=sys.stderr,
+                            order_book=order_book)
+    except ValueError as e:
+        parser.exit(1, f"calc_cli: invalid input: {e}\n")
+    finally:
+        if source is not sys.stdin: source.close()
+        if sink is not sys.stdout: sink.close()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = done / elapsed if elapsed > 0 else 0.0
+        sys.stderr.write(f"{args.calculation}: {done:,} trades in {elapsed:.2f} s ({rate:,.0f} trades/s)"
+                         + (f", {skipped:,} skipped" if skipped else "") + "\n")
+
+
+if __name__ == '__main__':
+    main()
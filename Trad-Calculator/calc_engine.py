@@ -0,0 +1,128 @@
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch calls fall back to list comprehensions
+    np = None
+
+Investable = namedtuple('Investable', 'principal platform_fee gst total_fees investable')
+TradePnl = namedtuple('TradePnl', 'gross platform_fee gst after_fees tds withdrawal cost pnl')
+RiskReport = namedtuple('RiskReport', 'level risk_amount stop_loss')
+
+# Upper bounds (inclusive, in %) of each risk level; anything above the last
+# bound is the final level
+RISK_THRESHOLDS = (5, 10, 15)
+RISK_LEVELS = ("CONSERVATIVE", "MODERATE", "AGGRESSIVE", "VERY HIGH RISK")
+
+
+class FeeSchedule:
+    """CoinDCX-style fee rules: a platform fee, GST on that fee, TDS on sells."""
+
+    def __init__(self, platform_fee_rate=0.005, gst_rate=0.18, tds_rate=0.01):
+        self.platform_fee_rate = platform_fee_rate
+        self.gst_rate = gst_rate
+        self.tds_rate = tds_rate
+
+    @property
+    def fee_factor(self):
+        """Share of an amount lost to platform fee plus GST (0.0059 by default)."""
+        return self.platform_fee_rate * (1 + self.gst_rate)
+
+    @property
+    def net_factor(self):
+        """Share of an amount left after fees (the old ``0.9941`` constant)."""
+        return 1 - self.fee_factor
+
+    def describe(self):
+        return (f"• Platform Fee: {self.platform_fee_rate * 100:g}% of principal\n"
+                f"• GST on Platform Fee: {self.gst_rate * 100:g}%\n"
+                f"• Final investable amount = Principal - Fees")
+
+    def __repr__(self):
+        return (f"FeeSchedule(platform_fee_rate={self.platform_fee_rate}, "
+                f"gst_rate={self.gst_rate}, tds_rate={self.tds_rate})")
+
+
+DEFAULT_SCHEDULE = FeeSchedule()
+
+
+def investable_amount(principal, schedule=DEFAULT_SCHEDULE):
+    platform_fee = principal * schedule.platform_fee_rate
+    gst = platform_fee * schedule.gst_rate
+    total_fees = platform_fee + gst
+    return Investable(principal, platform_fee, gst, total_fees, principal - total_fees)
+
+
+def required_principal(target_investable, schedule=DEFAULT_SCHEDULE):
+    """Principal whose investable amount is exactly ``target_investable``."""
+    return target_investable / schedule.net_factor
+
+
+def trade_pnl(sell_price, sell_quantity, cost, schedule=DEFAULT_SCHEDULE):
+    """Net P&L of selling ``sell_quantity`` at ``sell_price`` against ``cost``.
+
+    Platform fee and GST come off the gross sale, then TDS is withheld from
+    what is left.
+    """
+    gross = sell_quantity * sell_price
+    platform_fee = gross * schedule.platform_fee_rate
+    gst = platform_fee * schedule.gst_rate
+    after_fees = gross - platform_fee - gst
+    tds = after_fees * schedule.tds_rate
+    withdrawal = after_fees - tds
+    return TradePnl(gross, platform_fee, gst, after_fees, tds, withdrawal, cost, withdrawal - cost)
+
+
+def risk_level(risk_percentage):
+    for bound, level in zip(RISK_THRESHOLDS, RISK_LEVELS):
+        if risk_percentage <= bound: return level
+    return RISK_LEVELS[-1]
+
+
+def risk_analysis(total_invested, buy_price, risk_percentage):
+    """Amount at risk and the stop-loss price for risking ``risk_percentage``."""
+    return RiskReport(risk_level(risk_percentage), *_risk_amounts(total_invested, buy_price, risk_percentage))
+
+
+def _risk_amounts(total_invested, buy_price, risk_percentage):
+    return total_invested * (risk_percentage / 100), buy_price * (1 - risk_percentage / 100)
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+# The scalar formulas are plain arithmetic, so with NumPy the batch calls
+# simply feed them float64 arrays and every field comes back as an array.
+
+def batch_investable(principals, schedule=DEFAULT_SCHEDULE):
+    """Vectorized ``investable_amount``; each field is an array (or list)."""
+    if np is not None:
+        return investable_amount(_as_array(principals), schedule)
+    return _transpose(Investable, [investable_amount(p, schedule) for p in principals])
+
+
+def batch_required_principal(targets, schedule=DEFAULT_SCHEDULE):
+    if np is not None:
+        return required_principal(_as_array(targets), schedule)
+    return [required_principal(t, schedule) for t in targets]
+
+
+def batch_trade_pnl(sell_prices, sell_quantities, costs, schedule=DEFAULT_SCHEDULE):
+    """Vectorized ``trade_pnl`` over parallel sequences of trades."""
+    if np is not None:
+        return trade_pnl(_as_array(sell_prices), _as_array(sell_quantities), _as_array(costs), schedule)
+    return _transpose(TradePnl, [trade_pnl(p, q, c, schedule) for p, q, c in zip(sell_prices, sell_quantities, costs)])
+
+
+def batch_risk_analysis(total_invested, buy_prices, risk_percentages):
+    if np is not None:
+        pct = _as_array(risk_percentages)
+        levels = np.array(RISK_LEVELS)[np.searchsorted(RISK_THRESHOLDS, pct, side='left')]
+        return RiskReport(levels, *_risk_amounts(_as_array(total_invested), _as_array(buy_prices), pct))
+    return _transpose(RiskReport, [risk_analysis(t, b, p) for t, b, p in zip(total_invested, buy_prices, risk_percentages)])
+
+
+def _transpose(record, rows):
+    if not rows: return record(*([] for _ in record._fields))
+    return record(*(list(column) for column in zip(*rows)))
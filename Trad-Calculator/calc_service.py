@@ -0,0 +1,412 @@
+"""Local calculation service: one shared ticker poller, the calculator over HTTP/JSON.
+
+Run one per host; GUIs started with ``--service`` poll it instead of CoinDCX.
+
+    python -m calc_service --port 8750
+
+Endpoints (JSON, HTTP/1.1 keep-alive):
+    GET  /exchange/ticker              latest ticker rows, with ETag / 304 like CoinDCX
+    GET  /market_data/orderbook?pair=  a pair's depth, fetched at most every few seconds
+    GET  /ticker/<MARKET>              one market's latest row
+    GET  /health                       feed age, request counts and cache hit rate
+    POST /calc/<calculation>           investable, principal, pnl or risk
+
+A calculation body is one record or a list of records, with the fields
+``calc_cli`` reads; a list is computed in one vectorized engine call and
+answered with a list. A ``pnl`` record with a ``market`` and no
+``sell_price`` is priced at that market's live last price.
+
+    curl -d '{"principal": 10000}' localhost:8750/calc/investable
+    curl -d '[{"target": 500}, {"target": 900}]' localhost:8750/calc/principal
+"""
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
+from calc_cli import CALCULATIONS, result_columns
+from calc_engine import FeeSchedule
+from instrumentation import instruments
+from market_client import ORDER_BOOK_URL, TICKER_URL, MarketDataClient
+from market_pipeline import ORDER_BOOK_INTERVAL, POLL_INTERVAL, MarketPipeline
+from ticker_store import TickerStore
+
+DEFAULT_PORT = 8750
+TICKER_PATH = '/exchange/ticker'
+ORDER_BOOK_PATH = '/market_data/orderbook'
+CACHE_SIZE = 65536
+# Largest request body accepted, and records per batch
+MAX_BODY = 8 * 1024 * 1024
+MAX_BATCH = 100_000
+PUMP_INTERVAL = 0.1
+
+
+def dumps(value):
+    if orjson is not None: return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+class ResultCache:
+    """Thread-safe LRU of calculation results keyed by ``(calculation, inputs)``.
+
+    Inputs are the parsed engine arguments, so records that differ only in
+    field order, number formatting or extra fields share an entry.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': self.hits / total if total else 0.0}
+
+
+class Calculator:
+    """The ``calc_cli`` calculations over records, behind a ``ResultCache``.
+
+    ``calculate`` parses every record, answers what it can from the cache
+    and runs the misses through the batch engine in one call. A record that
+    does not parse gets ``{'error': ...}`` in its place.
+    """
+
+    def __init__(self, schedule=None, cache=None, prices=None):
+        self.schedule = schedule or FeeSchedule()
+        self.cache = cache if cache is not None else ResultCache()
+        # market -> live last price, for pnl records without a sell_price
+        self.prices = prices
+
+    def calculate(self, calculation, records):
+        parse, compute = CALCULATIONS[calculation]
+        results = [None] * len(records)
+        missing, inputs = [], []
+        for i, record in enumerate(records):
+            try:
+                if not isinstance(record, dict): raise TypeError("a record must be an object")
+                if calculation == 'pnl': record = self._priced(record)
+                key = (calculation, parse(record))
+            except (ValueError, TypeError, LookupError) as e:
+                results[i] = {'error': str(e)}
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.append((i, key))
+                inputs.append(key[1])
+        if inputs:
+            with instruments.span('service.compute'):
+                columns = result_columns(compute(list(zip(*inputs)), self.schedule))
+            for (i, key), values in zip(missing, zip(*columns.values())):
+                results[i] = dict(zip(columns, values))
+                self.cache.put(key, results[i])
+        return results
+
+    def _priced(self, record):
+        if record.get('sell_price') not in (None, '') or 'market' not in record or self.prices is None:
+            return record
+        price = self.prices(record['market'])
+        if price is None: raise LookupError(f"no live price for {record['market']}")
+        return dict(record, sell_price=price)
+
+
+class TickerFeed:
+    """The host's single ticker poller, shared by every client of the service.
+
+    A ``MarketPipeline`` polls upstream with its usual backoff and 304
+    handling; a consumer thread pumps its changesets and swaps in a new
+    ``(rows, by_market, body, etag)`` snapshot, so request threads read the
+    current one without a lock. ``body`` is encoded once per change.
+    """
+
+    def __init__(self, client, quote='INR', poll_interval=POLL_INTERVAL):
+        self.pipeline = MarketPipeline(client, TickerStore(), quote=quote, poll_interval=poll_interval)
+        self.snapshot = None
+        self.updated = None
+        self.version = 0
+        # In every ETag, so a restarted service never matches a client's old one
+        self.epoch = '%x' % int(time.time() * 1000)
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.pipeline.start()
+        self.thread = threading.Thread(target=self._pump, name='ticker-feed', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None: self.thread.join(timeout=2)
+        self.pipeline.stop()
+
+    def _pump(self):
+        while not self.stopping.wait(PUMP_INTERVAL):
+            self.pipeline.pump(self.apply, lambda market, book: None)
+
+    def apply(self, changeset):
+        rows = changeset.rows
+        with instruments.span('service.encode_ticker'):
+            body = dumps(rows)
+        self.version += 1
+        self.snapshot = (rows, {row['market']: row for row in rows}, body, f'"{self.epoch}-{self.version}"')
+        self.updated = time.time()
+
+    def last_price(self, market):
+        snapshot = self.snapshot
+        row = snapshot[1].get(market) if snapshot is not None else None
+        return row['last_price'] if row is not None else None
+
+
+class OrderBookFeed:
+    """Order book depth shared between clients: one upstream fetch per pair per ``max_age``.
+
+    Concurrent requests for a stale pair wait on that pair's lock, so only
+    the first of them goes upstream.
+    """
+
+    def __init__(self, order_book_url=ORDER_BOOK_URL, max_age=ORDER_BOOK_INTERVAL, clock=time.monotonic):
+        self.order_book_url = order_book_url
+        self.max_age = max_age
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.pairs = {}
+
+    def get(self, pair):
+        """``(body, fetched_at)`` for ``pair``; raises ``OSError`` if upstream fails."""
+        with self.lock:
+            entry = self.pairs.get(pair)
+            if entry is None:
+                # [lock, client, body, fetched_at]; MarketDataClient is one per thread of use
+                entry = self.pairs[pair] = [threading.Lock(), None, None, None]
+        with entry[0]:
+            if entry[2] is None or self.clock() - entry[3] > self.max_age:
+                if entry[1] is None:
+                    entry[1] = MarketDataClient(order_book_url=self.order_book_url)
+                entry[2] = dumps(entry[1].fetch_order_book(pair))
+                entry[3] = self.clock()
+            return entry[2]
+
+    def close(self):
+        with self.lock:
+            for entry in self.pairs.values():
+                if entry[1] is not None: entry[1].close()
+            self.pairs.clear()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; see benchmarks/standin_server.py
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        server.count('GET')
+        url = urlsplit(self.path)
+        path = url.path
+        if path == TICKER_PATH:
+            snapshot = server.ticker.snapshot
+            if snapshot is None:
+                self._error(503, "no ticker yet")
+            elif self.headers.get('If-None-Match') == snapshot[3]:
+                self._send(304, b'', {'ETag': snapshot[3]})
+            else:
+                self._send(200, snapshot[2], {'ETag': snapshot[3]})
+        elif path.startswith('/ticker/'):
+            snapshot = server.ticker.snapshot
+            row = snapshot[1].get(path[len('/ticker/'):]) if snapshot is not None else None
+            if row is None: self._error(404, "unknown market")
+            else: self._send(200, dumps(row))
+        elif path == ORDER_BOOK_PATH:
+            pair = parse_qs(url.query).get('pair', [''])[0]
+            if not pair:
+                self._error(400, "missing pair")
+                return
+            try:
+                self._send(200, server.order_books.get(pair))
+            except OSError as e:  # RequestException is an OSError
+                self._error(502, f"order book unavailable: {e}")
+        elif path == '/health':
+            self._send(200, dumps(server.health()))
+        else:
+            self._error(404, "not found")
+
+    def do_POST(self):
+        server = self.server
+        server.count('POST')
+        path = urlsplit(self.path).path
+        calculation = path[len('/calc/'):] if path.startswith('/calc/') else None
+        if calculation not in CALCULATIONS:
+            self._error(404, f"unknown calculation; one of {', '.join(CALCULATIONS)}")
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if not 0 < length <= MAX_BODY:
+            self._error(400 if length <= 0 else 413, "a JSON body is required" if length <= 0 else "body too large")
+            return
+        try:
+            payload = loads(self.rfile.read(length))
+        except ValueError as e:
+            self._error(400, f"invalid JSON: {e}")
+            return
+
+        batch = isinstance(payload, list)
+        records = payload if batch else [payload]
+        if len(records) > MAX_BATCH:
+            self._error(413, f"at most {MAX_BATCH:,} records per request")
+            return
+        results = server.calculator.calculate(calculation, records)
+        if not batch and 'error' in results[0]:
+            self._send(400, dumps(results[0]))
+        else:
+            self._send(200, dumps(results if batch else results[0]))
+
+    def _error(self, status, message):
+        self._send(status, dumps({'error': message}))
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        if body: self.send_header('Content-Type', 'application/json')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CalcService(ThreadingHTTPServer):
+    """The HTTP server, a thread per connection, over the shared feeds and calculator.
+
+    ``client`` is the upstream ``MarketDataClient`` the ticker poller uses.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, client=None, quote='INR', schedule=None,
+                 cache_size=CACHE_SIZE, poll_interval=POLL_INTERVAL, order_book_url=None):
+        super().__init__((host, port), ServiceHandler)
+        client = client or MarketDataClient()
+        self.ticker = TickerFeed(client, quote, poll_interval)
+        self.order_books = OrderBookFeed(order_book_url or client.order_book_url)
+        self.calculator = Calculator(schedule, ResultCache(cache_size), self.ticker.last_price)
+        self.started = time.time()
+        self.requests = {'GET': 0, 'POST': 0}
+        self.requests_lock = threading.Lock()
+        self.thread = None
+
+    def count(self, method):
+        with self.requests_lock:
+            self.requests[method] += 1
+
+    def health(self):
+        snapshot = self.ticker.snapshot
+        updated = self.ticker.updated
+        with self.requests_lock:
+            requests = dict(self.requests)
+        return {
+            'uptime': time.time() - self.started,
+            'markets': len(snapshot[0]) if snapshot is not None else 0,
+            'ticker_age': time.time() - updated if updated is not None else None,
+            'requests': requests,
+            'cache': self.calculator.cache.stats(),
+            'upstream': self.ticker.pipeline.client.metrics.snapshot(),
+        }
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start the poller and serve on a background thread."""
+        self.ticker.start()
+        self.thread = threading.Thread(target=self.serve_forever, name='calc-service', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.ticker.stop()
+        self.order_books.close()
+
+
+def service_urls(base):
+    """``(ticker_url, order_book_url)`` of a service at ``base``, for ``MarketDataClient``."""
+    base = base.rstrip('/')
+    return base + TICKER_PATH, base + ORDER_BOOK_PATH
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='calc_service', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port (default {DEFAULT_PORT})")
+    parser.add_argument('--quote', default='INR', help="markets served: those quoted in this currency (default INR)")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help=f"seconds between upstream ticker polls (default {POLL_INTERVAL})")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help=f"calculation results kept (default {CACHE_SIZE:,})")
+    parser.add_argument('--platform-fee', type=float, default=0.005, help="platform fee rate (default 0.005)")
+    parser.add_argument('--gst', type=float, default=0.18, help="GST rate on the platform fee (default 0.18)")
+    parser.add_argument('--tds', type=float, default=0.01, help="TDS rate on sells (default 0.01)")
+    parser.add_argument('--upstream-url', default=TICKER_URL, help=argparse.SUPPRESS)
+    parser.add_argument('--order-book-url', default=ORDER_BOOK_URL, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    client = MarketDataClient(args.upstream_url, order_book_url=args.order_book_url)
+    service = CalcService(args.host, args.port, client, args.quote, FeeSchedule(args.platform_fee, args.gst, args.tds),
+                          args.cache_size, args.poll_interval)
+    service.start()
+    print(f"calc_service: serving on {service.url} (Ctrl+C to stop)", flush=True)
+    try:
+        # A timed join so Ctrl+C is delivered promptly
+        while service.thread.is_alive():
+            service.thread.join(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
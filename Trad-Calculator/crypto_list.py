@@ -0,0 +1,227 @@
+import tkinter as tk
+from tkinter import ttk
+
+from instrumentation import instruments
+
+# Extra rows kept alive above and below the viewport so fast scrolling
+# does not show blank gaps before the next layout pass.
+OVERSCAN = 3
+ROW_PADDING = 3
+
+UP_COLOR = '#2ecc71'
+DOWN_COLOR = '#e74c3c'
+FLAT_COLOR = '#bdc3c7'
+
+
+def change_color(change_24h):
+    if change_24h > 0: return UP_COLOR
+    elif change_24h < 0: return DOWN_COLOR
+    else: return FLAT_COLOR
+
+
+def format_row(item_data):
+    """Return the label texts and change color shown for one parsed ticker."""
+    change_24h = item_data['change_24_hour']
+    return (
+        item_data['market'].replace('INR', ''),
+        f"{change_24h:+.2f}%",
+        change_color(change_24h),
+        f"₹{item_data['last_price']:,.4f}",
+        f"H: {item_data['high']:,.4f}",
+        f"L: {item_data['low']:,.4f}",
+        f"Vol: {item_data['volume']:,.2f}",
+    )
+
+
+class CryptoRow:
+    """A recycled ticker row; only label text and colors change between uses."""
+
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent, style='Crypto.TFrame', padding=10)
+        self.frame.columnconfigure(1, weight=1)
+        self.market_label = ttk.Label(self.frame, style='Market.TLabel')
+        self.market_label.grid(row=0, column=0, sticky='w')
+        self.change_label = ttk.Label(self.frame, style='Change.TLabel')
+        self.change_label.grid(row=0, column=1, sticky='e')
+        self.price_label = ttk.Label(self.frame, style='Price.TLabel')
+        self.price_label.grid(row=1, column=0, columnspan=2, sticky='w', pady=(5, 0))
+
+        detail_frame = ttk.Frame(self.frame, style='Crypto.TFrame')
+        detail_frame.grid(row=2, column=0, columnspan=2, sticky='ew', pady=(5, 0))
+        self.high_label = ttk.Label(detail_frame, style='Detail.TLabel')
+        self.high_label.pack(side='left', expand=True, fill='x')
+        self.low_label = ttk.Label(detail_frame, style='Detail.TLabel')
+        self.low_label.pack(side='left', expand=True, fill='x')
+        self.volume_label = ttk.Label(detail_frame, style='Detail.TLabel')
+        self.volume_label.pack(side='right', expand=True, fill='x')
+
+        self.widgets = (self.frame, detail_frame, self.market_label, self.change_label,
+                        self.price_label, self.high_label, self.low_label, self.volume_label)
+        self.window_id = None
+        self.index = None
+        self.values = None
+
+    def show(self, values):
+        """Update the labels in place, skipping Tk calls when nothing changed."""
+        if values == self.values: return
+        market, change, color, price, high, low, volume = values
+        old = self.values or (None,) * 7
+        if market != old[0]: self.market_label.configure(text=market)
+        if change != old[1] or color != old[2]: self.change_label.configure(text=change, foreground=color)
+        if price != old[3]: self.price_label.configure(text=price)
+        if high != old[4]: self.high_label.configure(text=high)
+        if low != old[5]: self.low_label.configure(text=low)
+        if volume != old[6]: self.volume_label.configure(text=volume)
+        self.values = values
+
+
+class VirtualCryptoList:
+    """Scrollable ticker list that only materializes rows in the viewport.
+
+    The canvas scroll region is sized for every item, but widgets exist only
+    for the visible rows plus ``overscan`` on each side. Scrolling and data
+    refreshes move pooled rows to their new slot and rewrite their labels.
+    Clicking a row calls ``on_select`` with the ticker it shows.
+    """
+
+    def __init__(self, parent, overscan=OVERSCAN, on_select=None):
+        self.overscan = overscan
+        self.on_select = on_select
+        self.items = []
+        self.rows = []
+        self.row_height = None
+        self._layout_pending = False
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient='vertical', command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
+        self.canvas.bind('<Configure>', self._on_resize)
+        self._bind_mousewheel(self.canvas)
+
+    def grid(self, **kwargs):
+        self.canvas.grid(row=0, column=0, sticky='nsew', **kwargs)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+
+    def set_items(self, items):
+        """Replace the displayed tickers and refresh only the visible rows."""
+        self.items = items
+        self._ensure_row_height()
+        self._update_scrollregion()
+        self.layout()
+
+    def patch_items(self, items, markets):
+        """Swap in re-priced tickers without moving rows.
+
+        ``items`` must hold the same markets in the same order as the current
+        list; only on-screen rows showing one of ``markets`` are re-rendered.
+        """
+        self.items = items
+        for row in self.rows:
+            if row.index is not None and items[row.index].get('market') in markets:
+                row.show(format_row(items[row.index]))
+
+    def visible_range(self):
+        """Return the ``(first, last)`` item slice backed by pooled rows."""
+        if not self.items or not self.row_height: return 0, 0
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first = max(int(top // self.row_height) - self.overscan, 0)
+        last = min(int((top + height) // self.row_height) + 1 + self.overscan, len(self.items))
+        return first, last
+
+    def layout(self):
+        with instruments.span('ui.layout'):
+            self._layout()
+
+    def _layout(self):
+        self._layout_pending = False
+        first, last = self.visible_range()
+        self._ensure_pool(last - first)
+
+        # Rows that still map to a visible index keep their slot; the rest
+        # are handed the indexes that scrolled into view.
+        free = []
+        taken = set()
+        for row in self.rows:
+            if row.index is not None and first <= row.index < last:
+                taken.add(row.index)
+            else:
+                free.append(row)
+
+        for index in range(first, last):
+            if index in taken: continue
+            row = free.pop()
+            row.index = index
+            self.canvas.coords(row.window_id, ROW_PADDING, index * self.row_height + ROW_PADDING)
+            self.canvas.itemconfigure(row.window_id, state='normal')
+
+        for row in free:
+            if row.index is not None:
+                row.index = None
+                self.canvas.itemconfigure(row.window_id, state='hidden')
+
+        for row in self.rows:
+            if row.index is not None:
+                row.show(format_row(self.items[row.index]))
+
+    def _schedule_layout(self):
+        if not self._layout_pending:
+            self._layout_pending = True
+            self.canvas.after_idle(self.layout)
+
+    def _on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_layout()
+
+    def _on_resize(self, event):
+        for row in self.rows:
+            self.canvas.itemconfigure(row.window_id, width=event.width - 2 * ROW_PADDING)
+        self._update_scrollregion()
+        self._schedule_layout()
+
+    def _update_scrollregion(self):
+        height = len(self.items) * (self.row_height or 0)
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), height))
+
+    def _ensure_row_height(self):
+        if self.row_height or not self.items: return
+        row = self._new_row()
+        row.show(format_row(self.items[0]))
+        row.frame.update_idletasks()
+        self.row_height = row.frame.winfo_reqheight() + 2 * ROW_PADDING
+        for row in self.rows:
+            self.canvas.itemconfigure(row.window_id, height=self.row_height - 2 * ROW_PADDING)
+
+    def _ensure_pool(self, count):
+        while len(self.rows) < count:
+            self._new_row()
+
+    def _new_row(self):
+        row = CryptoRow(self.canvas)
+        row.window_id = self.canvas.create_window(
+            ROW_PADDING, 0, window=row.frame, anchor='nw', state='hidden',
+            width=max(self.canvas.winfo_width() - 2 * ROW_PADDING, 1))
+        if self.row_height:
+            self.canvas.itemconfigure(row.window_id, height=self.row_height - 2 * ROW_PADDING)
+        for widget in row.widgets:
+            self._bind_mousewheel(widget)
+            widget.bind("<Button-1>", lambda event, row=row: self._on_click(row))
+        self.rows.append(row)
+        return row
+
+    def _on_click(self, row):
+        if self.on_select is not None and row.index is not None:
+            self.on_select(self.items[row.index])
+
+    def _bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel) # Windows, MacOS
+        widget.bind("<Button-4>", self._on_mousewheel) # Linux
+        widget.bind("<Button-5>", self._on_mousewheel) # Linux
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            self.canvas.yview_scroll(-1, "units")
+        elif event.num == 5:
+            self.canvas.yview_scroll(1, "units")
+        else:
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import deque
+
+# Setting TRAD_CALC_DIAGNOSTICS=1 turns instrumentation on at import
+ENV_FLAG = 'TRAD_CALC_DIAGNOSTICS'
+# Recent samples kept per histogram for percentiles
+WINDOW = 1024
+
+
+class Histogram:
+    """Count, total and max of every sample plus a window of recent ones."""
+
+    __slots__ = ('count', 'total', 'max', 'recent')
+
+    def __init__(self, window=WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max: self.max = value
+        self.recent.append(value)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        def pick(q): return recent[min(int(len(recent) * q), len(recent) - 1)] if recent else 0.0
+        return {'count': self.count, 'total': self.total, 'max': self.max, 'p50': pick(0.5), 'p99': pick(0.99)}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Times a ``with`` block into a histogram and the folded-stack totals."""
+
+    __slots__ = ('instruments', 'name', 'start', 'stack')
+
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+
+    def __enter__(self):
+        self.stack = self.instruments._stack()
+        self.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.instruments._close_span(self.stack, elapsed)
+        return False
+
+
+class Instruments:
+    """Counters, latency histograms and timed spans for the app's hot paths.
+
+    Disabled, ``span`` returns a shared no-op context manager and ``count``
+    / ``observe`` return after one attribute check, so instrumented code
+    costs well under a microsecond per call. Enabled, spans nest per thread
+    and their self time is also kept per call stack, which ``dump_folded``
+    writes in the collapsed format flame graph tools read. ``start_profile``
+    runs ``cProfile`` on the calling thread (the Tk thread) for a
+    function-level view. Safe to use from any thread.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.counters = {}
+        self.histograms = {}
+        self.folded = {}
+        self.profiler = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        if not self.enabled: return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def span(self, name):
+        """``with instruments.span('ticker.sort'):`` times the block."""
+        if not self.enabled: return NULL_SPAN
+        return Span(self, name)
+
+    def _stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = [threading.current_thread().name]
+            self.local.child_time = [0.0]
+        else:
+            self.local.child_time.append(0.0)
+        return stack
+
+    def _close_span(self, stack, elapsed):
+        child_time = self.local.child_time
+        self_time = elapsed - child_time.pop()
+        if child_time: child_time[-1] += elapsed
+        key = ';'.join(stack)
+        name = stack.pop()
+        with self.lock:
+            self.folded[key] = self.folded.get(key, 0.0) + self_time
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(elapsed)
+
+    def snapshot(self):
+        """``(counters, {name: summary})`` copies, safe to read on any thread."""
+        with self.lock:
+            return dict(self.counters), {name: h.summary() for name, h in self.histograms.items()}
+
+    def report(self):
+        """Plain-text table of counters and p50/p99/max timings in ms."""
+        counters, histograms = self.snapshot()
+        lines = [f"{'span':<24}{'count':>9}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name in sorted(histograms):
+            h = histograms[name]
+            lines.append(f"{name:<24}{h['count']:>9,}{h['p50'] * 1000:>10.2f}{h['p99'] * 1000:>10.2f}"
+                         f"{h['max'] * 1000:>10.2f}")
+        if counters:
+            lines.append("")
+            lines.extend(f"{name:<24}{value:>9,}" for name, value in sorted(counters.items()))
+        return "\n".join(lines)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.folded.clear()
+
+    def start_profile(self):
+        import cProfile
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def dump_profile(self, path):
+        """Write ``cProfile`` stats (for ``pstats`` / snakeviz) to ``path``."""
+        if self.profiler is None: return False
+        self.profiler.disable()
+        self.profiler.dump_stats(path)
+        self.profiler.enable()
+        return True
+
+    def dump_folded(self, path):
+        """Write span self times as ``thread;span;child <microseconds>`` lines
+        (Brendan Gregg's collapsed stack format; flamegraph.pl, speedscope)."""
+        with self.lock:
+            folded = sorted(self.folded.items())
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, seconds in folded:
+                f.write(f"{stack.replace(' ', '_')} {max(round(seconds * 1e6), 0)}\n")
+        return len(folded)
+
+
+instruments = Instruments(enabled=os.environ.get(ENV_FLAG, '') not in ('', '0'))
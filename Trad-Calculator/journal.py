@@ -0,0 +1,211 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+DATA_DIR = os.path.join(os.path.expanduser('~'), '.trad_calculator')
+# Fiscal years are Indian whatever the machine's local zone is
+IST = timezone(timedelta(hours=5, minutes=30))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    market TEXT NOT NULL,
+    side TEXT NOT NULL CHECK (side IN ('buy', 'sell')),
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trades_market_timestamp ON trades (market, timestamp);
+-- Replays read in trade-time order; the rowid tail orders ties by id
+CREATE INDEX IF NOT EXISTS trades_timestamp ON trades (timestamp);
+
+CREATE TABLE IF NOT EXISTS fee_breakdowns (
+    trade_id INTEGER PRIMARY KEY REFERENCES trades (id),
+    gross REAL NOT NULL,
+    platform_fee REAL NOT NULL,
+    gst REAL NOT NULL,
+    tds REAL NOT NULL,
+    withdrawal REAL NOT NULL,
+    cost REAL NOT NULL,
+    pnl REAL NOT NULL
+);
+
+-- Clustered on (market, timestamp) so a market's history is one range scan
+CREATE TABLE IF NOT EXISTS ticker_snapshots (
+    market TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    last_price REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    volume REAL NOT NULL,
+    change_24_hour REAL NOT NULL,
+    PRIMARY KEY (market, timestamp)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    market TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    side TEXT NOT NULL CHECK (side IN ('above', 'below')),
+    threshold REAL NOT NULL,
+    label TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+# Statement text is constant so sqlite3's statement cache keeps them prepared
+INSERT_TRADE = "INSERT INTO trades (id, market, side, quantity, price, timestamp) VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_FEES = ("INSERT INTO fee_breakdowns (trade_id, gross, platform_fee, gst, tds, withdrawal, cost, pnl) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_SNAPSHOT = ("INSERT OR REPLACE INTO ticker_snapshots "
+                   "(market, timestamp, last_price, high, low, volume, change_24_hour) VALUES (?, ?, ?, ?, ?, ?, ?)")
+SELECT_TRADES = ("SELECT id, market, side, quantity, price, timestamp FROM trades "
+                 "WHERE market = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp")
+INSERT_ALERT = "INSERT INTO alerts (id, market, kind, side, threshold, label, created) VALUES (?, ?, ?, ?, ?, ?, ?)"
+DELETE_ALERT = "DELETE FROM alerts WHERE id = ?"
+SELECT_SNAPSHOTS = ("SELECT timestamp, last_price, high, low, volume, change_24_hour FROM ticker_snapshots "
+                    "WHERE market = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp")
+
+
+def default_journal_path():
+    return os.path.join(DATA_DIR, 'journal.db')
+
+
+def fiscal_year_bounds(start_year):
+    """Epoch bounds of the Indian fiscal year starting 1 April ``start_year``."""
+    return (datetime(start_year, 4, 1, tzinfo=IST).timestamp(), datetime(start_year + 1, 4, 1, tzinfo=IST).timestamp())
+
+
+def current_fiscal_year(now=None):
+    now = datetime.fromtimestamp(now if now is not None else time.time(), IST)
+    return now.year if now.month >= 4 else now.year - 1
+
+
+def read_export(path, default_market='BTCINR'):
+    """``(market, side, quantity, price, timestamp)`` trades in an Export button file.
+
+    Older exports only carry the single recorded buy, so that is all there
+    is; it is dated by the file's modification time.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    trading = data.get('trading_data', {})
+    quantity = float(trading.get('buy_quantity') or 0)
+    price = float(trading.get('buy_price') or 0)
+    if quantity <= 0 or price <= 0: return []
+    market = (data.get('calculations', {}).get('market_var') or default_market).strip().upper()
+    return [(market, 'buy', quantity, price, os.path.getmtime(path))]
+
+
+class TradeJournal:
+    """Embedded SQLite store for trades, fee breakdowns, ticker snapshots and alerts.
+
+    Runs in WAL mode so the poller can append snapshots while the GUI
+    reads. Writes are batched into one transaction per call and share a
+    single connection guarded by a lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_journal_path()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MiB keeps hot index pages resident
+        self.conn.executescript(SCHEMA)
+
+    def record_trade(self, market, side, quantity, price, timestamp=None, pnl=None):
+        """Insert one trade (with its ``TradePnl`` for sells); returns its id."""
+        return self.record_trades([(market, side, quantity, price, timestamp, pnl)])[0]
+
+    def record_trades(self, trades):
+        """Bulk-insert ``(market, side, quantity, price, timestamp, pnl)`` tuples.
+
+        ``timestamp`` defaults to now and ``pnl`` may be ``None``. Ids are
+        assigned here so fee rows can reference their trade in the same
+        ``executemany`` batch.
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            next_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM trades").fetchone()[0]
+            trade_rows, fee_rows = [], []
+            for offset, (market, side, quantity, price, timestamp, pnl) in enumerate(trades):
+                trade_id = next_id + offset
+                trade_rows.append((trade_id, market, side, quantity, price, now if timestamp is None else timestamp))
+                if pnl is not None:
+                    fee_rows.append((trade_id, pnl.gross, pnl.platform_fee, pnl.gst, pnl.tds,
+                                     pnl.withdrawal, pnl.cost, pnl.pnl))
+            self.conn.executemany(INSERT_TRADE, trade_rows)
+            if fee_rows: self.conn.executemany(INSERT_FEES, fee_rows)
+        return [row[0] for row in trade_rows]
+
+    def record_snapshots(self, rows, timestamp=None):
+        """Append parsed ticker rows; each row's own ``timestamp`` wins."""
+        now = timestamp or time.time()
+        batch = [(row['market'], row.get('timestamp') or now, row['last_price'], row['high'],
+                  row['low'], row['volume'], row['change_24_hour']) for row in rows]
+        with self.lock, self.conn:
+            self.conn.executemany(INSERT_SNAPSHOT, batch)
+
+    def record_alerts(self, alerts):
+        """Store ``(id, market, kind, side, threshold, label, created)`` rows."""
+        with self.lock, self.conn:
+            self.conn.executemany(INSERT_ALERT, alerts)
+
+    def delete_alerts(self, alert_ids):
+        with self.lock, self.conn:
+            self.conn.executemany(DELETE_ALERT, ((alert_id,) for alert_id in alert_ids))
+
+    def alerts(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT id, market, kind, side, threshold, label, created FROM alerts ORDER BY id").fetchall()
+
+    def trades(self, market, start=0.0, end=float('inf')):
+        with self.lock:
+            return self.conn.execute(SELECT_TRADES, (market, start, end)).fetchall()
+
+    def fiscal_year_trades(self, market, start_year=None):
+        """All trades in ``market`` for a fiscal year (default: the current one)."""
+        return self.trades(market, *fiscal_year_bounds(start_year or current_fiscal_year()))
+
+    def snapshots(self, market, start=0.0, end=float('inf')):
+        with self.lock:
+            return self.conn.execute(SELECT_SNAPSHOTS, (market, start, end)).fetchall()
+
+    def iter_all_trades(self, batch_size=10_000):
+        """Yield every trade in time order (ties by id) without loading them all.
+
+        Imported trades keep their original timestamps but get the next ids,
+        so id order is not time order; the ledger and tax report need the latter.
+        """
+        last = (float('-inf'), 0)
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT id, market, side, quantity, price, timestamp FROM trades "
+                    "WHERE (timestamp, id) > (?, ?) ORDER BY timestamp, id LIMIT ?",
+                    (*last, batch_size)).fetchall()
+            if not rows: return
+            yield from rows
+            last = (rows[-1][5], rows[-1][0])
+
+    def import_export(self, path, default_market='BTCINR'):
+        """Load a JSON file written by the Export button as a buy trade.
+
+        Returns the imported ``(id, market, side, quantity, price,
+        timestamp)`` rows (see ``read_export``).
+        """
+        trades = read_export(path, default_market)
+        ids = self.record_trades((*trade, None) for trade in trades)
+        return [(trade_id, *trade) for trade_id, trade in zip(ids, trades)]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,129 @@
+from collections import deque, namedtuple
+
+from calc_engine import DEFAULT_SCHEDULE, trade_pnl
+
+FIFO, LIFO, AVERAGE = 'fifo', 'lifo', 'average'
+COST_BASIS_METHODS = (FIFO, LIFO, AVERAGE)
+
+# Quantities below this are float dust left over from partial fills
+QTY_EPSILON = 1e-12
+
+Position = namedtuple('Position', 'market quantity cost average_price')
+
+
+class MarketBook:
+    """Open lots and running totals for one market."""
+
+    __slots__ = ('lots', 'quantity', 'cost', 'realized', 'realized_cost')
+
+    def __init__(self):
+        # Each lot is a mutable [quantity, price] pair so partial fills can
+        # shrink the head (FIFO) or tail (LIFO) lot in place
+        self.lots = deque()
+        self.quantity = 0.0
+        self.cost = 0.0
+        self.realized = 0.0
+        # Cost basis of everything sold so far, the denominator of realized ROI
+        self.realized_cost = 0.0
+
+
+class TradeLedger:
+    """Per-market lot queues with FIFO, LIFO or weighted-average cost basis.
+
+    Every lot is appended once and removed at most once, so matching a sell
+    is amortized O(1) per fill regardless of history length. Sells are
+    priced with the fee schedule (platform fee, GST, TDS); buy cost is
+    quantity * price, as in the Trading tab.
+    """
+
+    def __init__(self, method=FIFO, schedule=DEFAULT_SCHEDULE):
+        if method not in COST_BASIS_METHODS:
+            raise ValueError(f"Unknown cost basis method: {method}")
+        self.method = method
+        self.schedule = schedule
+        self.books = {}
+
+    def buy(self, market, quantity, price):
+        book = self.books.get(market)
+        if book is None:
+            book = self.books[market] = MarketBook()
+        if self.method != AVERAGE:
+            book.lots.append([quantity, price])
+        book.quantity += quantity
+        book.cost += quantity * price
+
+    def sell(self, market, quantity, price):
+        """Match a sell against open lots and return its ``TradePnl``."""
+        cost = self.match(market, quantity)
+        book = self.books[market]
+        pnl = trade_pnl(price, quantity, cost, self.schedule)
+        book.realized += pnl.pnl
+        book.realized_cost += cost
+        return pnl
+
+    def match(self, market, quantity):
+        """Take ``quantity`` out of the open lots and return its cost basis.
+
+        The lot bookkeeping of ``sell`` without pricing the sale, for callers
+        that price many sells themselves.
+        """
+        book = self.books.get(market)
+        if book is None or quantity > book.quantity + QTY_EPSILON:
+            raise ValueError("Cannot sell more than you own!")
+
+        if self.method == AVERAGE:
+            cost = book.cost * (quantity / book.quantity)
+        else:
+            cost = self._match_lots(book.lots, quantity, pop_left=self.method == FIFO)
+
+        book.quantity -= quantity
+        book.cost -= cost
+        if book.quantity <= QTY_EPSILON:
+            book.quantity = book.cost = 0.0
+            book.lots.clear()
+        return cost
+
+    @staticmethod
+    def _match_lots(lots, quantity, pop_left):
+        cost = 0.0
+        remaining = quantity
+        while remaining > QTY_EPSILON and lots:
+            lot = lots[0] if pop_left else lots[-1]
+            take = lot[0] if lot[0] <= remaining else remaining
+            cost += take * lot[1]
+            remaining -= take
+            lot[0] -= take
+            if lot[0] <= QTY_EPSILON:
+                if pop_left: lots.popleft()
+                else: lots.pop()
+        return cost
+
+    def position(self, market):
+        book = self.books.get(market)
+        if book is None or book.quantity <= 0:
+            return Position(market, 0.0, 0.0, 0.0)
+        return Position(market, book.quantity, book.cost, book.cost / book.quantity)
+
+    def positions(self):
+        return [self.position(market) for market, book in self.books.items() if book.quantity > 0]
+
+    def realized_pnl(self, market=None):
+        if market is not None:
+            book = self.books.get(market)
+            return book.realized if book else 0.0
+        return sum(book.realized for book in self.books.values())
+
+    def realized_cost(self):
+        return sum(book.realized_cost for book in self.books.values())
+
+    def unrealized_pnl(self, marks):
+        """Net P&L of selling every open position at ``marks[market]``.
+
+        Markets without a mark are skipped.
+        """
+        total = 0.0
+        for market, book in self.books.items():
+            price = marks.get(market)
+            if price is None or book.quantity <= 0: continue
+            total += trade_pnl(price, book.quantity, book.cost, self.schedule).pnl
+        return total
@@ -0,0 +1,235 @@
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+from instrumentation import instruments
+from ticker_parse import CHUNK_SIZE, iter_tickers
+
+TICKER_URL = "https://api.coindcx.com/exchange/ticker"
+ORDER_BOOK_URL = "https://public.coindcx.com/market_data/orderbook"
+
+
+def order_book_pair(market, quote='INR'):
+    """Order book pair for a ticker market, e.g. ``'BTCINR'`` -> ``'I-BTC_INR'``."""
+    return f"I-{market[:-len(quote)]}_{quote}"
+
+
+def order_book_levels(data):
+    """The ``bids`` and ``asks`` of an order book body, as sent: ``{price: quantity}`` strings.
+
+    Parsing is left to ``order_book.OrderBook``, which only parses the
+    levels that changed since the previous poll.
+    """
+    bids, asks = data.get('bids') or {}, data.get('asks') or {}
+    if not isinstance(bids, dict) or not isinstance(asks, dict):
+        raise ValueError("order book sides must be objects")
+    return {'bids': bids, 'asks': asks}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of hitting the network while the breaker is open."""
+
+
+class Backoff:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**n))."""
+
+    def __init__(self, base=1.0, cap=60.0, rng=None):
+        self.base = base
+        self.cap = cap
+        self.attempts = 0
+        self.rng = rng or random.Random()
+
+    def next_delay(self):
+        delay = self.rng.uniform(0, min(self.cap, self.base * 2 ** self.attempts))
+        self.attempts += 1
+        return delay
+
+    def reset(self):
+        self.attempts = 0
+
+
+class CircuitBreaker:
+    """Stops calling a failing endpoint for ``reset_timeout`` seconds.
+
+    After ``failure_threshold`` consecutive failures the breaker opens; once
+    the timeout passes a single trial request is let through (half-open) and
+    its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None: return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout: return self.HALF_OPEN
+        return self.OPEN
+
+    def remaining(self):
+        """Seconds until the breaker lets a trial request through."""
+        if self.opened_at is None: return 0.0
+        return max(self.reset_timeout - (self.clock() - self.opened_at), 0.0)
+
+    def allow(self):
+        return self.state != self.OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = self.clock()
+
+
+class ClientMetrics:
+    """Request counters plus a window of recent latencies."""
+
+    def __init__(self, window=256):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, latency, status=None, nbytes=0):
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.bytes_received += nbytes
+            if status == 304: self.not_modified += 1
+            elif status is None or status >= 400: self.errors += 1
+
+    @property
+    def hit_rate(self):
+        """Share of requests answered with 304 Not Modified."""
+        return self.not_modified / self.requests if self.requests else 0.0
+
+    def snapshot(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            requests_made = self.requests
+            stats = {
+                'requests': requests_made,
+                'not_modified': self.not_modified,
+                'errors': self.errors,
+                'bytes_received': self.bytes_received,
+            }
+        stats['hit_rate'] = stats['not_modified'] / requests_made if requests_made else 0.0
+        stats['latency_p50'] = latencies[len(latencies) // 2] if latencies else 0.0
+        stats['latency_p99'] = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] if latencies else 0.0
+        return stats
+
+
+class MarketDataClient:
+    """Keep-alive client for the CoinDCX ticker with conditional GETs.
+
+    ``fetch_ticker`` stream-parses the body into a list of rows (optionally
+    only markets quoted in ``quote``), or returns ``None`` when the server
+    answered 304 and the previous snapshot is still current.
+    ``fetch_order_book`` returns one pair's depth (see ``order_book_levels``).
+    Failures raise a ``requests.RequestException``; callers sleep
+    ``retry_delay()`` before the next attempt instead of a fixed interval.
+
+    A client is not meant to be shared between threads; use one per
+    concurrently polled endpoint.
+    """
+
+    def __init__(self, url=TICKER_URL, timeout=10, session=None,
+                 backoff=None, breaker=None, metrics=None, order_book_url=ORDER_BOOK_URL):
+        self.url = url
+        self.order_book_url = order_book_url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'})
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or ClientMetrics()
+        self.etag = None
+        self.last_modified = None
+
+    def fetch_ticker(self, quote=None):
+        self._check_breaker()
+
+        headers = {}
+        if self.etag: headers['If-None-Match'] = self.etag
+        if self.last_modified: headers['If-Modified-Since'] = self.last_modified
+
+        start = time.perf_counter()
+        try:
+            with instruments.span('ticker.request'):
+                response = self.session.get(self.url, headers=headers, timeout=self.timeout, stream=True)
+            with response:
+                if response.status_code == 304:
+                    self._record_success(start, response)
+                    instruments.count('ticker.not_modified')
+                    return None
+                response.raise_for_status()
+                # The body is parsed as it streams in, so this includes its download
+                with instruments.span('ticker.decode'):
+                    payload = list(iter_tickers(response.iter_content(CHUNK_SIZE), quote))
+        except (requests.RequestException, ValueError) as e:
+            raise self._record_failure(start, e, "invalid ticker payload")
+
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        self._record_success(start, response)
+        return payload
+
+    def fetch_order_book(self, pair):
+        self._check_breaker()
+        start = time.perf_counter()
+        try:
+            with self.session.get(self.order_book_url, params={'pair': pair}, timeout=self.timeout) as response:
+                response.raise_for_status()
+                with instruments.span('order_book.decode'):
+                    book = order_book_levels(response.json())
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            raise self._record_failure(start, e, "invalid order book payload")
+        self._record_success(start, response)
+        return book
+
+    def retry_delay(self):
+        """Seconds to wait after a failed fetch."""
+        return max(self.backoff.next_delay(), self.breaker.remaining())
+
+    def close(self):
+        self.session.close()
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"circuit open for {self.breaker.remaining():.0f}s")
+
+    def _record_failure(self, start, error, message):
+        """Record a failed request; returns the ``RequestException`` for the caller to raise."""
+        self.metrics.record(time.perf_counter() - start)
+        instruments.count('http.errors')
+        self.breaker.record_failure()
+        if isinstance(error, requests.RequestException): return error
+        failure = requests.RequestException(f"{message}: {error}")
+        failure.__cause__ = error
+        return failure
+
+    def _record_success(self, start, response):
+        self.metrics.record(time.perf_counter() - start, response.status_code, self._wire_bytes(response))
+        self.breaker.record_success()
+        self.backoff.reset()
+
+    @staticmethod
+    def _wire_bytes(response):
+        # urllib3 counts the (possibly gzip-compressed) bytes read off the socket
+        try:
+            return response.raw.tell()
+        except (AttributeError, OSError):
+            return int(response.headers.get('Content-Length', 0))
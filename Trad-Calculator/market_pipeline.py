@@ -0,0 +1,257 @@
+import asyncio
+import threading
+from collections import OrderedDict
+
+from instrumentation import instruments
+from market_client import MarketDataClient, order_book_pair
+from ticker_store import merge_changesets
+
+POLL_INTERVAL = 60
+ORDER_BOOK_INTERVAL = 5
+
+# Queue keys: TICKER, or (ORDER_BOOK, market)
+TICKER, ORDER_BOOK = 'ticker', 'order_book'
+
+
+class SnapshotQueue:
+    """Bounded thread-safe hand-off that keeps only the latest update per key.
+
+    Publishing a key that is still waiting replaces it (or folds it in with
+    ``merge``) instead of queueing a second entry, so a slow consumer gets
+    one update per key however many polls it missed. When ``maxsize`` keys
+    are waiting, the oldest replaceable entry is dropped to make room;
+    entries published with ``merge`` are never dropped.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.coalesced = 0
+        self.dropped = 0
+
+    def publish(self, key, value, merge=None):
+        with self.lock:
+            waiting = self.pending.get(key)
+            if waiting is not None:
+                self.pending[key] = (merge(waiting[0], value) if merge else value, merge)
+                self.coalesced += 1
+                return
+            if len(self.pending) >= self.maxsize:
+                victim = next((k for k, (_, m) in self.pending.items() if m is None), None)
+                if victim is None and merge is None:
+                    self.dropped += 1
+                    return
+                if victim is not None:
+                    del self.pending[victim]
+                    self.dropped += 1
+            self.pending[key] = (value, merge)
+
+    def drain(self):
+        """Take every waiting ``(key, value)``, oldest first."""
+        with self.lock:
+            items = [(key, value) for key, (value, _) in self.pending.items()]
+            self.pending.clear()
+        return items
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pending)
+
+
+class MarketPipeline:
+    """Polls market data on an asyncio loop running in a background thread.
+
+    The ticker is polled every ``poll_interval`` seconds and the order book
+    of each watched market every ``book_interval``; every endpoint has its
+    own task and client, so slow endpoints overlap instead of queueing.
+    Blocking HTTP and SQLite calls run on daemon worker threads, so
+    ``stop`` never waits on an in-flight request.
+
+    Results land in ``queue`` (a ``SnapshotQueue``); only the Tk thread
+    reads it, through ``pump``. Every fetched ticker is also appended to
+    ``archive`` (a ``TickArchive``) when given, and saved to
+    ``snapshot_cache`` (a ``SnapshotCache``) for the next warm start.
+    ``prefetched`` is an optional ``concurrent.futures.Future`` holding the
+    first ticker rows. ``live`` turns true with the first fetched ticker,
+    which is always published, even when it matches what is on screen.
+    """
+
+    def __init__(self, client, ticker_store, journal=None, quote='INR', prefetched=None,
+                 poll_interval=POLL_INTERVAL, book_interval=ORDER_BOOK_INTERVAL, client_factory=None,
+                 archive=None, snapshot_cache=None):
+        self.client = client
+        self.ticker_store = ticker_store
+        self.journal = journal
+        self.archive = archive
+        self.snapshot_cache = snapshot_cache
+        self.quote = quote
+        self.prefetched = prefetched
+        self.poll_interval = poll_interval
+        self.book_interval = book_interval
+        self.client_factory = client_factory or (
+            lambda: MarketDataClient(client.url, order_book_url=client.order_book_url))
+        self.queue = SnapshotQueue()
+        self.watched = frozenset()
+        self.book_tasks = {}
+        self.loop = None
+        self.stopping = None
+        self.thread = None
+        self.closed = False
+        self.live = False
+
+    def start(self):
+        self.thread = threading.Thread(target=asyncio.run, args=(self._main(),),
+                                       name='market-pipeline', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Cancel every poll task, wait for the loop thread and close the clients."""
+        self.closed = True
+        loop = self.loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self.stopping.set)
+            except RuntimeError:  # loop already closed
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout)
+        self.client.close()
+
+    def watch(self, markets):
+        """Poll order books for exactly ``markets`` from now on (thread-safe)."""
+        self.watched = frozenset(markets)
+        loop = self.loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._sync_book_tasks)
+            except RuntimeError:
+                pass
+
+    def pump(self, on_ticker, on_order_book):
+        """Apply waiting updates on the calling (Tk) thread; returns how many."""
+        items = self.queue.drain()
+        if not items: return 0
+        with instruments.span('ui.pump'):
+            for key, value in items:
+                if key == TICKER: on_ticker(value)
+                else: on_order_book(key[1], value)
+        return len(items)
+
+    async def _main(self):
+        self.stopping = asyncio.Event()
+        # Published last: watch() and stop() only schedule onto a ready loop,
+        # and a stop() that came earlier is caught by the check below
+        self.loop = asyncio.get_running_loop()
+        if self.closed: return
+        ticker = asyncio.create_task(self._poll_ticker())
+        self._sync_book_tasks()
+        await self.stopping.wait()
+
+        tasks = [ticker, *self.book_tasks.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.book_tasks.clear()
+
+    def _sync_book_tasks(self):
+        if self.stopping.is_set(): return
+        for market in set(self.book_tasks) - self.watched:
+            self.book_tasks.pop(market).cancel()
+        for market in self.watched - set(self.book_tasks):
+            self.book_tasks[market] = asyncio.create_task(self._poll_book(market))
+
+    async def _poll_ticker(self):
+        prefetched, self.prefetched = self.prefetched, None
+        delay = 0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                if prefetched is not None:
+                    # The splash's warm-up fetch; may still be in flight
+                    rows, prefetched = await asyncio.wrap_future(prefetched), None
+                else:
+                    start = self.loop.time()
+                    rows = await self._blocking(self.client.fetch_ticker, self.quote)
+                    instruments.observe('poll.ticker', self.loop.time() - start)
+                # None means 304 Not Modified: the last snapshot is still current
+                if rows is not None:
+                    await self._blocking(self._publish_ticker, rows)
+                delay = self.poll_interval
+            except Exception:
+                # Transient failures retry with jittered backoff
+                prefetched = None
+                delay = self.client.retry_delay()
+
+    def _publish_ticker(self, rows):
+        with instruments.span('ticker.publish'):
+            changeset = self.ticker_store.update(rows)
+            # The first live ticker goes out even if empty: it ends the cached view
+            publish = not changeset.empty or not self.live
+            if publish:
+                self.live = True
+                # Published before any disk write so the diff chain survives a failed one
+                self.queue.publish(TICKER, changeset, merge_changesets)
+                instruments.count('ticker.changesets')
+            # Archived even when nothing visible changed: history wants every tick
+            if self.archive is not None:
+                with instruments.span('archive.append'):
+                    try:
+                        self.archive.append_rows(rows)
+                    except OSError:  # this poll's ticks are lost; the next one appends again
+                        instruments.count('archive.append_failed')
+            if self.snapshot_cache is not None:
+                with instruments.span('snapshot.save'):
+                    try:
+                        self.snapshot_cache.save(changeset.rows)
+                    except OSError:  # best effort: the next poll tries again
+                        instruments.count('snapshot.save_failed')
+            if publish and self.journal is not None and (changeset.added or changeset.changed):
+                by_market = {row['market']: row for row in changeset.rows}
+                with instruments.span('journal.snapshots'):
+                    self.journal.record_snapshots(by_market[m] for m in changeset.added + changeset.changed)
+
+    async def _poll_book(self, market):
+        client = self.client_factory()
+        pair = order_book_pair(market, self.quote)
+        try:
+            while True:
+                try:
+                    start = self.loop.time()
+                    book = await self._blocking(client.fetch_order_book, pair)
+                    instruments.observe('poll.order_book', self.loop.time() - start)
+                    self.queue.publish((ORDER_BOOK, market), book)
+                    delay = self.book_interval
+                except Exception:
+                    delay = client.retry_delay()
+                await asyncio.sleep(delay)
+        finally:
+            client.close()
+
+    def _blocking(self, fn, *args):
+        """Run ``fn`` on a daemon thread and await its result.
+
+        Unlike ``asyncio.to_thread`` the thread is not part of an executor,
+        so neither the loop nor interpreter exit waits for a hung request.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(result, error):
+            if future.done(): return
+            if error is not None: future.set_exception(error)
+            else: future.set_result(result)
+
+        def work():
+            try:
+                result, error = fn(*args), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:  # the loop has shut down
+                pass
+
+        threading.Thread(target=work, name='market-pipeline-io', daemon=True).start()
+        return future
@@ -0,0 +1,233 @@
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import accumulate
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch fills walk the book per trade
+    np = None
+
+from calc_engine import DEFAULT_SCHEDULE, TradePnl, trade_pnl
+from market_client import order_book_pair
+
+# A book older than this is not used to price a trade
+MAX_AGE = 30.0
+
+# ``slippage`` is the fraction of the best price lost by walking the book
+Fill = namedtuple('Fill', 'requested filled average_price best_price worst_price slippage levels')
+
+
+class BookSide:
+    """One side of a book, best level first, with running quantity and notional.
+
+    ``raw`` is the last snapshot as the API sent it (``{price: quantity}``
+    strings). ``update`` diffs a new snapshot against it, parses only the
+    levels that moved and recomputes the running totals from the best
+    changed level down, so an unchanged poll costs one dict comparison.
+    """
+
+    __slots__ = ('descending', 'raw', 'keys', 'prices', 'quantities', 'cum_quantity', 'cum_notional')
+
+    def __init__(self, descending):
+        self.descending = descending
+        self.raw = {}
+        # Prices, negated for bids, so keys ascend from the best level
+        self.keys = []
+        self.prices = []
+        self.quantities = []
+        self.cum_quantity = []
+        self.cum_notional = []
+
+    def update(self, raw):
+        """Apply a snapshot; returns how many levels changed."""
+        old = self.raw
+        if raw == old: return 0
+        changed = raw.items() - old.items()
+        removed = old.keys() - raw.keys()
+        self.raw = raw
+        sign = -1.0 if self.descending else 1.0
+        keys, prices, quantities = self.keys, self.prices, self.quantities
+        first = len(keys)
+        for price in removed:
+            i = self._remove(sign * float(price))
+            if i is not None and i < first: first = i
+        for price, quantity in changed:
+            key, quantity = sign * float(price), float(quantity)
+            i = bisect_left(keys, key)
+            if quantity <= 0:
+                if self._remove(key) is None: continue
+            elif i < len(keys) and keys[i] == key:
+                quantities[i] = quantity
+            else:
+                keys.insert(i, key)
+                prices.insert(i, -key if self.descending else key)
+                quantities.insert(i, quantity)
+            if i < first: first = i
+
+        # Running totals above the first changed level are still valid
+        base_quantity = self.cum_quantity[first - 1] if first else 0.0
+        base_notional = self.cum_notional[first - 1] if first else 0.0
+        self.cum_quantity[first:] = list(accumulate(quantities[first:], initial=base_quantity))[1:]
+        self.cum_notional[first:] = list(accumulate(map(mul, prices[first:], quantities[first:]),
+                                                    initial=base_notional))[1:]
+        return len(changed) + len(removed)
+
+    def _remove(self, key):
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key: return None
+        del keys[i], self.prices[i], self.quantities[i]
+        return i
+
+    def fill(self, quantity):
+        """Walk the side for ``quantity``: ``(filled, notional, worst price, levels)``.
+
+        A binary search over the running quantity finds the last level
+        touched, so this is O(log n) whatever the depth. A quantity beyond
+        the whole side fills what there is.
+        """
+        cum_quantity = self.cum_quantity
+        if not cum_quantity or quantity <= 0: return 0.0, 0.0, None, 0
+        i = bisect_left(cum_quantity, quantity)
+        if i == len(cum_quantity):
+            return cum_quantity[-1], self.cum_notional[-1], self.prices[-1], i
+        before_quantity = cum_quantity[i - 1] if i else 0.0
+        before_notional = self.cum_notional[i - 1] if i else 0.0
+        return quantity, before_notional + (quantity - before_quantity) * self.prices[i], self.prices[i], i + 1
+
+    def fill_many(self, quantities):
+        """``(filled, notional)`` arrays for many quantities at once (lists without NumPy)."""
+        if np is None:
+            fills = [self.fill(quantity)[:2] for quantity in quantities]
+            return [f[0] for f in fills], [f[1] for f in fills]
+        quantities = np.asarray(quantities, dtype=np.float64)
+        if not self.cum_quantity: return np.zeros(len(quantities)), np.zeros(len(quantities))
+        cum_quantity = np.concatenate(([0.0], self.cum_quantity))
+        cum_notional = np.concatenate(([0.0], self.cum_notional))
+        prices = np.asarray(self.prices)
+        filled = np.clip(quantities, 0.0, cum_quantity[-1])
+        i = np.minimum(np.searchsorted(cum_quantity, filled, 'left'), len(prices)) - 1
+        i = np.maximum(i, 0)
+        return filled, cum_notional[i] + (filled - cum_quantity[i]) * prices[i]
+
+    def depth(self):
+        return self.cum_quantity[-1] if self.cum_quantity else 0.0
+
+    def best(self):
+        return self.prices[0] if self.prices else None
+
+
+class OrderBook:
+    """Bids and asks of one market, refreshed incrementally from snapshots.
+
+    ``sell`` and ``buy`` price a market order of any size against the
+    depth: volume-weighted fill price, worst level reached and slippage
+    against the best price.
+    """
+
+    def __init__(self, market=''):
+        self.market = market
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.updated = None
+        self.version = 0
+
+    def update(self, raw, now=None):
+        """Fold in an API snapshot (``{'bids': {...}, 'asks': {...}}``); returns levels changed."""
+        changed = self.bids.update(raw.get('bids') or {}) + self.asks.update(raw.get('asks') or {})
+        self.updated = time.monotonic() if now is None else now
+        if changed: self.version += 1
+        return changed
+
+    def age(self, now=None):
+        if self.updated is None: return float('inf')
+        return (time.monotonic() if now is None else now) - self.updated
+
+    def sell(self, quantity):
+        """Fill of selling ``quantity`` into the bids."""
+        return self._fill(self.bids, quantity)
+
+    def buy(self, quantity):
+        """Fill of buying ``quantity`` from the asks."""
+        return self._fill(self.asks, quantity)
+
+    @staticmethod
+    def _fill(side, quantity):
+        filled, notional, worst, levels = side.fill(quantity)
+        best = side.best()
+        if not filled: return Fill(quantity, 0.0, None, best, None, 0.0, 0)
+        average = notional / filled
+        return Fill(quantity, filled, average, best, worst, abs(best - average) / best, levels)
+
+
+def book_trade_pnl(book, sell_prices, sell_quantities, costs, schedule=DEFAULT_SCHEDULE):
+    """Batch ``trade_pnl`` at the prices the book can actually fill.
+
+    Each sell is priced at its volume-weighted fill against ``book.bids``
+    instead of ``sell_prices``. When the book is too thin, only the filled
+    part is priced and its share of ``costs`` is matched against it. Returns
+    a dict of columns: the fill, the slippage, ``quoted_pnl`` (the P&L at
+    ``sell_prices``) and every ``TradePnl`` field at the fill.
+    """
+    bids = book.bids
+    best = bids.best()
+    filled, notional = bids.fill_many(sell_quantities)
+    if np is not None:
+        requested = np.asarray(sell_quantities, dtype=np.float64)
+        costs = np.asarray(costs, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fill_price = np.where(filled > 0, notional / filled, 0.0)
+            matched_cost = np.where(requested > 0, costs * (filled / requested), 0.0)
+        slippage = np.where(filled > 0, (best - fill_price) / best, 0.0) if best else np.zeros(len(filled))
+        quoted = trade_pnl(np.asarray(sell_prices, dtype=np.float64), requested, costs, schedule).pnl
+        at_book = trade_pnl(fill_price, filled, matched_cost, schedule)
+        return {'fill_price': fill_price, 'filled_quantity': filled, 'unfilled_quantity': requested - filled,
+                'slippage': slippage, 'quoted_pnl': quoted, **at_book._asdict()}
+
+    columns = {name: [] for name in ('fill_price', 'filled_quantity', 'unfilled_quantity', 'slippage',
+                                     'quoted_pnl', *TradePnl._fields)}
+    for price, quantity, cost, got, value in zip(sell_prices, sell_quantities, costs, filled, notional):
+        fill_price = value / got if got else 0.0
+        matched_cost = cost * got / quantity if quantity else 0.0
+        row = (fill_price, got, quantity - got, (best - fill_price) / best if got and best else 0.0,
+               trade_pnl(price, quantity, cost, schedule).pnl, *trade_pnl(fill_price, got, matched_cost, schedule))
+        for column, item in zip(columns.values(), row):
+            column.append(item)
+    return columns
+
+
+class OrderBookCache:
+    """Latest ``OrderBook`` per market.
+
+    ``apply`` folds a depth snapshot (from the pipeline's queue) into the
+    market's book. ``get`` returns the book if it is at most ``max_age``
+    seconds old; otherwise, given a ``MarketDataClient``, it fetches a fresh
+    snapshot first, and without one returns ``None``.
+    """
+
+    def __init__(self, client=None, quote='INR', max_age=MAX_AGE, clock=time.monotonic):
+        self.client = client
+        self.quote = quote
+        self.max_age = max_age
+        self.clock = clock
+        self.books = {}
+
+    def apply(self, market, raw):
+        book = self.books.get(market)
+        if book is None:
+            book = self.books[market] = OrderBook(market)
+        book.update(raw, self.clock())
+        return book
+
+    def get(self, market, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        book = self.books.get(market)
+        if book is not None and book.age(self.clock()) <= max_age:
+            return book
+        if self.client is None: return None
+        return self.apply(market, self.client.fetch_order_book(order_book_pair(market, self.quote)))
+
+    def __contains__(self, market):
+        return market in self.books
@@ -0,0 +1,121 @@
+import math
+from collections import namedtuple
+
+PortfolioSummary = namedtuple('PortfolioSummary', 'value unrealized realized total_pnl roi positions')
+
+# Incremental sums pick up float drift; re-add from scratch this often
+RESUM_EVERY = 100_000
+
+
+def liquidation_factor(schedule):
+    """Share of a sale's gross left after platform fee, GST and TDS."""
+    return schedule.net_factor * (1 - schedule.tds_rate)
+
+
+class Portfolio:
+    """Open ledger positions marked to market, kept as running sums.
+
+    Each holding stores its units net of exit fees, its cost and its current
+    liquidation value (what ``TradeLedger.sell`` would withdraw), so a price
+    change is one multiply and one delta added to ``value``. ``reprice``
+    only touches the markets it is given; trades are folded in with
+    ``sync`` / ``record_sell`` rather than a rescan of every position.
+    """
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.factor = liquidation_factor(ledger.schedule)
+        self.holdings = {}
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute everything from the ledger (start-up, imports), keeping known marks."""
+        marks = {market: holding[3] for market, holding in self.holdings.items()}
+        self.holdings = {}
+        for position in self.ledger.positions():
+            self._set(position, marks.get(position.market, position.average_price))
+        self.realized = self.ledger.realized_pnl()
+        self.realized_cost = self.ledger.realized_cost()
+        self._resum()
+
+    def _set(self, position, mark):
+        # [units net of exit fees, cost, liquidation value, mark]
+        units = position.quantity * self.factor
+        self.holdings[position.market] = [units, position.cost, units * mark, mark]
+
+    def _resum(self):
+        self.value = math.fsum(h[2] for h in self.holdings.values())
+        self.cost = math.fsum(h[1] for h in self.holdings.values())
+        self.updates = 0
+
+    def reprice(self, prices):
+        """Apply ``(market, price)`` pairs; returns how many holdings moved."""
+        holdings = self.holdings
+        delta = 0.0
+        moved = 0
+        for market, price in prices:
+            holding = holdings.get(market)
+            if holding is None or holding[3] == price: continue
+            value = holding[0] * price
+            delta += value - holding[2]
+            holding[2] = value
+            holding[3] = price
+            moved += 1
+        if moved:
+            self.value += delta
+            self.updates += moved
+            if self.updates >= RESUM_EVERY: self._resum()
+        return moved
+
+    def sync(self, market, mark=None):
+        """Refresh one market after a trade changed its position.
+
+        ``mark`` is the live price if known; otherwise the previous mark, or
+        the average cost for a new holding, is kept until the next tick.
+        """
+        old = self.holdings.pop(market, None)
+        if old is not None:
+            self.value -= old[2]
+            self.cost -= old[1]
+        position = self.ledger.position(market)
+        if position.quantity > 0:
+            if mark is None: mark = old[3] if old is not None else position.average_price
+            self._set(position, mark)
+            self.value += self.holdings[market][2]
+            self.cost += position.cost
+
+    def record_sell(self, market, pnl):
+        """Fold a sell's ``TradePnl`` into the realized totals."""
+        self.realized += pnl.pnl
+        self.realized_cost += pnl.cost
+        self.sync(market)
+
+    def summary(self):
+        unrealized = self.value - self.cost
+        total = unrealized + self.realized
+        invested = self.cost + self.realized_cost
+        roi = total / invested * 100 if invested > 0 else 0.0
+        return PortfolioSummary(self.value, unrealized, self.realized, total, roi, len(self.holdings))
+
+
+class Throttle:
+    """Run ``callback`` at most once per ``interval_ms`` (on the trailing edge)."""
+
+    def __init__(self, widget, interval_ms, callback):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.callback = callback
+        self.pending = None
+
+    def schedule(self):
+        if self.pending is None:
+            self.pending = self.widget.after(self.interval_ms, self._fire)
+
+    def _fire(self):
+        self.pending = None
+        self.callback()
+
+    def cancel(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
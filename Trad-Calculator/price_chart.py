@@ -0,0 +1,431 @@
+import tkinter as tk
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from tkinter import ttk
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pyramid is kept in ``array('d')`` columns
+    np = None
+
+from instrumentation import instruments
+from tick_archive import TICK_FIELDS
+
+MIN_CAPACITY = 1024
+# Shorter runs of blocks are merged in Python; NumPy's per-call cost dominates there
+VECTOR_MIN = 64
+# Views span at most this many pyramid blocks per pixel of width (two points each)
+BLOCKS_PER_PIXEL = 1
+Y_TICKS = 5
+X_TICKS = 4
+ZOOM_STEP = 1.25
+# Narrowest view, in seconds
+MIN_SPAN = 60
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 8, 90, 10, 24
+RANGES = (('1D', 86400), ('1W', 7 * 86400), ('1M', 30 * 86400), ('1Y', 365 * 86400), ('All', None))
+
+LINE_COLOR = '#3498db'
+GRID_COLOR = '#34495e'
+TEXT_COLOR = '#bdc3c7'
+BACKGROUND = '#2c3e50'
+
+
+class _Column:
+    """Growable float64 column: a NumPy array with spare capacity, else ``array('d')``."""
+
+    __slots__ = ('data', 'size')
+
+    def __init__(self):
+        self.data = np.empty(MIN_CAPACITY) if np is not None else array('d')
+        self.size = 0
+
+    def values(self):
+        return self.data[:self.size] if np is not None else self.data
+
+    def set_tail(self, start, values):
+        """Overwrite from ``start`` on with ``values``; the column ends after them."""
+        end = start + len(values)
+        if np is not None:
+            if end > len(self.data):
+                grown = np.empty(max(end, 2 * len(self.data)))
+                grown[:start] = self.data[:start]
+                self.data = grown
+            self.data[start:end] = values
+        else:
+            del self.data[start:]
+            self.data.extend(values)
+        self.size = end
+
+
+class PriceSeries:
+    """A market's price history with a min/max pyramid for drawing any span.
+
+    Level 0 holds every tick. Each level above halves the one below: block
+    ``i`` of level ``k`` is the lowest and highest price (with their times)
+    among ticks ``i * 2**k`` to ``(i + 1) * 2**k``. ``window`` picks the
+    level with about one block per pixel, so a view costs a binary search
+    plus work proportional to the pixel width, whatever the history length;
+    panning and zooming a year of minute data costs the same as an hour.
+    ``append`` rebuilds only the last (partial) block of each level.
+    """
+
+    def __init__(self, times=(), prices=()):
+        self.times = _Column()
+        self.prices = _Column()
+        # levels[k] = (low times, lows, high times, highs); level 0 shares its columns
+        self.levels = [(self.times, self.prices, self.times, self.prices)]
+        self.extend(times, prices)
+
+    def __len__(self):
+        return self.times.size
+
+    @classmethod
+    def from_archive(cls, archive, market):
+        """Series of ``market``'s archived ``last_price`` ticks (a ``TickArchive``)."""
+        if market not in archive: return cls()
+        ticks = archive.ticks(market)
+        if np is not None: return cls(ticks['timestamp'], ticks['last_price'])
+        width = len(TICK_FIELDS)
+        return cls(ticks[0::width], ticks[1::width])
+
+    def last(self):
+        """``(timestamp, price)`` of the newest tick, or ``None``."""
+        if not self.times.size: return None
+        return self.times.values()[self.times.size - 1], self.prices.values()[self.prices.size - 1]
+
+    def append(self, timestamp, price):
+        """Add one tick; returns False if it is not newer than the last."""
+        return self.extend((timestamp,), (price,)) > 0
+
+    def extend(self, times, prices):
+        """Add ticks in time order; ticks not newer than the last are skipped."""
+        start = self.times.size
+        if start:
+            last = self.times.values()[start - 1]
+            skip = bisect_right(times, last) if np is None else int(np.searchsorted(times, last, 'right'))
+            times, prices = times[skip:], prices[skip:]
+        if not len(times): return 0
+        self.times.set_tail(start, times)
+        self.prices.set_tail(start, prices)
+        self._rebuild(start)
+        return len(times)
+
+    def _rebuild(self, start):
+        """Recompute every level's blocks from the one covering tick ``start``."""
+        k = 1
+        while True:
+            below = self.levels[k - 1]
+            below_size = below[0].size
+            if below_size <= 1: break
+            if k == len(self.levels):
+                self.levels.append((_Column(), _Column(), _Column(), _Column()))
+            first = start >> k
+            self._merge(below, self.levels[k], first, below_size)
+            k += 1
+        # A shorter history can leave stale levels above the top
+        del self.levels[k:]
+
+    @staticmethod
+    def _merge(below, level, first, below_size):
+        """Blocks ``first`` on of ``level`` from pairs of blocks of ``below``."""
+        lo_t, lo, hi_t, hi = (column.values() for column in below)
+        begin = 2 * first
+        if np is not None and below_size - begin > VECTOR_MIN:
+            def pairs(column):
+                part = column[begin:below_size]
+                if len(part) % 2: part = np.append(part, part[-1])
+                return part.reshape(-1, 2)
+            lo_t, lo, hi_t, hi = pairs(lo_t), pairs(lo), pairs(hi_t), pairs(hi)
+            # Ties keep the earlier block, so times stay in order
+            take_lo = lo[:, 1] < lo[:, 0]
+            take_hi = hi[:, 1] > hi[:, 0]
+            columns = (np.where(take_lo, lo_t[:, 1], lo_t[:, 0]), np.where(take_lo, lo[:, 1], lo[:, 0]),
+                       np.where(take_hi, hi_t[:, 1], hi_t[:, 0]), np.where(take_hi, hi[:, 1], hi[:, 0]))
+        else:
+            columns = (array('d'), array('d'), array('d'), array('d'))
+            new_lo_t, new_lo, new_hi_t, new_hi = columns
+            for i in range(begin, below_size, 2):
+                j = i + 1 if i + 1 < below_size else i
+                a = j if lo[j] < lo[i] else i
+                b = j if hi[j] > hi[i] else i
+                new_lo_t.append(lo_t[a])
+                new_lo.append(lo[a])
+                new_hi_t.append(hi_t[b])
+                new_hi.append(hi[b])
+        for column, values in zip(level, columns):
+            column.set_tail(first, values)
+
+    def window(self, start, end, width):
+        """Points to draw for ``start <= t <= end`` at ``width`` pixels: ``(times, prices)``.
+
+        At most about two points per pixel, in time order: each block's low
+        and high, so every spike in the span survives. One tick either side
+        of the span is included so the line reaches the edges.
+        """
+        times = self.times.values()
+        count = self.times.size
+        if not count: return [], []
+        if np is not None:
+            first = max(int(np.searchsorted(times, start, 'left')) - 1, 0)
+            last = min(int(np.searchsorted(times, end, 'right')) + 1, count)
+        else:
+            first = max(bisect_left(times, start) - 1, 0)
+            last = min(bisect_right(times, end) + 1, count)
+        if last <= first: return [], []
+        budget = max(int(width * BLOCKS_PER_PIXEL), 1)
+        k = 0
+        while ((last - first) >> k) > budget and k + 1 < len(self.levels):
+            k += 1
+        lo_block, hi_block = first >> k, ((last - 1) >> k) + 1
+        if k == 0:
+            if np is not None: return times[first:last], self.prices.values()[first:last]
+            return times[first:last].tolist(), self.prices.values()[first:last].tolist()
+        lo_t, lo, hi_t, hi = (column.values()[lo_block:hi_block] for column in self.levels[k])
+        if np is not None:
+            low_first = lo_t <= hi_t
+            xs = np.empty(2 * len(lo_t))
+            ys = np.empty(2 * len(lo_t))
+            xs[0::2] = np.where(low_first, lo_t, hi_t)
+            xs[1::2] = np.where(low_first, hi_t, lo_t)
+            ys[0::2] = np.where(low_first, lo, hi)
+            ys[1::2] = np.where(low_first, hi, lo)
+            return xs, ys
+        xs, ys = [], []
+        for a_t, a, b_t, b in zip(lo_t, lo, hi_t, hi):
+            if a_t <= b_t: xs += (a_t, b_t); ys += (a, b)
+            else: xs += (b_t, a_t); ys += (b, a)
+        return xs, ys
+
+
+def lttb(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets: indexes of ``threshold`` points that keep the shape.
+
+    The first and last points are kept; from each bucket in between, the
+    point forming the largest triangle with the previous pick and the next
+    bucket's average is taken.
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 3: return list(range(count))
+    picked = [0]
+    every = (count - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        next_hi = min(int((i + 2) * every) + 1, count)
+        next_lo = hi
+        avg_x = sum(xs[next_lo:next_hi]) / (next_hi - next_lo)
+        avg_y = sum(ys[next_lo:next_hi]) / (next_hi - next_lo)
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+    picked.append(count - 1)
+    return picked
+
+
+def time_label(timestamp, span):
+    moment = datetime.fromtimestamp(timestamp)
+    if span <= 2 * 86400: return moment.strftime('%H:%M')
+    if span <= 120 * 86400: return moment.strftime('%d %b')
+    return moment.strftime('%b %Y')
+
+
+class PriceChart:
+    """Zoomable line chart of one ``PriceSeries`` on a ``tk.Canvas``.
+
+    The line, grid lines and axis labels are created once and moved with
+    ``coords``/``itemconfigure`` on every redraw. Drag pans, the wheel zooms
+    around the cursor, and redraws are coalesced to one per idle cycle.
+    While the view touches the newest tick it follows live data; a tick
+    outside a panned-away view costs no redraw at all.
+    """
+
+    def __init__(self, parent, series, title='', method='minmax'):
+        self.series = series
+        self.method = method
+        self.window = parent.winfo_toplevel()
+        self.frame = ttk.Frame(parent)
+        bar = ttk.Frame(self.frame)
+        bar.pack(fill='x', padx=5, pady=5)
+        ttk.Label(bar, text=title, style='Subtitle.TLabel').pack(side='left', padx=(0, 10))
+        for label, span in RANGES:
+            ttk.Button(bar, text=label, width=4, command=lambda span=span: self.show_range(span)).pack(side='left', padx=1)
+        self.status_var = tk.StringVar()
+        ttk.Label(bar, textvariable=self.status_var, style='Info.TLabel').pack(side='right')
+
+        self.canvas = tk.Canvas(self.frame, bg=BACKGROUND, highlightthickness=0, width=720, height=360)
+        self.canvas.pack(fill='both', expand=True)
+        canvas = self.canvas
+        self.grid_items = [canvas.create_line(0, 0, 0, 0, fill=GRID_COLOR) for _ in range(Y_TICKS)]
+        self.price_labels = [canvas.create_text(0, 0, anchor='w', fill=TEXT_COLOR, font=('Arial', 9))
+                             for _ in range(Y_TICKS)]
+        self.time_labels = [canvas.create_text(0, 0, anchor='n', fill=TEXT_COLOR, font=('Arial', 9))
+                            for _ in range(X_TICKS)]
+        self.line = canvas.create_line(0, 0, 0, 0, fill=LINE_COLOR, width=1.5)
+        self.last_marker = canvas.create_text(0, 0, anchor='w', fill='white', font=('Arial', 9, 'bold'))
+        self.empty_label = canvas.create_text(0, 0, fill=TEXT_COLOR, font=('Arial', 11),
+                                              text="No price history yet — ticks are recorded while the app runs")
+
+        self.start = self.end = None
+        self.follow = True
+        self.drag_x = None
+        self._redraw_pending = False
+        canvas.bind('<Configure>', lambda event: self.schedule_redraw())
+        canvas.bind('<ButtonPress-1>', self._on_press)
+        canvas.bind('<B1-Motion>', self._on_drag)
+        canvas.bind('<ButtonRelease-1>', lambda event: setattr(self, 'drag_x', None))
+        canvas.bind('<MouseWheel>', self._on_wheel)
+        canvas.bind('<Button-4>', self._on_wheel)
+        canvas.bind('<Button-5>', self._on_wheel)
+        self.show_range(RANGES[0][1])
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def show_range(self, span):
+        """View the last ``span`` seconds (everything for ``None``) and follow live ticks."""
+        last = self.series.last()
+        if last is None:
+            self.start, self.end = 0.0, float(MIN_SPAN)
+        else:
+            first = self.series.times.values()[0]
+            self.end = last[0]
+            self.start = first if span is None else self.end - span
+            if self.end - self.start < MIN_SPAN: self.start = self.end - MIN_SPAN
+        self.follow = True
+        self.schedule_redraw()
+
+    def append(self, timestamp, price):
+        """Add a live tick; redraws only if it lands in view."""
+        if not self.series.append(timestamp, price): return
+        # A view panned into history ends before the newest tick already
+        if not self.follow: return
+        span = self.end - self.start
+        self.end = timestamp
+        self.start = timestamp - span
+        self.schedule_redraw()
+
+    def schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.canvas.after_idle(self.redraw)
+
+    def plot_area(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        return MARGIN_LEFT, MARGIN_TOP, max(width - MARGIN_RIGHT, MARGIN_LEFT + 1), max(height - MARGIN_BOTTOM, MARGIN_TOP + 1)
+
+    def redraw(self):
+        self._redraw_pending = False
+        if not self.canvas.winfo_exists(): return
+        with instruments.span('chart.redraw'):
+            self._redraw()
+
+    def _redraw(self):
+        canvas = self.canvas
+        left, top, right, bottom = self.plot_area()
+        xs, ys = self.series.window(self.start, self.end, right - left)
+        if len(xs) < 2:
+            canvas.itemconfigure(self.line, state='hidden')
+            canvas.itemconfigure(self.last_marker, state='hidden')
+            canvas.coords(self.empty_label, (left + right) / 2, (top + bottom) / 2)
+            canvas.itemconfigure(self.empty_label, state='normal' if not len(self.series) else 'hidden')
+            return
+        canvas.itemconfigure(self.empty_label, state='hidden')
+        if self.method == 'lttb':
+            keep = lttb(xs, ys, right - left)
+            xs, ys = [xs[i] for i in keep], [ys[i] for i in keep]
+        if np is not None:
+            xs, ys = np.asarray(xs), np.asarray(ys)
+            low, high = float(ys.min()), float(ys.max())
+        else:
+            low, high = min(ys), max(ys)
+        if high == low: low, high = low - 1, high + 1
+        pad = (high - low) * 0.05
+        low, high = low - pad, high + pad
+        x_scale = (right - left) / (self.end - self.start)
+        y_scale = (bottom - top) / (high - low)
+        if np is not None:
+            points = np.empty(2 * len(xs))
+            points[0::2] = (xs - self.start) * x_scale + left
+            points[1::2] = bottom - (ys - low) * y_scale
+            points = points.tolist()
+        else:
+            points = []
+            for x, y in zip(xs, ys):
+                points += ((x - self.start) * x_scale + left, bottom - (y - low) * y_scale)
+        canvas.coords(self.line, points)
+        canvas.itemconfigure(self.line, state='normal')
+
+        for i, (grid, label) in enumerate(zip(self.grid_items, self.price_labels)):
+            price = low + (high - low) * (i + 0.5) / Y_TICKS
+            y = bottom - (price - low) * y_scale
+            canvas.coords(grid, left, y, right, y)
+            canvas.coords(label, right + 6, y)
+            canvas.itemconfigure(label, text=f"{price:,.4f}")
+        span = self.end - self.start
+        for i, label in enumerate(self.time_labels):
+            moment = self.start + span * (i + 0.5) / X_TICKS
+            canvas.coords(label, left + (moment - self.start) * x_scale, bottom + 4)
+            canvas.itemconfigure(label, text=time_label(moment, span))
+
+        last_time, last_price = self.series.last()
+        if self.start <= last_time <= self.end + span * 0.01:
+            canvas.coords(self.last_marker, right + 6, min(max(bottom - (last_price - low) * y_scale, top), bottom))
+            canvas.itemconfigure(self.last_marker, text=f"₹{last_price:,.4f}", state='normal')
+        else:
+            canvas.itemconfigure(self.last_marker, state='hidden')
+        self.status_var.set(f"{len(xs):,} points for {len(self.series):,} ticks")
+
+    def _on_press(self, event):
+        self.drag_x = event.x
+
+    def _on_drag(self, event):
+        if self.drag_x is None: return
+        left, _, right, _ = self.plot_area()
+        shift = (self.drag_x - event.x) * (self.end - self.start) / (right - left)
+        self.drag_x = event.x
+        self.pan(shift)
+
+    def pan(self, seconds):
+        self.start += seconds
+        self.end += seconds
+        last = self.series.last()
+        self.follow = last is not None and self.end >= last[0]
+        self.schedule_redraw()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0: factor = 1 / ZOOM_STEP
+        else: factor = ZOOM_STEP
+        left, _, right, _ = self.plot_area()
+        fraction = min(max((event.x - left) / (right - left), 0.0), 1.0)
+        self.zoom(factor, self.start + fraction * (self.end - self.start))
+
+    def zoom(self, factor, anchor):
+        """Scale the span by ``factor`` keeping the time ``anchor`` in place."""
+        span = max((self.end - self.start) * factor, MIN_SPAN)
+        fraction = (anchor - self.start) / (self.end - self.start)
+        self.start = anchor - fraction * span
+        self.end = self.start + span
+        last = self.series.last()
+        self.follow = last is not None and self.end >= last[0]
+        self.schedule_redraw()
+
+
+def open_chart_window(root, series, market, on_close=None):
+    """A ``Toplevel`` holding a ``PriceChart`` of ``series``; returns the chart."""
+    window = tk.Toplevel(root)
+    window.title(f"📈 {market}")
+    chart = PriceChart(window, series, title=market)
+    chart.pack(fill='both', expand=True)
+
+    def close():
+        if on_close is not None: on_close(market)
+        window.destroy()
+    window.protocol("WM_DELETE_WINDOW", close)
+    return chart
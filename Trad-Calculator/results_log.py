@@ -0,0 +1,206 @@
+import json
+import tempfile
+import time
+import tkinter as tk
+from array import array
+from bisect import bisect_left
+from collections import deque, namedtuple
+from tkinter import ttk
+
+# Records kept in memory; older ones spill to disk
+RING_CAPACITY = 1000
+# Records rendered in the Text widget at once
+PAGE_SIZE = 50
+COPY_CHUNK = 1 << 20
+
+ResultRecord = namedtuple('ResultRecord', 'seq timestamp tag text')
+
+
+class ResultsLog:
+    """Session results as numbered records: a ring in memory, the rest on disk.
+
+    The newest ``capacity`` records live in a deque. When it is full the
+    oldest record is appended to a spill file as one JSON line, and its
+    offset goes in an ``array`` so any page can be read back with one seek.
+    ``seq`` numbers are contiguous from 0, so record ``i`` is on disk when
+    ``i < spilled``. Records carrying a ``tag`` can be rewritten in place
+    while they are still in memory (live Monte Carlo results).
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, spill=None):
+        self.capacity = capacity
+        self.ring = deque()
+        self.tags = {}
+        self.spill = spill if spill is not None else tempfile.TemporaryFile()
+        self.offsets = array('q')
+        self.spill_end = 0
+
+    @property
+    def spilled(self):
+        return len(self.offsets)
+
+    def __len__(self):
+        return self.spilled + len(self.ring)
+
+    def append(self, text, tag=None, timestamp=None):
+        record = ResultRecord(len(self), timestamp or time.time(), tag, text)
+        self.ring.append(record)
+        if tag is not None: self.tags[tag] = record.seq
+        if len(self.ring) > self.capacity: self._spill(self.ring.popleft())
+        return record
+
+    def replace(self, tag, text):
+        """Rewrite the in-memory record tagged ``tag``; appends a new one if it is gone."""
+        seq = self.tags.get(tag)
+        if seq is None or seq < self.spilled: return self.append(text, tag)
+        index = seq - self.spilled
+        record = self.ring[index]._replace(text=text)
+        self.ring[index] = record
+        return record
+
+    def _spill(self, record):
+        if self.tags.get(record.tag) == record.seq: del self.tags[record.tag]
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        self.offsets.append(self.spill_end)
+        self.spill.write(line)
+        self.spill_end += len(line)
+
+    def _read_spilled(self, start, end):
+        if start >= end: return []
+        self.spill.flush()
+        self.spill.seek(self.offsets[start])
+        stop = self.offsets[end] if end < self.spilled else self.spill_end
+        data = self.spill.read(stop - self.offsets[start])
+        self.spill.seek(self.spill_end)
+        return [ResultRecord(*json.loads(line)) for line in data.splitlines()]
+
+    def records(self, start, end):
+        """Records with ``start <= seq < end``."""
+        start, end = max(start, 0), min(end, len(self))
+        if start >= end: return []
+        spilled = self.spilled
+        records = self._read_spilled(start, min(end, spilled))
+        records.extend(self.ring[i - spilled] for i in range(max(start, spilled), end))
+        return records
+
+    def write_text(self, f):
+        """Stream every record's text to ``f`` oldest first, without joining them in memory."""
+        spilled = 0
+        while spilled < self.spilled:
+            # Read the spill in batches of about COPY_CHUNK bytes
+            end = max(bisect_left(self.offsets, self.offsets[spilled] + COPY_CHUNK), spilled + 1)
+            for record in self._read_spilled(spilled, end):
+                f.write(record.text + "\n")
+            spilled = end
+        for record in self.ring:
+            f.write(record.text + "\n")
+
+    def clear(self):
+        self.ring.clear()
+        self.tags.clear()
+        self.offsets = array('q')
+        self.spill.seek(0)
+        self.spill.truncate()
+        self.spill_end = 0
+
+    def close(self):
+        self.spill.close()
+
+
+class ResultsView:
+    """Shows one page of a ``ResultsLog`` in a Text widget.
+
+    By default the view follows the newest ``page_size`` records: an
+    append inserts one block and trims the oldest, so the widget never
+    grows past a page. ``older`` / ``newer`` step back through history;
+    records appended meanwhile are only counted until the view returns to
+    the latest page. Each rendered record is a Text tag ``rec<seq>``.
+    """
+
+    def __init__(self, text, log, page_size=PAGE_SIZE):
+        self.text = text
+        self.log = log
+        self.page_size = page_size
+        self.end = None  # None follows the newest records
+        self.shown = deque()
+        self.status_var = tk.StringVar()
+
+    def controls(self, parent):
+        frame = ttk.Frame(parent)
+        ttk.Button(frame, text="◀ Older", command=self.older).pack(side='left', padx=2)
+        ttk.Button(frame, text="Newer ▶", command=self.newer).pack(side='left', padx=2)
+        ttk.Button(frame, text="⏭ Latest", command=self.latest).pack(side='left', padx=2)
+        ttk.Label(frame, textvariable=self.status_var).pack(side='left', padx=10)
+        return frame
+
+    def append(self, text, tag=None):
+        record = self.log.append(text, tag)
+        if self.end is None:
+            self._insert(record)
+            self.text.see(tk.END)
+            while len(self.shown) > self.page_size:
+                self._drop(self.shown.popleft())
+        self._update_status()
+
+    def replace(self, tag, text):
+        """Rewrite the live record tagged ``tag`` (appending it if it is new or spilled)."""
+        seq = self.log.tags.get(tag)
+        if seq is None or seq < self.log.spilled:
+            self.append(text, tag)
+            return
+        record = self.log.replace(tag, text)
+        ranges = self.text.tag_ranges(f"rec{seq}")
+        if ranges:
+            self.text.delete(ranges[0], ranges[1])
+            self.text.insert(ranges[0], record.text + "\n", f"rec{seq}")
+
+    def _insert(self, record):
+        self.text.insert(tk.END, record.text + "\n", f"rec{record.seq}")
+        self.shown.append(record.seq)
+
+    def _drop(self, seq):
+        ranges = self.text.tag_ranges(f"rec{seq}")
+        if ranges: self.text.delete(ranges[0], ranges[1])
+        # Deleting the text leaves the tag behind, so it is removed too
+        self.text.tag_delete(f"rec{seq}")
+
+    def render(self):
+        """Redraw the current page from the log."""
+        while self.shown:
+            self._drop(self.shown.popleft())
+        self.text.delete(1.0, tk.END)
+        end = len(self.log) if self.end is None else self.end
+        for record in self.log.records(end - self.page_size, end):
+            self._insert(record)
+        if self.end is None: self.text.see(tk.END)
+        else: self.text.see(1.0)
+        self._update_status()
+
+    def older(self):
+        end = len(self.log) if self.end is None else self.end
+        if end <= self.page_size: return
+        self.end = max(end - self.page_size, self.page_size)
+        self.render()
+
+    def newer(self):
+        if self.end is None: return
+        self.end += self.page_size
+        if self.end >= len(self.log): self.end = None
+        self.render()
+
+    def latest(self):
+        if self.end is None: return
+        self.end = None
+        self.render()
+
+    def clear(self):
+        self.log.clear()
+        self.end = None
+        self.render()
+
+    def _update_status(self):
+        total = len(self.log)
+        end = total if self.end is None else self.end
+        start = max(end - self.page_size, 0)
+        suffix = "" if self.end is None else f" ({total - end:,} newer)"
+        self.status_var.set(f"Results {start + 1 if total else 0:,}-{end:,} of {total:,}{suffix}")
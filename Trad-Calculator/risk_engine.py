@@ -0,0 +1,213 @@
+import math
+import multiprocessing
+import random
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; shards fall back to a pure-Python walk
+    np = None
+
+DEFAULT_PATHS = 1_000_000
+SHARD_PATHS = 62_500
+# Paths simulated per array block inside a shard, to bound worker memory
+BLOCK_PATHS = 16_384
+HORIZON = 24 * 3600
+STEPS = 24
+CONFIDENCE = 0.95
+MIN_RETURNS = 30
+
+RiskEstimate = namedtuple('RiskEstimate', 'paths total_paths confidence var cvar stop_hit_probability expected_pnl')
+
+
+def historical_returns(snapshots, step_seconds=HORIZON / STEPS):
+    """Per-step log returns of ``last_price`` from tick archive rows
+    (``TickArchive.rows``: ``(timestamp, last_price, ...)`` tuples in time order).
+
+    Prices are sampled once per ``step_seconds`` bucket. A return spanning a
+    gap of ``k`` buckets (the app was closed) is scaled by ``1/sqrt(k)`` so
+    every return describes one step.
+    """
+    buckets, prices = [], []
+    for timestamp, last_price, *_ in snapshots:
+        if last_price <= 0: continue
+        bucket = int(timestamp // step_seconds)
+        if buckets and buckets[-1] == bucket:
+            prices[-1] = last_price
+        else:
+            buckets.append(bucket)
+            prices.append(last_price)
+    return [math.log(p1 / p0) / math.sqrt(b1 - b0)
+            for b0, b1, p0, p1 in zip(buckets, buckets[1:], prices, prices[1:])]
+
+
+def simulate_shard(returns, paths, steps, stop_log_return, seed):
+    """Bootstrap ``paths`` walks of ``steps`` historical returns.
+
+    Returns the final log return of every path and how many paths touched
+    ``stop_log_return`` along the way. Runs in a worker process.
+    """
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        returns = np.asarray(returns, dtype=np.float64)
+        finals = np.empty(paths)
+        hits = 0
+        for start in range(0, paths, BLOCK_PATHS):
+            count = min(BLOCK_PATHS, paths - start)
+            walks = np.cumsum(returns[rng.integers(0, len(returns), size=(count, steps))], axis=1)
+            finals[start:start + count] = walks[:, -1]
+            hits += int(np.count_nonzero(walks.min(axis=1) <= stop_log_return))
+        return finals, hits
+
+    rng = random.Random(seed)
+    choice = rng.choice
+    finals = []
+    hits = 0
+    for _ in range(paths):
+        total = 0.0
+        low = math.inf
+        for _ in range(steps):
+            total += choice(returns)
+            if total < low: low = total
+        finals.append(total)
+        if low <= stop_log_return: hits += 1
+    return finals, hits
+
+
+def _shard_seeds(seed, count):
+    # Seeds depend only on (seed, shard index), never on the worker count
+    if np is not None:
+        return np.random.SeedSequence(seed).spawn(count)
+    return [seed * 1_000_003 + i for i in range(count)]
+
+
+def _estimate(finals, hits, total_paths, value, confidence):
+    """VaR/CVaR (as positive losses) and stop-hit odds over the paths so far."""
+    if np is not None:
+        pnl = value * np.expm1(np.concatenate(finals))
+        paths = len(pnl)
+        cut = min(int(confidence * paths), paths - 1)
+        # Only the tail has to be ordered, so a partition replaces the sort
+        losses = np.partition(-pnl, cut)
+        var, cvar, expected = float(losses[cut]), float(losses[cut:].mean()), float(pnl.mean())
+    else:
+        losses = sorted(-value * math.expm1(f) for shard in finals for f in shard)
+        paths = len(losses)
+        cut = min(int(confidence * paths), paths - 1)
+        var, cvar, expected = losses[cut], sum(losses[cut:]) / (paths - cut), -sum(losses) / paths
+    return RiskEstimate(paths, total_paths, confidence, var, cvar, hits / paths, expected)
+
+
+class SimulationRun:
+    """A simulation running on a background thread.
+
+    ``take`` returns the newest progressive ``RiskEstimate`` not yet taken
+    (or ``None``); ``done`` is set once the run finished, failed (``error``)
+    or was cancelled. Safe to poll from the Tk thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latest = None
+        self.error = None
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+
+    def take(self):
+        with self.lock:
+            latest, self.latest = self.latest, None
+        return latest
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _publish(self, estimate):
+        with self.lock:
+            self.latest = estimate
+
+
+class MonteCarloRisk:
+    """Monte Carlo VaR, CVaR and stop-loss hit probability for one position.
+
+    Paths are bootstrapped from historical per-step returns, so fat tails in
+    the collected ticker data carry into the estimate. Work is split into
+    shards of ``shard_paths`` paths, each with its own ``SeedSequence``
+    child, and run on a process pool; the result for a given seed is the
+    same whatever the worker count.
+
+    The pool is created on first use and uses the ``spawn`` start method, as
+    forking a process that runs Tk and several threads is unsafe.
+    """
+
+    def __init__(self, max_workers=None, shard_paths=SHARD_PATHS):
+        self.max_workers = max_workers
+        self.shard_paths = shard_paths
+        self.executor = None
+
+    def pool(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.executor
+
+    def simulate(self, returns, quantity, mark_price, stop_loss, paths=DEFAULT_PATHS, steps=STEPS,
+                 confidence=CONFIDENCE, seed=0, on_progress=None, cancelled=None):
+        """Run the simulation and return the final ``RiskEstimate``.
+
+        ``on_progress(estimate)`` is called after every finished shard.
+        Returns ``None`` if ``cancelled`` (a ``threading.Event``) gets set.
+        """
+        if len(returns) < MIN_RETURNS:
+            raise ValueError(f"Need at least {MIN_RETURNS} price returns, have {len(returns)}")
+        value = quantity * mark_price
+        stop_log_return = math.log(stop_loss / mark_price) if stop_loss > 0 else -math.inf
+
+        sizes = [min(self.shard_paths, paths - start) for start in range(0, paths, self.shard_paths)]
+        pool = self.pool()
+        futures = [pool.submit(simulate_shard, returns, size, steps, stop_log_return, shard_seed)
+                   for size, shard_seed in zip(sizes, _shard_seeds(seed, len(sizes)))]
+        finals = [None] * len(futures)
+        index = {future: i for i, future in enumerate(futures)}
+        hits = 0
+        estimate = None
+        try:
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled.is_set():
+                    return None
+                shard_finals, shard_hits = future.result()
+                # Slotted by shard index so the final arrays do not depend on completion order
+                finals[index[future]] = shard_finals
+                hits += shard_hits
+                estimate = _estimate([f for f in finals if f is not None], hits, paths, value, confidence)
+                if on_progress is not None: on_progress(estimate)
+        finally:
+            for future in futures:
+                future.cancel()
+        return estimate
+
+    def start(self, returns_source, quantity, mark_price, stop_loss, **options):
+        """Run ``simulate`` on a background thread and return its ``SimulationRun``.
+
+        ``returns_source`` is a callable returning the return history; it is
+        called on the background thread too, so slow journal reads stay off
+        the caller's thread.
+        """
+        run = SimulationRun()
+
+        def work():
+            try:
+                self.simulate(returns_source(), quantity, mark_price, stop_loss,
+                              on_progress=run._publish, cancelled=run.cancelled, **options)
+            except Exception as e:
+                run.error = e
+            finally:
+                run.done.set()
+
+        threading.Thread(target=work, name='risk-simulation', daemon=True).start()
+        return run
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
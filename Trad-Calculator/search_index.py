@@ -0,0 +1,99 @@
+from bisect import bisect_left
+
+# Grams up to this length are indexed directly, so 1-3 character queries
+# are a single posting-list lookup with no verification pass.
+MAX_GRAM = 3
+SEARCH_DEBOUNCE_MS = 120
+
+EXACT, PREFIX, SUBSTRING = 0, 1, 2
+
+
+def market_symbol(market, quote='INR'):
+    """Searchable symbol for a market, e.g. ``'BTCINR'`` -> ``'btc'``."""
+    return market.replace(quote, '').lower()
+
+
+class SearchIndex:
+    """Symbol index for the price panel search box.
+
+    Prefix queries are answered from the sorted symbol list with bisect (a
+    flattened trie); substring queries from an n-gram posting index. Results
+    are ranked exact > prefix > substring, then by volume (see
+    ``set_volumes``), then by name.
+    """
+
+    def __init__(self, markets, quote='INR'):
+        self.markets = list(markets)
+        self.symbols = [market_symbol(market, quote) for market in self.markets]
+        ordered = sorted(range(len(self.symbols)), key=self.symbols.__getitem__)
+        self.sorted_ids = ordered
+        self.sorted_symbols = [self.symbols[i] for i in ordered]
+        self.symbol_order = [0] * len(ordered)
+        for position, i in enumerate(ordered):
+            self.symbol_order[i] = position
+        self.neg_volumes = None
+
+        self.grams = {}
+        for i, symbol in enumerate(self.symbols):
+            for n in range(1, MAX_GRAM + 1):
+                for start in range(len(symbol) - n + 1):
+                    self.grams.setdefault(symbol[start:start + n], set()).add(i)
+
+    def prefix_ids(self, term):
+        lo = bisect_left(self.sorted_symbols, term)
+        hi = bisect_left(self.sorted_symbols, term + '\uffff', lo)
+        return self.sorted_ids[lo:hi]
+
+    def substring_ids(self, term):
+        if len(term) <= MAX_GRAM:
+            return self.grams.get(term, ())
+        # Intersect the posting lists of every trigram, smallest first, then
+        # confirm the survivors really contain the whole term
+        postings = sorted((self.grams.get(term[i:i + MAX_GRAM], set())
+                           for i in range(len(term) - MAX_GRAM + 1)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [i for i in candidates if term in self.symbols[i]]
+
+    def set_volumes(self, volumes):
+        """Set per-market volumes (aligned with ``markets``) used for ranking."""
+        self.neg_volumes = [-v for v in volumes]
+
+    def search(self, term):
+        """Return matching markets, best first."""
+        term = term.lower()
+        if not term: return list(self.markets)
+        prefix = self.prefix_ids(term)
+        # Prefix hits come back in symbol order, so an exact hit leads the run
+        exact = prefix[:1] if prefix and self.symbols[prefix[0]] == term else []
+        prefix_set = set(prefix)
+        tiers = (exact, prefix[len(exact):], [i for i in self.substring_ids(term) if i not in prefix_set])
+
+        # Sorting by symbol first makes name the tie-break of the stable
+        # volume sort; both keys are C-level list lookups
+        key = self.neg_volumes.__getitem__ if self.neg_volumes is not None else None
+        markets = self.markets
+        ranked = []
+        for tier in tiers:
+            tier = sorted(tier, key=self.symbol_order.__getitem__)
+            if key is not None: tier.sort(key=key)
+            ranked.extend(markets[i] for i in tier)
+        return ranked
+
+
+class Debouncer:
+    """Run ``callback`` once input has been quiet for ``delay_ms``."""
+
+    def __init__(self, widget, delay_ms, callback):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.callback = callback
+        self.pending = None
+
+    def schedule(self, *args):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+        self.pending = self.widget.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self.pending = None
+        self.callback()
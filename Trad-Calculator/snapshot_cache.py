@@ -0,0 +1,109 @@
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from collections import namedtuple
+
+from journal import DATA_DIR
+
+# Header: magic, version, field count, saved-at epoch, row count, CRC-32 of the body
+HEADER = struct.Struct('<4sHHdII')
+MAGIC = b'TKSN'
+VERSION = 1
+FIELDS = ('last_price', 'high', 'low', 'volume', 'change_24_hour', 'timestamp')
+NAMES_LENGTH = struct.Struct('<I')
+# A snapshot older than this is not shown at all
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+CachedSnapshot = namedtuple('CachedSnapshot', 'rows saved_at')
+
+
+def default_snapshot_path():
+    return os.path.join(DATA_DIR, 'ticker.snapshot')
+
+
+class SnapshotCache:
+    """The last good ticker snapshot, kept on disk for a warm start.
+
+    The file is a fixed header, the market names and one packed float64
+    column per field, so loading is a read, a checksum and a few array
+    copies (milliseconds for every INR market). ``save`` writes a temporary
+    file in the same directory and renames it over the old one, so a crash
+    leaves either the previous snapshot or the new one. ``load`` returns
+    ``None`` for a missing, damaged, other-version or older-than-``ttl``
+    file. Snapshots over ``max_bytes`` keep the highest-volume markets.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        self.path = path or default_snapshot_path()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+
+    def save(self, rows):
+        """Persist parsed ticker rows; returns how many were kept."""
+        rows = self._fit(rows)
+        names = '\n'.join(row['market'] for row in rows).encode('utf-8')
+        columns = array('d', [float(row.get(field) or 0.0) for field in FIELDS for row in rows])
+        if sys.byteorder == 'big': columns.byteswap()
+        body = NAMES_LENGTH.pack(len(names)) + names + columns.tobytes()
+        header = HEADER.pack(MAGIC, VERSION, len(FIELDS), self.clock(), len(rows), zlib.crc32(body))
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.ticker-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        return len(rows)
+
+    def load(self):
+        """The saved snapshot as a ``CachedSnapshot``, or ``None``."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            magic, version, field_count, saved_at, count, checksum = HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != VERSION or field_count != len(FIELDS): return None
+        if self.clock() - saved_at > self.ttl: return None
+        body = memoryview(data)[HEADER.size:]
+        if zlib.crc32(body) != checksum: return None
+        try:
+            names_length, = NAMES_LENGTH.unpack_from(body)
+            names = str(body[NAMES_LENGTH.size:NAMES_LENGTH.size + names_length], 'utf-8').split('\n') if count else []
+            columns = array('d')
+            columns.frombytes(body[NAMES_LENGTH.size + names_length:])
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return None
+        if len(names) != count or len(columns) != count * len(FIELDS): return None
+        if sys.byteorder == 'big': columns.byteswap()
+        keys = ('market',) + FIELDS
+        rows = [dict(zip(keys, values))
+                for values in zip(names, *(columns[i * count:(i + 1) * count] for i in range(len(FIELDS))))]
+        return CachedSnapshot(rows, saved_at)
+
+    def _fit(self, rows):
+        budget = self.max_bytes - HEADER.size - NAMES_LENGTH.size
+        sizes = [len(row['market'].encode('utf-8')) + 1 + 8 * len(FIELDS) for row in rows]
+        if sum(sizes) <= budget: return rows
+        keep = set()
+        for i in sorted(range(len(rows)), key=lambda i: -(rows[i].get('volume') or 0.0)):
+            if sizes[i] > budget: break
+            budget -= sizes[i]
+            keep.add(i)
+        return [row for i, row in enumerate(rows) if i in keep]
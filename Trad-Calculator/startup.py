@@ -0,0 +1,130 @@
+import importlib
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Longest the splash waits for the first ticker before handing off; the
+# poller picks the prefetch up in the background if it is still running
+PREFETCH_WAIT = 3.0
+
+
+class AppState:
+    """Persisted state loaded during warm-up: the journal, its replayed ledger, the alert book
+    and the last saved ticker snapshot (``cached_ticker``, ``None`` if there is no fresh one).
+
+    ``journal_error`` is set when the journal could not be opened or read; the
+    journal is then an in-memory one and nothing from this session is kept.
+    ``unmatched`` counts journaled sells that exceeded the replayed holding.
+    """
+
+    def __init__(self, journal, ledger, schedule, alerts, snapshot_cache=None, cached_ticker=None,
+                 journal_error=None, unmatched=0):
+        self.journal = journal
+        self.ledger = ledger
+        self.schedule = schedule
+        self.alerts = alerts
+        self.snapshot_cache = snapshot_cache
+        self.cached_ticker = cached_ticker
+        self.journal_error = journal_error
+        self.unmatched = unmatched
+
+
+def replay(journal, ledger):
+    """Replay every journaled trade into ``ledger``; returns it with the number
+    of sells that exceeded the holding and were skipped."""
+    unmatched = 0
+    for _, market, side, quantity, price, _ in journal.iter_all_trades():
+        if side == 'buy':
+            ledger.buy(market, quantity, price)
+            continue
+        try:
+            ledger.sell(market, quantity, price)
+        except ValueError:  # the lots are untouched: sell matches before it prices
+            unmatched += 1
+    return ledger, unmatched
+
+
+class StartupWarmup:
+    """Work done on background threads while the splash is on screen.
+
+    Two tasks run in parallel: one imports the HTTP stack, opens the
+    keep-alive session and prefetches the first ticker snapshot; the other
+    opens the trade journal, replays it into a ledger and loads the alerts
+    and the cached ticker snapshot. Both import their
+    modules on the worker thread, so ``requests`` and NumPy never load on
+    the Tk thread before the first frame.
+
+    ``client``, ``ticker`` and ``state`` are ``concurrent.futures.Future``
+    objects; the splash polls them with ``done()`` and never blocks.
+    """
+
+    def __init__(self, url=None, journal_path=None, quote='INR', clock=time.monotonic, snapshot_options=None,
+                 service_url=None):
+        self.url = url
+        # A local calc_service to poll instead of CoinDCX
+        self.service_url = service_url
+        self.journal_path = journal_path
+        # SnapshotCache arguments (path, ttl, max_bytes)
+        self.snapshot_options = snapshot_options or {}
+        self.quote = quote
+        self.clock = clock
+        self.started = clock()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='warmup')
+        self.client = Future()
+        self.ticker = self.executor.submit(self._connect)
+        self.state = self.executor.submit(self._load_state)
+        # The pool threads exit once both tasks are done
+        self.executor.shutdown(wait=False)
+
+    def _connect(self):
+        try:
+            from market_client import MarketDataClient
+            if self.service_url:
+                from calc_service import service_urls
+                url, order_book_url = service_urls(self.service_url)
+                client = MarketDataClient(url, order_book_url=order_book_url)
+            else:
+                client = MarketDataClient(self.url) if self.url else MarketDataClient()
+        except BaseException as e:
+            self.client.set_exception(e)
+            raise
+        self.client.set_result(client)
+        # Prefetching also opens the connection the poller keeps alive
+        return client.fetch_ticker(quote=self.quote)
+
+    def _load_state(self):
+        from alerts import AlertEngine
+        from calc_engine import DEFAULT_SCHEDULE
+        from journal import TradeJournal
+        from ledger import FIFO, TradeLedger
+        from snapshot_cache import SnapshotCache
+        importlib.import_module('ticker_store')  # pulls NumPy in off the Tk thread
+
+        snapshot_cache = SnapshotCache(**self.snapshot_options)
+        cached_ticker = snapshot_cache.load()
+        journal = journal_error = None
+        try:
+            journal = TradeJournal(self.journal_path)
+            ledger, unmatched = replay(journal, TradeLedger(FIFO, DEFAULT_SCHEDULE))
+        except (sqlite3.Error, OSError) as e:
+            # A locked or damaged journal must not keep the app from opening
+            if journal is not None: journal.close()
+            journal_error = f"{self.journal_path or 'default journal'}: {e}"
+            journal = TradeJournal(':memory:')
+            ledger, unmatched = TradeLedger(FIFO, DEFAULT_SCHEDULE), 0
+        return AppState(journal, ledger, DEFAULT_SCHEDULE, AlertEngine(journal), snapshot_cache, cached_ticker,
+                        journal_error, unmatched)
+
+    def progress(self):
+        """Short status line for the splash."""
+        if not self.state.done(): return "Loading trade journal..."
+        if not self.ticker.done(): return "Connecting to live data feed..."
+        return "Ready to launch!"
+
+    def ready(self):
+        """True once the app can be built: state loaded and the client open,
+        with the first ticker in, a cached snapshot to show meanwhile, or
+        ``PREFETCH_WAIT`` elapsed."""
+        if not (self.state.done() and self.client.done()): return False
+        if self.ticker.done() or self.clock() - self.started >= PREFETCH_WAIT: return True
+        return self.state.exception() is None and self.state.result().cached_ticker is not None
@@ -0,0 +1,317 @@
+"""Fiscal-year crypto tax report: 30% tax on gains and 1% TDS reconciliation.
+
+Streams a trade history once, oldest first, through a FIFO ledger priced
+with the app's fee schedule. Memory holds the open lots and one row of
+totals per market, never the trade history itself. Sells in the fiscal
+year are taxed as transfers of virtual digital assets (section 115BBH):
+gain is sale consideration minus cost of acquisition, fees are not
+deductible and losses are not set off. TDS (section 194S) withheld on
+each sell is credited against the tax.
+
+    python -m tax_report trades.csv --fy 2025 --schedule schedule.csv --summary summary.csv
+    python -m tax_report --journal ~/.trad_calculator/journal.db -o report.txt
+
+Trade files are CSV or JSONL with ``market, side, quantity, price,
+timestamp`` (epoch seconds or ISO 8601, IST unless an offset is given);
+``.json`` files from the Export button are read too.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
+from calc_engine import DEFAULT_SCHEDULE, FeeSchedule, trade_pnl
+from journal import IST, current_fiscal_year, read_export
+from ledger import FIFO, TradeLedger
+
+TAX_RATE = 0.30
+QUARTERS = ('Q1 APR-JUN', 'Q2 JUL-SEP', 'Q3 OCT-DEC', 'Q4 JAN-MAR')
+# Times stay epoch seconds: formatting a date per row would double the cost of a sell
+SCHEDULE_FIELDS = ('timestamp', 'market', 'quantity', 'sell_price', 'sale_value', 'cost', 'fees', 'tds',
+                   'taxable_gain', 'net_pnl')
+# Per-market and per-quarter totals: sells, sale value, cost, gains, losses, fees, TDS, net P&L
+TOTAL_FIELDS = ('sells', 'sale_value', 'cost', 'gains', 'losses', 'fees', 'tds', 'net_pnl')
+TOP_MARKETS = 15
+
+
+def quarter_starts(start_year):
+    """Epoch start of each quarter of the fiscal year beginning April ``start_year``."""
+    return [datetime(year, month, 1, tzinfo=IST).timestamp()
+            for year, month in ((start_year, 4), (start_year, 7), (start_year, 10), (start_year + 1, 1),
+                                (start_year + 1, 4))]
+
+
+def parse_timestamp(value):
+    """Epoch seconds from a number or an ISO 8601 string; times without an offset are IST."""
+    if isinstance(value, (int, float)): return float(value)
+    if not isinstance(value, str): raise ValueError(f"invalid timestamp {value!r}")
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None: parsed = parsed.replace(tzinfo=IST)
+    return parsed.timestamp()
+
+
+def read_trades(stream, fmt):
+    """``(market, side, quantity, price, timestamp)`` tuples from CSV or JSONL."""
+    if fmt == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None: return
+        index = {name.strip(): i for i, name in enumerate(header)}
+        try:
+            m, s, q, p, t = (index[name] for name in ('market', 'side', 'quantity', 'price', 'timestamp'))
+        except KeyError as e:
+            raise ValueError(f"CSV is missing column {e}") from None
+        width = max(m, s, q, p, t) + 1
+        for row in reader:
+            if not row: continue
+            if len(row) < width: raise ValueError(f"CSV row has {len(row)} of {len(header)} columns")
+            try:
+                timestamp = float(row[t])
+            except ValueError:
+                timestamp = parse_timestamp(row[t])
+            yield row[m], row[s], float(row[q]), float(row[p]), timestamp
+        return
+    loads = orjson.loads if orjson is not None else json.loads
+    for line in stream:
+        if line.strip():
+            r = loads(line)
+            if not isinstance(r, dict): raise ValueError(f"JSONL line is not an object: {line.strip()[:60]}")
+            try:
+                trade = r['market'], r['side'], float(r['quantity']), float(r['price']), parse_timestamp(r['timestamp'])
+            except TypeError as e:  # null or nested values
+                raise ValueError(f"{e}: {line.strip()[:60]}") from None
+            yield trade
+
+
+class TaxReport:
+    """Single-pass fiscal-year tax computation over a chronological trade stream.
+
+    ``add`` every trade in order (buys before the year still set the cost
+    basis; trades after it are ignored). Each sell inside the year updates
+    per-market and per-quarter totals and, when ``on_sell`` is given, is
+    passed to it as a schedule row (``SCHEDULE_FIELDS``). Sells larger than
+    the recorded holding are counted in ``unmatched`` and left out.
+    """
+
+    def __init__(self, fiscal_year=None, schedule=DEFAULT_SCHEDULE, tax_rate=TAX_RATE, method=FIFO, on_sell=None):
+        self.fiscal_year = fiscal_year if fiscal_year is not None else current_fiscal_year()
+        self.schedule = schedule
+        self.tax_rate = tax_rate
+        self.ledger = TradeLedger(method, schedule)
+        self.on_sell = on_sell
+        self.unit = trade_pnl(1.0, 1.0, 0.0, schedule)
+        self.bounds = quarter_starts(self.fiscal_year)
+        self.start, self.end = self.bounds[0], self.bounds[-1]
+        self.markets = {}
+        self.quarters = [[0] + [0.0] * (len(TOTAL_FIELDS) - 1) for _ in QUARTERS]
+        # Input is chronological, so the current quarter is cached between sells
+        self.quarter = self.quarters[0]
+        self.quarter_start, self.quarter_end = self.bounds[0], self.bounds[1]
+        self.trades = 0
+        self.unmatched = 0
+
+    def add(self, market, side, quantity, price, timestamp):
+        self.trades += 1
+        if timestamp >= self.end: return
+        if side == 'buy':
+            return self.ledger.buy(market, quantity, price)
+        if side != 'sell': raise ValueError(f"unknown side {side!r}")
+        try:
+            cost = self.ledger.match(market, quantity)
+        except ValueError:
+            self.unmatched += 1
+            return
+        if timestamp < self.start: return
+        # trade_pnl is linear in the sale value, so one unit sale prices them all
+        unit = self.unit
+        gross = quantity * price
+        fees = gross * unit.platform_fee + gross * unit.gst
+        tds = gross * unit.tds
+        pnl = gross * unit.withdrawal - cost
+        gain = gross - cost
+        totals = self.markets.get(market)
+        if totals is None:
+            totals = self.markets[market] = [0] + [0.0] * (len(TOTAL_FIELDS) - 1)
+        if not self.quarter_start <= timestamp < self.quarter_end:
+            self._enter_quarter(timestamp)
+        quarter = self.quarter
+        totals[0] += 1; quarter[0] += 1
+        totals[1] += gross; quarter[1] += gross
+        totals[2] += cost; quarter[2] += cost
+        if gain > 0:
+            totals[3] += gain; quarter[3] += gain
+        else:
+            totals[4] -= gain; quarter[4] -= gain
+        totals[5] += fees; quarter[5] += fees
+        totals[6] += tds; quarter[6] += tds
+        totals[7] += pnl; quarter[7] += pnl
+        if self.on_sell is not None:
+            self.on_sell((timestamp, market, quantity, price, gross, cost, fees, tds, gain, pnl))
+
+    def _enter_quarter(self, timestamp):
+        i = bisect_right(self.bounds, timestamp) - 1
+        self.quarter = self.quarters[i]
+        self.quarter_start, self.quarter_end = self.bounds[i], self.bounds[i + 1]
+
+    def feed(self, trades):
+        add = self.add
+        for market, side, quantity, price, timestamp in trades:
+            add(market, side, quantity, price, timestamp)
+        return self
+
+    def totals(self):
+        """Whole-year totals as a dict keyed by ``TOTAL_FIELDS`` plus tax and balance."""
+        year = dict(zip(TOTAL_FIELDS, (sum(q[i] for q in self.quarters) for i in range(len(TOTAL_FIELDS)))))
+        year['tax'] = year['gains'] * self.tax_rate
+        # Positive: still payable after the TDS credit; negative: refundable
+        year['balance'] = year['tax'] - year['tds']
+        return year
+
+    def fy_label(self):
+        return f"FY {self.fiscal_year}-{(self.fiscal_year + 1) % 100:02d}"
+
+    def format_text(self, top=TOP_MARKETS):
+        """Boxed report in the style of the results pane."""
+        def money(amount): return f"₹{amount:,.2f}"
+        t = self.totals()
+        balance_label = "BALANCE PAYABLE:" if t['balance'] >= 0 else "REFUND DUE:"
+        tax_label = f"TAX @ {self.tax_rate * 100:g}%:"
+        lines = [
+            "+----------------------------------------------------------+",
+            f"|{f'TAX REPORT - {self.fy_label()}'.center(58)}|",
+            "+----------------------------------------------------------+",
+            f"| SELL TRADES:        {t['sells']:>25,} |",
+            f"| SALE CONSIDERATION: {money(t['sale_value']):>25} |",
+            f"| COST OF ACQUISITION:{money(t['cost']):>25} |",
+            f"| TAXABLE GAINS:      {money(t['gains']):>25} |",
+            f"| LOSSES (NO SET-OFF):{money(t['losses']):>25} |",
+            f"| {tax_label:<20}{money(t['tax']):>25} |",
+            f"| TDS DEDUCTED:       {money(t['tds']):>25} |",
+            f"| {balance_label:<20}{money(abs(t['balance'])):>25} |",
+            f"| FEES + GST PAID:    {money(t['fees']):>25} |",
+            f"| NET P&L AFTER FEES: {money(t['net_pnl']):>25} |",
+            "+----------------------------------------------------------+",
+            f"| {'QUARTER':<14}{'GAINS':>21}{'TDS':>21} |",
+        ]
+        for label, q in zip(QUARTERS, self.quarters):
+            lines.append(f"| {label:<14}{money(q[3]):>21}{money(q[6]):>21} |")
+        lines += ["+----------------------------------------------------------+",
+                  f"| {'MARKET':<14}{'GAINS':>21}{'TDS':>21} |"]
+        ranked = sorted(self.markets.items(), key=lambda item: -item[1][3])
+        for market, m in ranked[:top]:
+            lines.append(f"| {market[:14]:<14}{money(m[3]):>21}{money(m[6]):>21} |")
+        if len(ranked) > top:
+            lines.append(f"| {f'... and {len(ranked) - top:,} more markets (see summary CSV)':<56} |")
+        if self.unmatched:
+            lines.append(f"| {f'{self.unmatched:,} sell(s) exceeded holdings and were skipped':<56} |")
+        lines.append("+----------------------------------------------------------+")
+        return "\n".join(lines)
+
+    def write_summary(self, f):
+        """Per-quarter, per-market and whole-year totals as CSV."""
+        writer = csv.writer(f)
+        writer.writerow(('scope', 'name', *TOTAL_FIELDS, 'tax'))
+        for label, q in zip(QUARTERS, self.quarters):
+            writer.writerow(('quarter', label, *q, q[3] * self.tax_rate))
+        for market in sorted(self.markets):
+            m = self.markets[market]
+            writer.writerow(('market', market, *m, m[3] * self.tax_rate))
+        t = self.totals()
+        writer.writerow(('year', self.fy_label(), *(t[name] for name in TOTAL_FIELDS), t['tax']))
+
+
+def schedule_writer(f):
+    """``on_sell`` callback writing the per-trade schedule as CSV rows.
+
+    Formats each row with one ``%`` instead of ``csv.writer``, which reprs
+    every float and was most of the cost of a run with a schedule. Money is
+    rounded to paise, quantity and price to 8 places, times to the second.
+    """
+    f.write(",".join(SCHEDULE_FIELDS) + "\n")
+    write = f.write
+    line = "%.0f,%s,%.8f,%.8f,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f\n"
+    def on_sell(row):
+        write(line % row)
+    return on_sell
+
+
+def _guess_format(path):
+    lower = path.lower()
+    if lower.endswith('.csv'): return 'csv'
+    if lower.endswith('.json'): return 'export'
+    return 'jsonl'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='tax_report', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', help="trade files in chronological order, or - for stdin")
+    parser.add_argument('--journal', help="read the app's trade journal (SQLite) instead")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'), help="default: from each file's extension")
+    parser.add_argument('--fy', type=int, help="fiscal year by its starting year, e.g. 2025 for FY 2025-26")
+    parser.add_argument('-o', '--output', default='-', help="text report file, or - for stdout (default)")
+    parser.add_argument('--schedule', help="write the per-trade schedule CSV here")
+    parser.add_argument('--summary', help="write per-market and per-quarter totals CSV here")
+    parser.add_argument('--tax-rate', type=float, default=TAX_RATE)
+    parser.add_argument('--platform-fee', type=float, default=0.005)
+    parser.add_argument('--gst', type=float, default=0.18)
+    parser.add_argument('--tds', type=float, default=0.01)
+    parser.add_argument('--top', type=int, default=TOP_MARKETS, help="markets listed in the text report")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.journal:
+        parser.error("give trade files or --journal")
+
+    schedule_file = open(args.schedule, 'w', newline='', encoding='utf-8') if args.schedule else None
+    report = TaxReport(args.fy, FeeSchedule(args.platform_fee, args.gst, args.tds), args.tax_rate,
+                       on_sell=schedule_writer(schedule_file) if schedule_file else None)
+    start = time.perf_counter()
+    try:
+        if args.journal:
+            from journal import TradeJournal
+            journal = TradeJournal(args.journal)
+            try:
+                report.feed(trade[1:] for trade in journal.iter_all_trades())
+            finally:
+                journal.close()
+        for path in args.inputs:
+            fmt = args.input_format or ('jsonl' if path == '-' else _guess_format(path))
+            if fmt == 'export':
+                report.feed(read_export(path))
+                continue
+            source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+            try:
+                report.feed(read_trades(source, fmt))
+            finally:
+                if source is not sys.stdin: source.close()
+    except (ValueError, KeyError) as e:
+        parser.exit(1, f"tax_report: invalid trade after {report.trades:,} trades: {e}\n")
+    finally:
+        if schedule_file: schedule_file.close()
+    elapsed = time.perf_counter() - start
+
+    text = report.format_text(args.top)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    if args.summary:
+        with open(args.summary, 'w', newline='', encoding='utf-8') as f:
+            report.write_summary(f)
+    rate = report.trades / elapsed if elapsed > 0 else 0.0
+    sys.stderr.write(f"tax_report: {report.trades:,} trades in {elapsed:.2f} s ({rate:,.0f} trades/s)\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; reads fall back to memoryview casts
+    np = None
+
+try:
+    import resource
+except ImportError:  # not on Windows, whose descriptor limit is far above the market count
+    resource = None
+
+from journal import DATA_DIR
+
+TICK_FIELDS = ('timestamp', 'last_price', 'high', 'low', 'volume', 'change_24_hour')
+DAILY_FIELDS = ('day', 'open', 'high', 'low', 'close', 'volume')
+
+# Header: magic, version, field count, record count; padded so records
+# start cache-line aligned. The count is written after the record it
+# covers, so a crash mid-append loses at most that record.
+HEADER = struct.Struct('<4sHHQ')
+COUNT = struct.Struct('<Q')
+HEADER_SIZE = 64
+VERSION = 1
+TICK_MAGIC, DAILY_MAGIC = b'TICK', b'OHLC'
+# Days roll over at midnight IST
+DAY_OFFSET = 5 * 3600 + 1800
+DAY = 24 * 3600
+COMPACT_INTERVAL = 3600
+# Tapes kept open at once, one descriptor each: enough for every market a
+# poll appends to, so the poller never reopens a file. The soft descriptor
+# limit is raised to fit when the hard limit allows, else the cap shrinks.
+MAX_OPEN_TAPES = 1024
+# Descriptors left for everything else (sockets, the journal, read views)
+RESERVED_DESCRIPTORS = 128
+
+
+def default_archive_dir():
+    return os.path.join(DATA_DIR, 'ticks')
+
+
+def descriptor_limit(wanted):
+    """Raise the soft open-file limit towards ``wanted``; returns the limit now in force."""
+    if resource is None: return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY or soft >= wanted: return wanted
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ValueError, OSError):
+        return soft
+    return target
+
+
+class Tape:
+    """Append-only file of fixed-width float64 records.
+
+    Records hold ``fields`` and are kept in strictly increasing order of the
+    first field (the timestamp), so range reads are a binary search.
+    Appends are positional writes on one descriptor: the record, then the
+    count in the header, so ``append`` is O(1) and never remaps. Reads map
+    the file read-only; each view owns its mapping, which closes with the
+    last reference to the view.
+
+    ``release`` gives back the descriptor; the next call that needs the file
+    reopens it, so a released tape stays usable.
+    """
+
+    def __init__(self, path, magic, fields):
+        self.path = path
+        self.magic = magic
+        self.fields = fields
+        self.record = struct.Struct('<%dd' % len(fields))
+        self.dtype = np.dtype([(name, '<f8') for name in fields]) if np is not None else None
+        self.lock = threading.Lock()
+        self.file = None
+        self._open()
+
+    def _open(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        self.file = os.fdopen(fd, 'r+b', buffering=0)
+        try:
+            size = os.fstat(fd).st_size
+            if size < HEADER_SIZE:
+                self.count = 0
+                self._write(0, HEADER.pack(self.magic, VERSION, len(self.fields), 0).ljust(HEADER_SIZE, b'\0'))
+            else:
+                found, version, nfields, count = HEADER.unpack(self._read(0, HEADER.size))
+                if found != self.magic or version != VERSION or nfields != len(self.fields):
+                    raise ValueError(f"{self.path} is not a {self.magic.decode()} v{VERSION} archive")
+                # Never trust a count that points past the end of the file; files
+                # written by older versions may also carry a zeroed preallocated tail
+                self.count = min(count, (size - HEADER_SIZE) // self.record.size)
+            self.last_key = self._read_record(self.count - 1)[0] if self.count else None
+        except BaseException:
+            self.file.close()
+            self.file = None
+            raise
+
+    def _ensure_open(self):
+        if self.file is None: self._open()
+
+    def _offset(self, index):
+        return HEADER_SIZE + index * self.record.size
+
+    def _write(self, offset, data):
+        if hasattr(os, 'pwrite'):
+            os.pwrite(self.file.fileno(), data, offset)
+        else:
+            self.file.seek(offset)
+            self.file.write(data)
+
+    def _read(self, offset, size):
+        self.file.seek(offset)
+        return self.file.read(size)
+
+    def _read_record(self, index):
+        return self.record.unpack(self._read(self._offset(index), self.record.size))
+
+    def append(self, values):
+        """Append one record; returns False if its timestamp is not newer."""
+        with self.lock:
+            if self.last_key is not None and values[0] <= self.last_key:
+                return False
+            self._ensure_open()
+            self._write(self._offset(self.count), self.record.pack(*values))
+            self._set_count(self.count + 1)
+            self.last_key = values[0]
+            return True
+
+    def extend(self, records):
+        """Bulk-append records (tuples or a structured array) in key order."""
+        with self.lock:
+            self._ensure_open()
+            if np is not None and isinstance(records, np.ndarray):
+                block = np.ascontiguousarray(records, dtype=self.dtype)
+                if self.last_key is not None:
+                    block = block[block[self.fields[0]] > self.last_key]
+                if not len(block): return 0
+                data, added, last = block.tobytes(), len(block), float(block[self.fields[0]][-1])
+            else:
+                records = [r for r in records if self.last_key is None or r[0] > self.last_key]
+                if not records: return 0
+                data = b''.join(self.record.pack(*values) for values in records)
+                added, last = len(records), records[-1][0]
+            self._write(self._offset(self.count), data)
+            self._set_count(self.count + added)
+            self.last_key = last
+            return added
+
+    def truncate(self, count):
+        """Drop records from ``count`` on (used to rewrite a partial day)."""
+        with self.lock:
+            if count < self.count:
+                self._ensure_open()
+                self._set_count(count)
+                self.last_key = self._read_record(count - 1)[0] if count else None
+
+    def _set_count(self, count):
+        self.count = count
+        self._write(8, COUNT.pack(count))
+
+    def view(self, start=None, end=None):
+        """Records with ``start <= key < end``, as a zero-copy view.
+
+        With NumPy this is a structured array over a read-only mapping;
+        without it, a flat ``memoryview`` of doubles (``len(fields)`` per
+        record). Records appended later are not in the view.
+        """
+        with self.lock:
+            self._ensure_open()
+            count = self.count
+            buffer = mmap.mmap(self.file.fileno(), self._offset(count), access=mmap.ACCESS_READ) if count else None
+        if np is not None:
+            if buffer is None: return np.empty(0, dtype=self.dtype)
+            records = np.frombuffer(buffer, dtype=self.dtype, count=count, offset=HEADER_SIZE)
+            keys = records[self.fields[0]]
+            lo = 0 if start is None else int(np.searchsorted(keys, start, 'left'))
+            hi = count if end is None else int(np.searchsorted(keys, end, 'left'))
+            return records[lo:hi]
+        if buffer is None: return memoryview(b'').cast('d')
+        flat = memoryview(buffer)[HEADER_SIZE:].cast('d')
+        width = len(self.fields)
+        keys = flat[::width]
+        lo = 0 if start is None else bisect_left(keys, start)
+        hi = count if end is None else bisect_left(keys, end)
+        return flat[lo * width:hi * width]
+
+    def rows(self, start=None, end=None):
+        """Records in range as a list of tuples (a copy)."""
+        view = self.view(start, end)
+        if np is not None: return view.tolist()
+        width = len(self.fields)
+        values = view.tolist()
+        return [tuple(values[i:i + width]) for i in range(0, len(values), width)]
+
+    def __len__(self):
+        return self.count
+
+    def flush(self):
+        """Force appended records to disk (they are in the OS cache as soon as written)."""
+        with self.lock:
+            if self.file is not None: os.fsync(self.file.fileno())
+
+    def release(self):
+        """Close the file; the tape reopens when next used."""
+        with self.lock:
+            if self.file is not None: self.file.close()
+            self.file = None
+
+    def close(self):
+        self.release()
+
+
+def daily_rollup(ticks):
+    """Daily ``(day, open, high, low, close, volume)`` rows from a tick view
+    (``Tape.rows`` tuples without NumPy).
+
+    OHLC come from ``last_price``; volume is the last 24h volume seen that
+    day. ``day`` is the epoch time of IST midnight.
+    """
+    if np is not None:
+        if not len(ticks): return np.empty(0, dtype=[(name, '<f8') for name in DAILY_FIELDS])
+        days = (ticks['timestamp'] + DAY_OFFSET) // DAY
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(days)) + 1))
+        ends = np.append(starts[1:], len(ticks)) - 1
+        price = ticks['last_price']
+        rollup = np.empty(len(starts), dtype=[(name, '<f8') for name in DAILY_FIELDS])
+        rollup['day'] = days[starts] * DAY - DAY_OFFSET
+        rollup['open'] = price[starts]
+        rollup['high'] = np.maximum.reduceat(price, starts)
+        rollup['low'] = np.minimum.reduceat(price, starts)
+        rollup['close'] = price[ends]
+        rollup['volume'] = ticks['volume'][ends]
+        return rollup
+
+    rollup = []
+    for timestamp, price, _, _, volume, _ in ticks:
+        day = (timestamp + DAY_OFFSET) // DAY * DAY - DAY_OFFSET
+        if rollup and rollup[-1][0] == day:
+            _, open_, high, low, _, _ = rollup[-1]
+            rollup[-1] = (day, open_, max(high, price), min(low, price), price, volume)
+        else:
+            rollup.append((day, price, price, price, price, volume))
+    return rollup
+
+
+class TickArchive:
+    """Per-market tick history: ``<MARKET>.ticks`` plus ``<MARKET>.daily`` rollups.
+
+    ``append_rows`` records one ticker poll; rows whose timestamp did not
+    move are skipped. ``ticks`` and ``daily`` return zero-copy views for a
+    time range. ``compact`` refreshes the daily OHLCV files incrementally
+    and ``start_compaction`` runs it on a background thread.
+
+    At most ``max_open`` tapes hold a descriptor at once, least recently used
+    released first. The cap covers every market a poll appends to, so the
+    LRU only turns over past that; compaction borrows the tapes it reads and
+    leaves the poller's open set alone.
+    """
+
+    def __init__(self, directory=None, max_open=MAX_OPEN_TAPES):
+        self.directory = directory or default_archive_dir()
+        os.makedirs(self.directory, exist_ok=True)
+        limit = descriptor_limit(max_open + RESERVED_DESCRIPTORS)
+        self.max_open = max(16, min(max_open, limit - RESERVED_DESCRIPTORS))
+        self.lock = threading.Lock()
+        self.tapes = {}
+        self.rollups = {}
+        # Tapes used most recently last, by (kind, market)
+        self.open_tapes = OrderedDict()
+        self.stop_compaction = threading.Event()
+        self.compactor = None
+
+    def markets(self):
+        return sorted(name[:-len('.ticks')] for name in os.listdir(self.directory) if name.endswith('.ticks'))
+
+    def path(self, market, suffix='ticks'):
+        return os.path.join(self.directory, f"{market}.{suffix}")
+
+    def tape(self, market):
+        return self._tape('ticks', market)
+
+    def rollup_tape(self, market):
+        return self._tape('daily', market)
+
+    def _tape(self, kind, market, track=True):
+        tapes = self.tapes if kind == 'ticks' else self.rollups
+        with self.lock:
+            tape = tapes.get(market)
+            if tape is None:
+                magic, fields = (TICK_MAGIC, TICK_FIELDS) if kind == 'ticks' else (DAILY_MAGIC, DAILY_FIELDS)
+                tape = tapes[market] = Tape(self.path(market, kind), magic, fields)
+            if track:
+                self._touch((kind, market), tape)
+            return tape
+
+    def _touch(self, key, tape):
+        # Called with self.lock held; tapes never take the archive lock, so this cannot deadlock
+        self.open_tapes[key] = tape
+        self.open_tapes.move_to_end(key)
+        while len(self.open_tapes) > self.max_open:
+            _, oldest = self.open_tapes.popitem(last=False)
+            oldest.release()
+
+    def _return(self, kind, market, tape):
+        """Release a tape taken with ``track=False`` unless the LRU holds it open."""
+        with self.lock:
+            if (kind, market) in self.open_tapes: return
+        tape.release()
+
+    def append_rows(self, rows, timestamp=None):
+        """Record parsed ticker rows; returns how many were new."""
+        now = timestamp or time.time()
+        added = 0
+        for row in rows:
+            added += self.tape(row['market']).append((
+                row.get('timestamp') or now, row['last_price'], row['high'], row['low'],
+                row['volume'], row['change_24_hour']))
+        return added
+
+    def __contains__(self, market):
+        return market in self.tapes or os.path.exists(self.path(market))
+
+    def ticks(self, market, start=None, end=None):
+        return self.tape(market).view(start, end)
+
+    def daily(self, market, start=None, end=None):
+        return self.rollup_tape(market).view(start, end)
+
+    def rows(self, market, start=None, end=None):
+        """``(timestamp, last_price, high, low, volume, change_24_hour)`` tuples; empty for unknown markets."""
+        return self.tape(market).rows(start, end) if market in self else []
+
+    def compact(self, market=None):
+        """Bring daily rollups up to date; only the last rolled-up day onward is redone."""
+        for name in [market] if market else self.markets():
+            # Borrowed outside the LRU: a pass over every market must not evict the poller's tapes
+            rollup = self._tape('daily', name, track=False)
+            ticks = self._tape('ticks', name, track=False)
+            try:
+                # The newest rolled-up day may have been partial, so it is rebuilt
+                resume = rollup.last_key
+                if resume is not None:
+                    rollup.truncate(len(rollup) - 1)
+                rollup.extend(daily_rollup(ticks.view(resume) if np is not None else ticks.rows(resume)))
+            finally:
+                self._return('daily', name, rollup)
+                self._return('ticks', name, ticks)
+
+    def start_compaction(self, interval=COMPACT_INTERVAL):
+        def loop():
+            while True:
+                try:
+                    self.compact()
+                except (OSError, ValueError):
+                    pass  # retried on the next pass
+                if self.stop_compaction.wait(interval): return
+        self.compactor = threading.Thread(target=loop, name='tick-compaction', daemon=True)
+        self.compactor.start()
+
+    def close(self):
+        self.stop_compaction.set()
+        if self.compactor is not None:
+            self.compactor.join(timeout=2)
+        with self.lock:
+            tapes = list(self.tapes.values()) + list(self.rollups.values())
+            self.tapes.clear()
+            self.rollups.clear()
+            self.open_tapes.clear()
+        for tape in tapes:
+            tape.release()
@@ -0,0 +1,70 @@
+import json
+import re
+
+NUMERIC_FIELDS = ('last_price', 'high', 'low', 'volume', 'change_24_hour')
+
+# Ticker rows are flat objects of scalars, so the braces around a market
+# name delimit exactly one row. Locating markets with the regex engine and
+# the braces with bytes.find keeps the scan in C, and rows we are about to
+# throw away are never decoded.
+_MARKET = re.compile(rb'"market"\s*:\s*"([^"]*)"')
+_OBJECT = re.compile(rb'\{[^{}]*\}')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def convert_row(row):
+    """Convert the numeric string fields of a ticker row to floats in place."""
+    for field in NUMERIC_FIELDS:
+        row[field] = _to_float(row.get(field))
+    return row
+
+
+def iter_tickers(chunks, quote=None):
+    """Incrementally parse a ``/exchange/ticker`` body from byte chunks.
+
+    Yields one converted row at a time, skipping markets that do not end in
+    ``quote`` before they are decoded. Only the current chunk and the row
+    being built are held in memory.
+    """
+    quote = quote.encode() if quote else None
+    buffer = b''
+    started = False
+    for chunk in chunks:
+        buffer += chunk
+        if not started:
+            stripped = buffer.lstrip()
+            if not stripped: continue
+            if not stripped.startswith(b'['):
+                raise ValueError("ticker payload is not a JSON array")
+            started = True
+
+        # Everything up to the last closing brace is a run of complete rows
+        end = buffer.rfind(b'}') + 1
+        if quote is None:
+            kept = _OBJECT.findall(buffer, 0, end)
+        else:
+            kept = []
+            for market in _MARKET.finditer(buffer, 0, end):
+                if market.group(1).endswith(quote):
+                    kept.append(buffer[buffer.rfind(b'{', 0, market.start()):buffer.find(b'}', market.end()) + 1])
+        buffer = buffer[end:]
+        # Decode the kept rows of each chunk with a single json.loads call
+        if kept:
+            for row in json.loads(b'[' + b','.join(kept) + b']'):
+                yield convert_row(row)
+
+    if buffer.strip().lstrip(b'[').strip() not in (b'', b']'):
+        raise ValueError("truncated ticker payload")
+
+
+def parse_ticker(data, quote=None):
+    """Parse a complete ticker body held in memory."""
+    return list(iter_tickers((data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)), quote))
@@ -0,0 +1,94 @@
+from instrumentation import instruments
+from ticker_table import TickerTable
+
+# Fields that drive what the price panel shows; a market whose values for
+# these are unchanged is not redrawn even if its timestamp moved.
+COMPARED_FIELDS = ('last_price', 'change_24_hour', 'high', 'low', 'volume')
+
+
+class Changeset:
+    """Difference between two consecutive ticker snapshots."""
+
+    def __init__(self, rows, table, added, removed, changed, reordered):
+        self.rows = rows
+        self.table = table
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.reordered = reordered
+
+    @property
+    def structural(self):
+        """True when rows were added, removed or moved, not just re-priced."""
+        return bool(self.added or self.removed or self.reordered)
+
+    @property
+    def empty(self):
+        return not (self.structural or self.changed)
+
+    def __repr__(self):
+        return (f"Changeset(added={len(self.added)}, removed={len(self.removed)}, "
+                f"changed={len(self.changed)}, reordered={len(self.reordered)})")
+
+
+def merge_changesets(older, newer):
+    """One changeset equivalent to applying ``older`` then ``newer``.
+
+    Lets a slow consumer skip intermediate snapshots without losing which
+    markets were added, removed or re-priced in between.
+    """
+    before = {row['market'] for row in older.rows}.difference(older.added).union(older.removed)
+    after = {row['market'] for row in newer.rows}
+    added = [market for market in older.added + newer.added if market in after and market not in before]
+    removed = [market for market in older.removed + newer.removed if market in before and market not in after]
+    skip = set(added)
+    changed = list(dict.fromkeys(m for m in older.changed + newer.changed if m in after and m not in skip))
+    reordered = list(dict.fromkeys(m for m in older.reordered + newer.reordered if m in after and m not in skip))
+    return Changeset(newer.rows, newer.table, list(dict.fromkeys(added)), list(dict.fromkeys(removed)),
+                     changed, reordered)
+
+
+class TickerStore:
+    """Previous ticker snapshot keyed by ``market``, used to diff each poll.
+
+    ``update`` is called from the market pipeline and returns a ``Changeset``
+    whose ``rows`` list and ``TickerTable`` are never mutated afterwards, so
+    they can be handed to the Tk thread as is. Rows are ordered by
+    ``sort_column`` using the table's vectorized sort.
+    """
+
+    def __init__(self, sort_column='change_24_hour', descending=True):
+        self.sort_column = sort_column
+        self.descending = descending
+        self.values = {}
+        self.positions = {}
+
+    def update(self, rows):
+        with instruments.span('ticker.sort'):
+            table = TickerTable.from_rows(rows)
+            rows = [rows[i] for i in table.order_by(self.sort_column, self.descending)]
+        with instruments.span('ticker.diff'):
+            return self._diff(rows, table)
+
+    def _diff(self, rows, table):
+        values = {}
+        positions = {}
+        added, changed, reordered = [], [], []
+        for index, row in enumerate(rows):
+            market = row['market']
+            current = tuple(row.get(field) for field in COMPARED_FIELDS)
+            values[market] = current
+            positions[market] = index
+            previous = self.values.get(market)
+            if previous is None:
+                added.append(market)
+                continue
+            if previous != current:
+                changed.append(market)
+            if self.positions[market] != index:
+                reordered.append(market)
+
+        removed = [market for market in self.values if market not in values]
+        self.values = values
+        self.positions = positions
+        return Changeset(rows, table, added, removed, changed, reordered)
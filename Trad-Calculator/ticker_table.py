@@ -0,0 +1,102 @@
+import heapq
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the array-module paths are used instead
+    np = None
+
+COLUMNS = ('last_price', 'high', 'low', 'volume', 'change_24_hour', 'timestamp')
+
+
+class TickerTable:
+    """Columnar snapshot of ticker rows.
+
+    Market names live in one list and each numeric field in a contiguous
+    ``array('d')`` (8 bytes per market per column), so sorting, ranking and
+    aggregates never touch per-row dicts. With NumPy installed the columns
+    are viewed zero-copy as ``float64`` arrays and the heavy lifting is
+    vectorized; without it the same results come from C-level builtins.
+    Tables are immutable once built.
+    """
+
+    def __init__(self, markets, columns):
+        self.markets = markets
+        self.columns = columns
+        self._index = None
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a table from parsed ticker rows (numeric fields as floats)."""
+        markets = [row['market'] for row in rows]
+        columns = {name: array('d', [float(row.get(name) or 0.0) for row in rows]) for name in COLUMNS}
+        return cls(markets, columns)
+
+    def __len__(self):
+        return len(self.markets)
+
+    def column(self, name):
+        """Return a column as a NumPy view when available, else the raw array."""
+        values = self.columns[name]
+        return np.frombuffer(values, dtype=np.float64) if np is not None else values
+
+    def index_of(self, market):
+        if self._index is None:
+            self._index = {market: i for i, market in enumerate(self.markets)}
+        return self._index[market]
+
+    def row(self, i):
+        row = {name: values[i] for name, values in self.columns.items()}
+        row['market'] = self.markets[i]
+        return row
+
+    def order_by(self, name, descending=False):
+        """Return row indexes sorted by ``name``; ties keep their input order."""
+        values = self.columns[name]
+        if np is not None:
+            view = np.frombuffer(values, dtype=np.float64)
+            return np.argsort(-view if descending else view, kind='stable').tolist()
+        return sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+
+    def top(self, name, n, largest=True):
+        """Indexes of the ``n`` rows with the largest (or smallest) ``name``."""
+        values = self.columns[name]
+        n = min(n, len(values))
+        if n <= 0: return []
+        if np is not None:
+            view = np.frombuffer(values, dtype=np.float64)
+            keyed = -view if largest else view
+            picked = np.argpartition(keyed, n - 1)[:n]
+            return picked[np.argsort(keyed[picked], kind='stable')].tolist()
+        pick = heapq.nlargest if largest else heapq.nsmallest
+        return pick(n, range(len(values)), key=values.__getitem__)
+
+    def gainers(self, n=10):
+        return self.top('change_24_hour', n, largest=True)
+
+    def losers(self, n=10):
+        return self.top('change_24_hour', n, largest=False)
+
+    def volume_weighted(self, name='last_price', indexes=None):
+        """Volume-weighted mean of a column, optionally over a subset of rows."""
+        values, volume = self.columns[name], self.columns['volume']
+        if np is not None:
+            values = np.frombuffer(values, dtype=np.float64)
+            volume = np.frombuffer(volume, dtype=np.float64)
+            if indexes is not None:
+                values, volume = values[indexes], volume[indexes]
+            total = volume.sum()
+            return float(values @ volume / total) if total else 0.0
+        if indexes is not None:
+            values = [values[i] for i in indexes]
+            volume = [volume[i] for i in indexes]
+        total = sum(volume)
+        return sum(map(float.__mul__, values, volume)) / total if total else 0.0
+
+    def quoted_in(self, quote):
+        """Indexes of markets quoted in ``quote`` (e.g. ``'INR'``)."""
+        return [i for i, market in enumerate(self.markets) if market.endswith(quote)]
+
+    def nbytes(self):
+        """Bytes held by the numeric columns (market names not included)."""
+        return sum(values.itemsize * len(values) for values in self.columns.values())